@@ -2,7 +2,8 @@ import sys
 import os
 import re
 from datetime import datetime, timezone
-from typing import List, Set
+from functools import lru_cache
+from typing import List, Set, Tuple
 
 import boto3
 from botocore.exceptions import ClientError
@@ -29,9 +30,6 @@ from pyspark.sql.functions import udf
 # ---------- Helpers ----------
 
 
-TOKEN_PATTERN = re.compile(r"[A-Za-z0-9ÄÖÜäöüß]+")
-TRIM_PATTERN = re.compile(r"^[^A-Za-z0-9ÄÖÜäöüß]+|[^A-Za-z0-9ÄÖÜäöüß]+$")
-
 MIN_TOKEN_LENGTH = 3
 DROP_NUMERIC_ONLY_FIELDS = ["KEYWORD", "DESCRIPTION_SHORT"]
 STOPWORDS_DE_V1: List[str] = [
@@ -90,49 +88,73 @@ def build_stopword_set() -> Set[str]:
     return stopwords
 
 
-def tokenize_text_value(value, field_name: str, stopwords: Set[str]) -> List[str]:
-    if value is None:
-        return []
-    if not isinstance(value, str):
-        value = str(value)
-    if not value:
-        return []
+# Tokens are runs of ASCII letters/digits and ÄÖÜäöüß. This table maps those characters to lowercase
+# ASCII, so translating a whole value and splitting on [a-z0-9]+ yields the same tokens as splitting
+# first and applying normalize_german_chars to each token.
+TOKEN_NORMALIZATION_TABLE = str.maketrans(
+    {
+        **{chr(code): chr(code).lower() for code in range(ord("A"), ord("Z") + 1)},
+        "ä": "ae",
+        "ö": "oe",
+        "ü": "ue",
+        "ß": "ss",
+        "Ä": "ae",
+        "Ö": "oe",
+        "Ü": "ue",
+    }
+)
+NORMALIZED_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+TEXT_TOKENIZER_CACHE_SIZE = 200_000
+
+
+class TextTokenizer:
+    # Field values repeat heavily across a catalog, so normalized tokens are memoized per
+    # (value, field_name) in a bounded LRU cache. The cache is dropped when pickled.
+
+    def __init__(self, stopwords: Set[str], cache_size: int = TEXT_TOKENIZER_CACHE_SIZE):
+        self.stopwords = stopwords
+        self.cache_size = cache_size
+        self._tokenize_cached = lru_cache(maxsize=cache_size)(self._tokenize_uncached)
+
+    def __getstate__(self) -> dict:
+        return {"stopwords": self.stopwords, "cache_size": self.cache_size}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(state["stopwords"], state["cache_size"])
+
+    def _tokenize_uncached(self, value: str, field_name: str) -> Tuple[str, ...]:
+        drop_numeric_only = field_name in DROP_NUMERIC_ONLY_FIELDS
+        stopwords = self.stopwords
+        return tuple(
+            token
+            for token in NORMALIZED_TOKEN_PATTERN.findall(value.translate(TOKEN_NORMALIZATION_TABLE))
+            if len(token) >= MIN_TOKEN_LENGTH
+            and not (drop_numeric_only and token.isdigit())
+            and token not in stopwords
+        )
 
-    normalized_tokens: List[str] = []
-    for token in TOKEN_PATTERN.findall(value):
-        trimmed = TRIM_PATTERN.sub("", token)
-        if not trimmed:
-            continue
-        normalized = normalize_german_chars(trimmed)
-        if not normalized:
-            continue
-        numeric_only_candidate = re.sub(r"[^0-9]", "", normalized)
-        if (
-            field_name in DROP_NUMERIC_ONLY_FIELDS
-            and numeric_only_candidate
-            and len(numeric_only_candidate) == len(normalized)
-        ):
-            continue
-        if len(normalized) < MIN_TOKEN_LENGTH:
-            continue
-        if normalized in stopwords:
-            continue
-        normalized_tokens.append(normalized)
-    return normalized_tokens
+    def tokenize(self, value: str, field_name: str) -> Tuple[str, ...]:
+        if not value:
+            return ()
+        return self._tokenize_cached(value, field_name)
 
+    def tokenize_many(self, values, field_name: str) -> List[str]:
+        tokens: List[str] = []
+        for value in values:
+            if isinstance(value, str) and value:
+                tokens.extend(self._tokenize_cached(value, field_name))
+        return tokens
 
-def tokenize_keywords(keywords, stopwords: Set[str]) -> List[str]:
-    tokens: List[str] = []
+
+def tokenize_keywords(keywords, tokenizer: TextTokenizer) -> List[str]:
     if isinstance(keywords, list):
-        for keyword in keywords:
-            if isinstance(keyword, str):
-                tokens.extend(tokenize_text_value(keyword, "KEYWORD", stopwords))
-    return tokens
+        return tokenizer.tokenize_many(keywords, "KEYWORD")
+    return []
 
 
-def tokenize_description(description_short, stopwords: Set[str]) -> List[str]:
+def tokenize_description(description_short, tokenizer: TextTokenizer) -> List[str]:
     if isinstance(description_short, str):
-        return tokenize_text_value(description_short, "DESCRIPTION_SHORT", stopwords)
+        return list(tokenizer.tokenize(description_short, "DESCRIPTION_SHORT"))
     return []
 
 
@@ -185,7 +207,7 @@ def tokenize_class_codes(class_codes) -> List[str]:
     return tokens
 
 
-def normalize_rule_tokens(values, field_name: str, stopwords: Set[str]) -> List[str]:
+def normalize_rule_tokens(values, field_name: str, tokenizer: TextTokenizer) -> List[str]:
     """
     Turn mapping_method values into normalized tokens using the SAME tokenization rules.
     This intentionally supports older/manual rule values like 'Akku-Bohrer' by splitting it.
@@ -194,7 +216,9 @@ def normalize_rule_tokens(values, field_name: str, stopwords: Set[str]) -> List[
     if not values:
         return tokens
     for v in values:
-        tokens.extend(tokenize_text_value(v, field_name, stopwords))
+        if v is None:
+            continue
+        tokens.extend(tokenizer.tokenize(v if isinstance(v, str) else str(v), field_name))
     return tokens
 
 
@@ -342,6 +366,7 @@ job.init(job_name, args)
 
 s3_client = boto3.client("s3")
 stopwords_for_filtering = build_stopword_set()
+text_tokenizer = TextTokenizer(stopwords_for_filtering)
 
 try:
     # =========================================================
@@ -781,12 +806,12 @@ try:
                         "include_tokens": normalize_rule_tokens(
                             values_include or [],
                             "DESCRIPTION_SHORT",
-                            stopwords_for_filtering,
+                            text_tokenizer,
                         ),
                         "exclude_tokens": normalize_rule_tokens(
                             values_exclude or [],
                             "DESCRIPTION_SHORT",
-                            stopwords_for_filtering,
+                            text_tokenizer,
                         ),
                     })
                 elif field_name == "KEYWORD":
@@ -795,12 +820,12 @@ try:
                         "include_tokens": normalize_rule_tokens(
                             values_include or [],
                             "KEYWORD",
-                            stopwords_for_filtering,
+                            text_tokenizer,
                         ),
                         "exclude_tokens": normalize_rule_tokens(
                             values_exclude or [],
                             "KEYWORD",
-                            stopwords_for_filtering,
+                            text_tokenizer,
                         ),
                     })
                 elif field_name == "CLASS_CODES":
@@ -1023,7 +1048,7 @@ try:
                 if assignment_source == "existing_category_match":
                     return ([], [], [])
 
-                text_tokens = set(tokenize_description(description_short, stopwords_for_filtering))
+                text_tokens = set(tokenize_description(description_short, text_tokenizer))
                 if not text_tokens:
                     return ([], [], [])
 
@@ -1047,7 +1072,7 @@ try:
                 if assignment_source == "existing_category_match":
                     return ([], [], [])
 
-                kw_tokens = set(tokenize_keywords(keywords, stopwords_for_filtering))
+                kw_tokens = set(tokenize_keywords(keywords, text_tokenizer))
                 if not kw_tokens:
                     return ([], [], [])
 
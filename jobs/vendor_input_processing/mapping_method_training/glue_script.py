@@ -3,26 +3,47 @@ AWS Glue script for vendorInputProcessing_VENDOR_mappingMethodTraining.
 Section 1 bootstrapping: argument parsing, key resolution, existence checks, and run receipt writing.
 """
 
+import codecs
+import fcntl
+import gzip
 import hashlib
 import io
 import json
+import math
+import multiprocessing
+import os
+import resource
 import sys
+import threading
+import time
+import tracemalloc
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from itertools import combinations
+from functools import lru_cache
+from itertools import chain, combinations
 from copy import deepcopy
 import re
+import shutil
+import uuid
+from array import array
 from typing import Dict, List, Set, Tuple
 
 import boto3
 from botocore.exceptions import ClientError
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - only the bitset rule hits and sparse evidence engines need numpy
+    np = None
+try:
+    from scipy import sparse
+except ImportError:  # pragma: no cover - only the sparse evidence engine needs scipy
+    sparse = None
 try:
     from awsglue.utils import getResolvedOptions
 except ImportError as exc:  # pragma: no cover - Glue runtime should provide this
     raise ImportError("awsglue package is required when running this script in AWS Glue") from exc
 
-TOKEN_PATTERN = re.compile(r"[A-Za-z0-9ÄÖÜäöüß]+")
-TRIM_PATTERN = re.compile(r"^[^A-Za-z0-9ÄÖÜäöüß]+|[^A-Za-z0-9ÄÖÜäöüß]+$")
 
 THRESHOLD_POLICY = {
     "products_total_min": 8,
@@ -31,6 +52,32 @@ THRESHOLD_POLICY = {
     "support_logic": "ratio_or_count",
 }
 
+EVIDENCE_BUILD_MODES = ("incremental", "full", "verify")
+EVIDENCE_BUILD_ENGINES = ("python", "sparse")
+UNIGRAM_EVIDENCE_BUILD_DEFAULTS = {"mode": "incremental", "full_rebuild_interval": 20, "engine": "python"}
+PAIR_EVIDENCE_COUNTING_METHODS = ("exact", "heavy_hitters")
+PAIR_EVIDENCE_BUILD_DEFAULTS = {
+    "mode": "incremental",
+    "engine": "python",
+    "counting": "exact",
+    "sketch_memory_mb": 64,
+    "sketch_depth": 4,
+    "max_candidate_pairs": 5_000_000,
+}
+RULE_GENERATION_DEFAULTS = {"workers": 1}
+PRODUCT_RULE_HITS_ENGINES = ("python", "bitset", "verify")
+PRODUCT_RULE_HITS_DEFAULTS = {"workers": 1, "chunk_size": 5000, "engine": "python"}
+NDJSON_OUTPUT_COMPRESSIONS = ("none", "gzip")
+NDJSON_OUTPUT_DEFAULTS = {"compression": "none", "part_size_mb": 8}
+S3_MULTIPART_MIN_PART_SIZE_MB = 5
+STORAGE_BACKENDS = ("s3", "local", "memory")
+STORAGE_DEFAULTS = {"backend": "s3", "local_root": ""}
+STORAGE_STREAM_CHUNK_SIZE = 1024 * 1024
+RUN_CHECKPOINT_DEFAULTS = {"resume_run_id": ""}
+BATCH_RUN_DEFAULTS = {"vendor_names": "", "vendor_workers": 1}
+THRESHOLD_POLICY_SWEEP_DEFAULTS = {"grid": ""}
+STABLE_TRAINING_SET_DEFAULTS = {"manifest_repair": False}
+
 
 def evaluate_threshold(
     products_in_category: int | None,
@@ -59,28 +106,1051 @@ def evaluate_threshold(
     }
 
 
-# === Section 1: LOCKED – DO NOT TOUCH (Bootstrapping / Arg parsing / Key resolution / Run receipt) ===
+PERFORMANCE_DEFAULTS = {"trace_memory": False}
+PERFORMANCE_COUNTER_NAMES = (
+    "s3_get_count",
+    "s3_put_count",
+    "s3_head_count",
+    "s3_bytes_downloaded",
+    "s3_bytes_uploaded",
+    "json_parse_seconds",
+    "json_serialize_seconds",
+)
 
-def s3_key_exists(s3_client, bucket: str, key: str) -> bool:
-    try:
-        s3_client.head_object(Bucket=bucket, Key=key)
+
+class PipelinePerformance:
+    # Run-wide S3 and JSON counters. run_section snapshots them around one section call and records
+    # the difference together with wall/CPU time and memory in the receipt performance block.
+
+    def __init__(self, trace_memory: bool = False):
+        self.trace_memory = trace_memory
+        self.counters: Dict[str, float] = {name: 0 for name in PERFORMANCE_COUNTER_NAMES}
+        self.sections: List[dict] = []
+        self.layers: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def add(self, counter_name: str, amount: float = 1) -> None:
+        # Multipart parts are uploaded from a background thread.
+        with self._lock:
+            self.counters[counter_name] += amount
+
+    def run_section(self, layer: str, section_function, *args, **kwargs):
+        counters_before = dict(self.counters)
+        times_before = os.times()
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        wall_start = time.perf_counter()
+
+        result = section_function(*args, **kwargs)
+
+        wall_seconds = time.perf_counter() - wall_start
+        times_after = os.times()
+        section_entry = {
+            "section": section_function.__name__,
+            "layer": layer,
+            "wall_seconds": round(wall_seconds, 3),
+            "cpu_seconds": round(
+                times_after.user + times_after.system - times_before.user - times_before.system, 3
+            ),
+            "worker_cpu_seconds": round(
+                times_after.children_user
+                + times_after.children_system
+                - times_before.children_user
+                - times_before.children_system,
+                3,
+            ),
+            # ru_maxrss is a high-water mark (KiB on Linux): the process peak up to the end of this section.
+            "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+            "worker_peak_rss_mb": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024, 1),
+            "tracemalloc_peak_mb": (
+                round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 1) if self.trace_memory else None
+            ),
+        }
+        for name in PERFORMANCE_COUNTER_NAMES:
+            delta = self.counters[name] - counters_before[name]
+            section_entry[name] = round(delta, 3) if isinstance(delta, float) else delta
+        self.sections.append(section_entry)
+        return result
+
+    def summarize_layer(self, layer: str) -> dict:
+        layer_sections = [entry for entry in self.sections if entry["layer"] == layer]
+        summary = {
+            "section_count": len(layer_sections),
+            "peak_rss_mb": max((entry["peak_rss_mb"] for entry in layer_sections), default=0),
+        }
+        for name in ("wall_seconds", "cpu_seconds", "worker_cpu_seconds", *PERFORMANCE_COUNTER_NAMES):
+            summary[name] = round(sum(entry[name] for entry in layer_sections), 3)
+        self.layers[layer] = summary
+        print(
+            f"Performance {layer}: wall={summary['wall_seconds']:.1f}s cpu={summary['cpu_seconds']:.1f}s "
+            f"worker_cpu={summary['worker_cpu_seconds']:.1f}s peak_rss={summary['peak_rss_mb']:.0f}MB "
+            f"s3_get={summary['s3_get_count']} ({summary['s3_bytes_downloaded'] / (1024 * 1024):.1f}MB) "
+            f"s3_put={summary['s3_put_count']} ({summary['s3_bytes_uploaded'] / (1024 * 1024):.1f}MB) "
+            f"json_parse={summary['json_parse_seconds']:.1f}s "
+            f"json_serialize={summary['json_serialize_seconds']:.1f}s"
+        )
+        return summary
+
+    def to_receipt(self) -> dict:
+        return {
+            "trace_memory": self.trace_memory,
+            "layers": self.layers,
+            "sections": self.sections,
+        }
+
+
+class S3StorageBackend:
+    # Default backend for Glue runs: objects are addressed by S3 bucket and key.
+
+    def __init__(self, s3_client):
+        self.s3_client = s3_client
+
+    def get(self, bucket: str, key: str) -> bytes:
+        return self.s3_client.get_object(Bucket=bucket, Key=key)["Body"].read()
+
+    def stream(self, bucket: str, key: str):
+        return self.s3_client.get_object(Bucket=bucket, Key=key)["Body"]
+
+    def put(self, bucket: str, key: str, body: bytes) -> None:
+        self.s3_client.put_object(Bucket=bucket, Key=key, Body=body)
+
+    def put_if_match(self, bucket: str, key: str, body: bytes, etag: str | None) -> bool:
+        # Conditional write: only replaces the object version with this ETag, or with etag None only
+        # creates the object. Returns False when another writer got there first.
+        condition = {"IfMatch": etag} if etag is not None else {"IfNoneMatch": "*"}
+        try:
+            self.s3_client.put_object(Bucket=bucket, Key=key, Body=body, **condition)
+        except ClientError as error:
+            error_code = error.response.get("Error", {}).get("Code")
+            http_status = error.response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+            if error_code in {"PreconditionFailed", "ConditionalRequestConflict"} or http_status in {409, 412}:
+                return False
+            raise
+        return True
+
+    def head(self, bucket: str, key: str) -> dict | None:
+        try:
+            response = self.s3_client.head_object(Bucket=bucket, Key=key)
+        except ClientError as error:
+            error_code = error.response.get("Error", {}).get("Code")
+            http_status = error.response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+            if error_code in {"404", "NotFound"} or http_status == 404:
+                return None
+            raise
+        return {"size": response.get("ContentLength"), "etag": response.get("ETag")}
+
+    def list(self, bucket: str, prefix: str) -> List[str]:
+        paginator = self.s3_client.get_paginator("list_objects_v2")
+        keys: List[str] = []
+        for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+            keys.extend(obj.get("Key", "") for obj in page.get("Contents", []))
+        return keys
+
+    def create_multipart_upload(self, bucket: str, key: str) -> str:
+        return self.s3_client.create_multipart_upload(Bucket=bucket, Key=key)["UploadId"]
+
+    def upload_part(self, bucket: str, key: str, upload_id: str, part_number: int, body: bytes) -> dict:
+        response = self.s3_client.upload_part(
+            Bucket=bucket, Key=key, UploadId=upload_id, PartNumber=part_number, Body=body
+        )
+        return {"PartNumber": part_number, "ETag": response["ETag"]}
+
+    def complete_multipart_upload(self, bucket: str, key: str, upload_id: str, parts: List[dict]) -> None:
+        self.s3_client.complete_multipart_upload(
+            Bucket=bucket, Key=key, UploadId=upload_id, MultipartUpload={"Parts": parts}
+        )
+
+    def abort_multipart_upload(self, bucket: str, key: str, upload_id: str) -> None:
+        self.s3_client.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+
+
+class LocalStorageBackend:
+    # Objects are files under <root>/<bucket>/<key>. Writes land in a temporary file that is
+    # renamed into place, so a failed run never leaves a truncated artifact behind.
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, bucket: str, key: str) -> str:
+        return os.path.join(self.root, bucket, *key.split("/"))
+
+    def _replace(self, path: str, write_body) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        staging_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(staging_path, "wb") as staging_file:
+                write_body(staging_file)
+            os.replace(staging_path, path)
+        finally:
+            if os.path.exists(staging_path):
+                os.remove(staging_path)
+
+    def get(self, bucket: str, key: str) -> bytes:
+        with open(self._path(bucket, key), "rb") as object_file:
+            return object_file.read()
+
+    def stream(self, bucket: str, key: str):
+        return open(self._path(bucket, key), "rb")
+
+    def put(self, bucket: str, key: str, body: bytes) -> None:
+        self._replace(self._path(bucket, key), lambda staging_file: staging_file.write(body))
+
+    def put_if_match(self, bucket: str, key: str, body: bytes, etag: str | None) -> bool:
+        # The ETag check and the write happen under an exclusive lock on a sidecar file, which
+        # list() skips like the other .tmp files.
+        path = self._path(bucket, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(f"{path}.lock.tmp", "wb") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            head = self.head(bucket, key)
+            if (head["etag"] if head is not None else None) != etag:
+                return False
+            self.put(bucket, key, body)
+        return True
+
+    def head(self, bucket: str, key: str) -> dict | None:
+        try:
+            stat_result = os.stat(self._path(bucket, key))
+        except FileNotFoundError:
+            return None
+        return {"size": stat_result.st_size, "etag": f"{stat_result.st_size:x}-{stat_result.st_mtime_ns:x}"}
+
+    def list(self, bucket: str, prefix: str) -> List[str]:
+        bucket_root = os.path.join(self.root, bucket)
+        keys: List[str] = []
+        for directory, _, file_names in os.walk(bucket_root):
+            relative_directory = os.path.relpath(directory, bucket_root)
+            for file_name in file_names:
+                if file_name.endswith(".tmp"):
+                    continue
+                key = file_name if relative_directory == "." else f"{relative_directory}/{file_name}"
+                key = key.replace(os.sep, "/")
+                if key.startswith(prefix):
+                    keys.append(key)
+        return sorted(keys)
+
+    def _part_path(self, bucket: str, key: str, upload_id: str, part_number: int) -> str:
+        return f"{self._path(bucket, key)}.{upload_id}.part{part_number:05d}.tmp"
+
+    def create_multipart_upload(self, bucket: str, key: str) -> str:
+        os.makedirs(os.path.dirname(self._path(bucket, key)), exist_ok=True)
+        return uuid.uuid4().hex
+
+    def upload_part(self, bucket: str, key: str, upload_id: str, part_number: int, body: bytes) -> dict:
+        with open(self._part_path(bucket, key, upload_id, part_number), "wb") as part_file:
+            part_file.write(body)
+        return {"PartNumber": part_number, "ETag": hashlib.md5(body).hexdigest()}
+
+    def complete_multipart_upload(self, bucket: str, key: str, upload_id: str, parts: List[dict]) -> None:
+        def write_parts(staging_file) -> None:
+            for part in parts:
+                with open(self._part_path(bucket, key, upload_id, part["PartNumber"]), "rb") as part_file:
+                    shutil.copyfileobj(part_file, staging_file)
+
+        self._replace(self._path(bucket, key), write_parts)
+        self.abort_multipart_upload(bucket, key, upload_id)
+
+    def abort_multipart_upload(self, bucket: str, key: str, upload_id: str) -> None:
+        part_prefix = f"{os.path.basename(self._path(bucket, key))}.{upload_id}.part"
+        directory = os.path.dirname(self._path(bucket, key))
+        for file_name in os.listdir(directory):
+            if file_name.startswith(part_prefix):
+                os.remove(os.path.join(directory, file_name))
+
+
+class InMemoryStorageBackend:
+    # Objects are held as bytes in this process, for tests and in-process runs whose caller
+    # seeds the inputs and passes the same backend instance to run_pipeline_layers.
+
+    def __init__(self):
+        self.objects: Dict[Tuple[str, str], bytes] = {}
+        self._uploads: Dict[str, Dict[int, bytes]] = {}
+
+    def get(self, bucket: str, key: str) -> bytes:
+        try:
+            return self.objects[(bucket, key)]
+        except KeyError:
+            raise FileNotFoundError(f"No object at {bucket}/{key}") from None
+
+    def stream(self, bucket: str, key: str):
+        return io.BytesIO(self.get(bucket, key))
+
+    def put(self, bucket: str, key: str, body: bytes) -> None:
+        self.objects[(bucket, key)] = bytes(body)
+
+    def put_if_match(self, bucket: str, key: str, body: bytes, etag: str | None) -> bool:
+        head = self.head(bucket, key)
+        if (head["etag"] if head is not None else None) != etag:
+            return False
+        self.put(bucket, key, body)
         return True
-    except ClientError as error:
-        error_code = error.response.get("Error", {}).get("Code")
-        http_status = error.response.get("ResponseMetadata", {}).get("HTTPStatusCode")
-        if error_code in {"404", "NotFound"} or http_status == 404:
+
+    def head(self, bucket: str, key: str) -> dict | None:
+        body = self.objects.get((bucket, key))
+        if body is None:
+            return None
+        return {"size": len(body), "etag": hashlib.md5(body).hexdigest()}
+
+    def list(self, bucket: str, prefix: str) -> List[str]:
+        return sorted(
+            key for object_bucket, key in self.objects if object_bucket == bucket and key.startswith(prefix)
+        )
+
+    def create_multipart_upload(self, bucket: str, key: str) -> str:
+        upload_id = uuid.uuid4().hex
+        self._uploads[upload_id] = {}
+        return upload_id
+
+    def upload_part(self, bucket: str, key: str, upload_id: str, part_number: int, body: bytes) -> dict:
+        self._uploads[upload_id][part_number] = bytes(body)
+        return {"PartNumber": part_number, "ETag": hashlib.md5(body).hexdigest()}
+
+    def complete_multipart_upload(self, bucket: str, key: str, upload_id: str, parts: List[dict]) -> None:
+        uploaded_parts = self._uploads.pop(upload_id)
+        self.objects[(bucket, key)] = b"".join(uploaded_parts[part["PartNumber"]] for part in parts)
+
+    def abort_multipart_upload(self, bucket: str, key: str, upload_id: str) -> None:
+        self._uploads.pop(upload_id, None)
+
+
+def build_storage_backend(storage_options: dict | None = None):
+    storage_options = {**STORAGE_DEFAULTS, **(storage_options or {})}
+    backend_name = storage_options["backend"]
+    if backend_name not in STORAGE_BACKENDS:
+        raise ValueError(f"Unsupported storage backend '{backend_name}'")
+    if backend_name == "local":
+        if not storage_options["local_root"]:
+            raise ValueError("storage backend 'local' requires storage_local_root")
+        return LocalStorageBackend(storage_options["local_root"])
+    if backend_name == "memory":
+        return InMemoryStorageBackend()
+    return S3StorageBackend(boto3.client("s3"))
+
+
+def iter_stream_lines(readable, digest=None):
+    pending = b""
+    while True:
+        chunk = readable.read(STORAGE_STREAM_CHUNK_SIZE)
+        if not chunk:
+            break
+        if digest is not None:
+            digest.update(chunk)
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        yield from lines
+    if pending:
+        yield pending
+
+
+JSON_STREAM_WHITESPACE = re.compile(r"[ \t\n\r]*")
+JSON_STREAM_DELIMITERS = frozenset(" \t\n\r,:]}")
+
+
+class JsonStreamReader:
+    # Incremental JSON parser over a binary storage stream for consumers that iterate the members of
+    # one object. A value that fits in the read-ahead window is decoded with one raw_decode call;
+    # larger objects and arrays are walked member by member, so memory stays at the window plus the
+    # current member.
+
+    def __init__(self, readable, performance: PipelinePerformance | None = None):
+        self._readable = readable
+        self._performance = performance or PipelinePerformance()
+        self._decoder = json.JSONDecoder()
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._text = ""
+        self._pos = 0
+        self._eof = False
+
+    def iter_object_items(self, path: Tuple[str, ...] = ()):
+        # Yields (key, value) of the object at path without materializing the object itself. Members
+        # before the path are decoded and dropped; the stream is not read past the object.
+        for depth, component in enumerate(path):
+            if self._next_char() != "{":
+                raise ValueError(f"Expected a JSON object at /{'/'.join(path[:depth])}")
+            for key in self._iter_member_keys():
+                if key == component:
+                    break
+                self._skip_value()
+            else:
+                return
+        if self._next_char() != "{":
+            raise ValueError(f"Expected a JSON object at /{'/'.join(path)}")
+        for key in self._iter_member_keys():
+            yield key, self._read_value()
+
+    def _fill(self, min_chars: int) -> None:
+        # Drops consumed text and reads until min_chars are buffered past the position or the stream ends.
+        chunks = [self._text[self._pos:]]
+        buffered = len(chunks[0])
+        while buffered < min_chars and not self._eof:
+            raw_chunk = self._readable.read(STORAGE_STREAM_CHUNK_SIZE)
+            self._eof = not raw_chunk
+            chunk = self._text_decoder.decode(raw_chunk, final=self._eof)
+            chunks.append(chunk)
+            buffered += len(chunk)
+        self._text = "".join(chunks)
+        self._pos = 0
+
+    def _next_char(self) -> str:
+        # Skips whitespace and returns the next character without consuming it; "" at end of stream.
+        while True:
+            self._pos = JSON_STREAM_WHITESPACE.match(self._text, self._pos).end()
+            if self._pos < len(self._text):
+                return self._text[self._pos]
+            if self._eof:
+                return ""
+            self._fill(1)
+
+    def _raw_decode(self):
+        parse_start = time.perf_counter()
+        try:
+            return self._decoder.raw_decode(self._text, self._pos)
+        finally:
+            self._performance.add("json_parse_seconds", time.perf_counter() - parse_start)
+
+    def _decode_scalar(self):
+        # Doubles the window until the value is complete. A number cut at the window end still
+        # decodes ("12." as 12), so it is only accepted once a delimiter follows it.
+        while True:
+            try:
+                value, end = self._raw_decode()
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            else:
+                if self._eof or self._text[self._pos] == '"' or (
+                    end < len(self._text) and self._text[end] in JSON_STREAM_DELIMITERS
+                ):
+                    self._pos = end
+                    return value
+            self._fill(2 * max(len(self._text) - self._pos, STORAGE_STREAM_CHUNK_SIZE))
+
+    def _decode_container(self) -> dict | list | None:
+        # Decodes an object or array that fits in the window; None if it has to be walked instead.
+        if not self._eof and len(self._text) - self._pos < STORAGE_STREAM_CHUNK_SIZE // 2:
+            self._fill(STORAGE_STREAM_CHUNK_SIZE)
+        try:
+            value, self._pos = self._raw_decode()
+        except json.JSONDecodeError:
+            if self._eof:
+                raise
+            return None
+        return value
+
+    def _read_value(self):
+        char = self._next_char()
+        if not char:
+            raise ValueError("Unexpected end of JSON stream")
+        if char not in "{[":
+            return self._decode_scalar()
+        value = self._decode_container()
+        if value is not None:
+            return value
+        if char == "{":
+            return {key: self._read_value() for key in self._iter_member_keys()}
+        return [self._read_value() for _ in self._iter_member_keys()]
+
+    def _skip_value(self) -> None:
+        char = self._next_char()
+        if not char:
+            raise ValueError("Unexpected end of JSON stream")
+        if char not in "{[":
+            self._decode_scalar()
+        elif self._decode_container() is None:
+            for _ in self._iter_member_keys():
+                self._skip_value()
+
+    def _iter_member_keys(self):
+        # Yields each object key (array index) with the stream positioned at its value; the caller
+        # consumes the value before resuming.
+        closing = "}" if self._next_char() == "{" else "]"
+        self._pos += 1
+        char = self._next_char()
+        if char == closing:
+            self._pos += 1
+            return
+        index = 0
+        while True:
+            if closing == "}":
+                if char != '"':
+                    raise ValueError("Expected a JSON object key")
+                key = self._decode_scalar()
+                if self._next_char() != ":":
+                    raise ValueError("Expected ':' after a JSON object key")
+                self._pos += 1
+                yield key
+            else:
+                yield index
+                index += 1
+            char = self._next_char()
+            self._pos += 1
+            if char == closing:
+                return
+            if char != ",":
+                raise ValueError(f"Expected ',' or '{closing}' in JSON stream")
+            char = self._next_char()
+
+
+class _CountingReader:
+    # Counts bytes read from a storage stream as downloaded.
+
+    def __init__(self, readable, performance: PipelinePerformance):
+        self._readable = readable
+        self._performance = performance
+
+    def read(self, size: int | None = None) -> bytes:
+        data = self._readable.read() if size is None or size < 0 else self._readable.read(size)
+        self._performance.add("s3_bytes_downloaded", len(data))
+        return data
+
+    def close(self) -> None:
+        self._readable.close()
+
+
+class InstrumentedStorageBackend:
+    # Counts GET/PUT/HEAD requests and transferred bytes into a PipelinePerformance and logs every
+    # completed write for the run checkpoint. Any other backend attribute is passed through unchanged.
+
+    def __init__(self, storage_backend, performance: PipelinePerformance):
+        self._storage_backend = storage_backend
+        self._performance = performance
+        self._written_objects: List[Tuple[str, str]] = []
+
+    def __getattr__(self, name):
+        return getattr(self._storage_backend, name)
+
+    def get(self, bucket: str, key: str) -> bytes:
+        self._performance.add("s3_get_count")
+        body = self._storage_backend.get(bucket, key)
+        self._performance.add("s3_bytes_downloaded", len(body))
+        return body
+
+    def stream(self, bucket: str, key: str) -> _CountingReader:
+        self._performance.add("s3_get_count")
+        return _CountingReader(self._storage_backend.stream(bucket, key), self._performance)
+
+    def head(self, bucket: str, key: str) -> dict | None:
+        self._performance.add("s3_head_count")
+        return self._storage_backend.head(bucket, key)
+
+    def put(self, bucket: str, key: str, body: bytes) -> None:
+        self._count_upload(body)
+        self._storage_backend.put(bucket, key, body)
+        self._written_objects.append((bucket, key))
+
+    def put_if_match(self, bucket: str, key: str, body: bytes, etag: str | None) -> bool:
+        self._count_upload(body)
+        written = self._storage_backend.put_if_match(bucket, key, body, etag)
+        if written:
+            self._written_objects.append((bucket, key))
+        return written
+
+    def upload_part(self, bucket: str, key: str, upload_id: str, part_number: int, body: bytes) -> dict:
+        self._count_upload(body)
+        return self._storage_backend.upload_part(bucket, key, upload_id, part_number, body)
+
+    def complete_multipart_upload(self, bucket: str, key: str, upload_id: str, parts: List[dict]) -> None:
+        self._storage_backend.complete_multipart_upload(bucket, key, upload_id, parts)
+        self._written_objects.append((bucket, key))
+
+    def take_written_objects(self) -> List[Tuple[str, str]]:
+        # (bucket, key) of every object written since the last call, in write order.
+        written_objects = self._written_objects
+        self._written_objects = []
+        return written_objects
+
+    def _count_upload(self, body: bytes) -> None:
+        self._performance.add("s3_put_count")
+        self._performance.add("s3_bytes_uploaded", len(body))
+
+
+class NdjsonSink:
+    # Writes NDJSON records as multipart upload parts so only the current part is buffered.
+    # Parts upload on a background thread while the caller keeps producing records. Outputs that
+    # never fill a part are written with a single put.
+
+    def __init__(
+        self,
+        storage_backend,
+        bucket: str,
+        key: str,
+        part_size_bytes: int,
+        compress: bool = False,
+        performance: PipelinePerformance | None = None,
+    ):
+        self.storage_backend = storage_backend
+        self.bucket = bucket
+        self.key = key
+        self.part_size_bytes = part_size_bytes
+        self.records_written = 0
+        self._buffer = io.BytesIO()
+        self._gzip_stream = gzip.GzipFile(fileobj=self._buffer, mode="wb", mtime=0) if compress else None
+        self._upload_id: str | None = None
+        self._uploader: ThreadPoolExecutor | None = None
+        self._pending_part = None
+        self._parts: List[dict] = []
+        self._content_sha1 = hashlib.sha1()
+        self.performance = performance or PipelinePerformance()
+
+    def __enter__(self) -> "NdjsonSink":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def write(self, record: dict) -> None:
+        serialize_start = time.perf_counter()
+        line = json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n"
+        self.performance.add("json_serialize_seconds", time.perf_counter() - serialize_start)
+        self._content_sha1.update(line)
+        if self._gzip_stream is not None:
+            self._gzip_stream.write(line)
+        else:
+            self._buffer.write(line)
+        self.records_written += 1
+        if self._buffer.tell() >= self.part_size_bytes:
+            self._flush_part()
+
+    @property
+    def content_sha1(self) -> str:
+        # SHA-1 of the uncompressed NDJSON lines written so far.
+        return self._content_sha1.hexdigest()
+
+    def _flush_part(self) -> None:
+        body = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        if self._upload_id is None:
+            self._upload_id = self.storage_backend.create_multipart_upload(self.bucket, self.key)
+            self._uploader = ThreadPoolExecutor(max_workers=1)
+        self._wait_for_pending_part()
+        part_number = len(self._parts) + 1
+        self._pending_part = self._uploader.submit(
+            self.storage_backend.upload_part, self.bucket, self.key, self._upload_id, part_number, body
+        )
+
+    def _wait_for_pending_part(self) -> None:
+        if self._pending_part is None:
+            return
+        pending_part = self._pending_part
+        self._pending_part = None
+        self._parts.append(pending_part.result())
+
+    def close(self) -> None:
+        if self._gzip_stream is not None:
+            self._gzip_stream.close()
+        if self._upload_id is None:
+            self.storage_backend.put(self.bucket, self.key, self._buffer.getvalue())
+            return
+        if self._buffer.tell():
+            self._flush_part()
+        self._wait_for_pending_part()
+        self._uploader.shutdown()
+        self.storage_backend.complete_multipart_upload(self.bucket, self.key, self._upload_id, self._parts)
+
+    def abort(self) -> None:
+        if self._upload_id is None:
+            return
+        self._uploader.shutdown(wait=True, cancel_futures=True)
+        self.storage_backend.abort_multipart_upload(self.bucket, self.key, self._upload_id)
+
+
+class ArtifactStore:
+    # In-process hand-off of parsed artifacts between sections. Writes go through to the storage
+    # backend for persistence; reads only hit it on a cold start for an artifact not produced in
+    # this run.
+
+    def __init__(
+        self,
+        storage_backend,
+        ndjson_output_options: dict | None = None,
+        performance: PipelinePerformance | None = None,
+    ):
+        self.performance = performance or PipelinePerformance()
+        self.storage = InstrumentedStorageBackend(storage_backend, self.performance)
+        self._json_artifacts: Dict[Tuple[str, str], object] = {}
+        self._json_sha1: Dict[Tuple[str, str], str] = {}
+        self._ndjson_artifacts: Dict[Tuple[str, str], List[dict]] = {}
+        self._ndjson_sha1: Dict[Tuple[str, str], str] = {}
+        ndjson_output_options = {**NDJSON_OUTPUT_DEFAULTS, **(ndjson_output_options or {})}
+        if ndjson_output_options["compression"] not in NDJSON_OUTPUT_COMPRESSIONS:
+            raise ValueError(
+                f"Unsupported ndjson_output compression '{ndjson_output_options['compression']}'"
+            )
+        if int(ndjson_output_options["part_size_mb"]) < S3_MULTIPART_MIN_PART_SIZE_MB:
+            raise ValueError(
+                f"ndjson_output part_size_mb must be >= {S3_MULTIPART_MIN_PART_SIZE_MB}"
+            )
+        self.ndjson_compress = ndjson_output_options["compression"] == "gzip"
+        self.ndjson_part_size_bytes = int(ndjson_output_options["part_size_mb"]) * 1024 * 1024
+
+    def load_json(self, bucket: str, key: str):
+        artifact_key = (bucket, key)
+        if artifact_key not in self._json_artifacts:
+            body = self.storage.get(bucket, key)
+            self._json_sha1[artifact_key] = hashlib.sha1(body).hexdigest()
+            # Released before parsing, so body, text and tree are never held together.
+            text = body.decode("utf-8")
+            del body
+            parse_start = time.perf_counter()
+            self._json_artifacts[artifact_key] = json.loads(text)
+            self.performance.add("json_parse_seconds", time.perf_counter() - parse_start)
+        return self._json_artifacts[artifact_key]
+
+    def json_sha1(self, bucket: str, key: str) -> str:
+        # SHA-1 of the serialized body as last written or read by this store.
+        if (bucket, key) not in self._json_sha1:
+            self.load_json(bucket, key)
+        return self._json_sha1[(bucket, key)]
+
+    def iter_json_object(self, bucket: str, key: str, path: Tuple[str, ...] = ()):
+        # (key, value) pairs of the object at path. Artifacts not already held by this store are
+        # streamed from storage and not retained.
+        artifact_key = (bucket, key)
+        if artifact_key in self._json_artifacts:
+            data = self._json_artifacts[artifact_key]
+            for depth, component in enumerate(path):
+                if not isinstance(data, dict):
+                    raise ValueError(f"Expected a JSON object at /{'/'.join(path[:depth])} in s3://{bucket}/{key}")
+                if component not in data:
+                    return
+                data = data[component]
+            if not isinstance(data, dict):
+                raise ValueError(f"Expected a JSON object at /{'/'.join(path)} in s3://{bucket}/{key}")
+            yield from data.items()
+            return
+        readable = self.storage.stream(bucket, key)
+        try:
+            try:
+                yield from JsonStreamReader(readable, self.performance).iter_object_items(path)
+            except ValueError as exc:
+                raise ValueError(f"{exc} in s3://{bucket}/{key}") from exc
+        finally:
+            readable.close()
+
+    def load_json_if_exists(self, bucket: str, key: str):
+        if (bucket, key) not in self._json_artifacts and self.storage.head(bucket, key) is None:
+            return None
+        return self.load_json(bucket, key)
+
+    def reload_json(self, bucket: str, key: str) -> Tuple[object, str | None]:
+        # Current version from storage and its ETag, for a read-modify-write of an object other runs
+        # may update concurrently. Replaces any copy held by this store; (None, None) if missing.
+        self._json_artifacts.pop((bucket, key), None)
+        self._json_sha1.pop((bucket, key), None)
+        head = self.storage.head(bucket, key)
+        if head is None:
+            return None, None
+        return self.load_json(bucket, key), head["etag"]
+
+    def put_json_if_match(self, bucket: str, key: str, data, etag: str | None) -> bool:
+        # put_json that only replaces the version with this ETag (etag None: only creates the object).
+        serialize_start = time.perf_counter()
+        body = json.dumps(data, indent=2).encode("utf-8")
+        self.performance.add("json_serialize_seconds", time.perf_counter() - serialize_start)
+        if not self.storage.put_if_match(bucket, key, body, etag):
             return False
-        raise
+        self._json_sha1[(bucket, key)] = hashlib.sha1(body).hexdigest()
+        self._json_artifacts[(bucket, key)] = data
+        return True
+
+    def put_json(self, bucket: str, key: str, data, ensure_ascii: bool = True) -> None:
+        serialize_start = time.perf_counter()
+        body = json.dumps(data, indent=2, ensure_ascii=ensure_ascii).encode("utf-8")
+        self.performance.add("json_serialize_seconds", time.perf_counter() - serialize_start)
+        self.storage.put(bucket, key, body)
+        self._json_sha1[(bucket, key)] = hashlib.sha1(body).hexdigest()
+        self._json_artifacts[(bucket, key)] = data
+
+    def iter_ndjson(self, bucket: str, key: str):
+        records = self._ndjson_artifacts.get((bucket, key))
+        if records is not None:
+            yield from records
+            return
+        readable = self.storage.stream(bucket, key)
+        if key.endswith(".gz"):
+            readable = gzip.GzipFile(fileobj=readable, mode="rb")
+        content_sha1 = hashlib.sha1()
+        try:
+            for raw_line in iter_stream_lines(readable, content_sha1):
+                line = raw_line.decode("utf-8").strip()
+                if not line:
+                    continue
+                parse_start = time.perf_counter()
+                record = json.loads(line)
+                self.performance.add("json_parse_seconds", time.perf_counter() - parse_start)
+                yield record
+        finally:
+            readable.close()
+        self._ndjson_sha1[(bucket, key)] = content_sha1.hexdigest()
+
+    def load_ndjson(self, bucket: str, key: str) -> List[dict]:
+        # Whole-object read for NDJSON artifacts consumed as a list; kept for later readers.
+        artifact_key = (bucket, key)
+        if artifact_key not in self._ndjson_artifacts:
+            body = self.storage.get(bucket, key)
+            if key.endswith(".gz"):
+                body = gzip.decompress(body)
+            self._ndjson_sha1[artifact_key] = hashlib.sha1(body).hexdigest()
+            parse_start = time.perf_counter()
+            # Split on bytes: records written with ensure_ascii=False may contain U+2028 and similar.
+            records = [json.loads(line) for line in body.split(b"\n") if line.strip()]
+            self.performance.add("json_parse_seconds", time.perf_counter() - parse_start)
+            self._ndjson_artifacts[artifact_key] = records
+        return self._ndjson_artifacts[artifact_key]
+
+    def ndjson_sha1(self, bucket: str, key: str) -> str:
+        # SHA-1 of the uncompressed NDJSON body as last written or fully read by this store.
+        if (bucket, key) not in self._ndjson_sha1:
+            self.load_ndjson(bucket, key)
+        return self._ndjson_sha1[(bucket, key)]
+
+    def open_ndjson_sink(self, bucket: str, key: str, compress: bool | None = None) -> NdjsonSink:
+        # Streamed records are not retained; later readers stream them back from storage.
+        compress = self.ndjson_compress if compress is None else compress
+        if compress:
+            key = f"{key}.gz"
+        return NdjsonSink(
+            self.storage,
+            bucket,
+            key,
+            self.ndjson_part_size_bytes,
+            compress=compress,
+            performance=self.performance,
+        )
+
+    def put_ndjson(self, bucket: str, key: str, records: List[dict], compress: bool | None = None) -> str:
+        with self.open_ndjson_sink(bucket, key, compress=compress) as sink:
+            for record in records:
+                sink.write(record)
+        self._ndjson_artifacts[(bucket, sink.key)] = records
+        self._ndjson_sha1[(bucket, sink.key)] = sink.content_sha1
+        return sink.key
+
+
+RUN_CHECKPOINT_SCHEMA_VERSION = "MappingMethodTraining_RunCheckpoint_v1"
+# Receipt entries taken from the resuming invocation; everything else is restored from the checkpoint.
+RUN_CHECKPOINT_INVOCATION_KEYS = (
+    "job_name",
+    "script_version",
+    "unigram_evidence_build",
+    "pair_evidence_build",
+    "rule_generation",
+    "product_rule_hits_evaluation",
+    "ndjson_output",
+    "performance",
+    "storage",
+    "checkpoint",
+    "threshold_policy_sweep",
+)
+RECEIPT_ONLY_SECTIONS = (
+    "section2_placeholder",
+    "section3_extract_stable_training_delta",
+    "section6_6_build_pair_evidence",
+    "section6_3_write_rules_snapshot",
+    "section7_2_write_rule_validation_status",
+    "section7_3_write_vendor_category_mapping_status",
+    "section7_4_write_threshold_policy_sweep",
+    "section8_update_category_mapping_reference",
+)
+RULE_GENERATION_SECTIONS = (
+    "section6_2_generate_contains_any_rules",
+    "section6_7_generate_contains_all_rules",
+    "section6_8_generate_contains_any_exclude_any_rules",
+)
 
-def select_latest_category_mapping_reference(s3_client, bucket: str) -> str:
+
+def build_run_checkpoint_key(prepared_output_prefix: str, vendor_name: str, run_id: str) -> str:
+    return (
+        f"{prepared_output_prefix}/mappingMethodTraining/run_checkpoints/"
+        f"run_checkpoint_{vendor_name}_{run_id}.json"
+    )
+
+
+class RunCheckpoint:
+    # Sections completed by one run, each group with the objects it wrote and their ETags. Rewritten
+    # after every section that writes; sections without outputs are recorded together with the next
+    # one that has outputs, because their results only exist in memory. A resumed run skips the
+    # leading groups whose objects are unchanged and continues from the first one that is not.
+
+    def __init__(self, artifact_store: ArtifactStore, run_receipt: dict):
+        self.artifact_store = artifact_store
+        self.bucket = run_receipt["output_bucket"]
+        self.key = build_run_checkpoint_key(
+            run_receipt["prepared_output_prefix"], run_receipt["vendor_name"], run_receipt["run_id"]
+        )
+        self.base_run_receipt = deepcopy(run_receipt)
+        self.completed_sections: List[dict] = []
+        self.pending_sections: List[str] = []
+        self.skipped_sections: List[str] = []
+
+    def resume(self, run_receipt: dict) -> dict:
+        previous_checkpoint = self.artifact_store.load_json_if_exists(self.bucket, self.key)
+        if previous_checkpoint is None:
+            # The run failed before its first section with outputs completed: start from the beginning.
+            print(f"No run checkpoint at s3://{self.bucket}/{self.key}; rerunning all sections")
+            run_receipt["checkpoint"] = {
+                **run_receipt["checkpoint"],
+                "skipped_sections": [],
+                "invalidated": {"sections": [], "key": self.key, "reason": "checkpoint_missing"},
+            }
+            return run_receipt
+        if not isinstance(previous_checkpoint, dict) or (
+            previous_checkpoint.get("schema_version") != RUN_CHECKPOINT_SCHEMA_VERSION
+        ):
+            raise ValueError(
+                f"Run checkpoint at s3://{self.bucket}/{self.key} is not a {RUN_CHECKPOINT_SCHEMA_VERSION} object"
+            )
+
+        invalidated = None
+        for entry in previous_checkpoint["completed_sections"]:
+            for written_object in entry["objects_written"]:
+                head = self.artifact_store.storage.head(written_object["bucket"], written_object["key"])
+                if head is None:
+                    reason = "object_missing"
+                elif head["etag"] != written_object["etag"]:
+                    reason = "etag_changed"
+                else:
+                    continue
+                invalidated = {"sections": entry["sections"], "key": written_object["key"], "reason": reason}
+                break
+            if invalidated is not None:
+                break
+            self.completed_sections.append(entry)
+
+        self.base_run_receipt = previous_checkpoint["base_run_receipt"]
+        if self.completed_sections:
+            resumed_run_receipt = deepcopy(self.completed_sections[-1]["run_receipt"])
+        else:
+            resumed_run_receipt = deepcopy(self.base_run_receipt)
+        for key in RUN_CHECKPOINT_INVOCATION_KEYS:
+            if key in run_receipt:
+                resumed_run_receipt[key] = run_receipt[key]
+
+        self.skipped_sections = [
+            section_name for entry in self.completed_sections for section_name in entry["sections"]
+        ]
+        resumed_run_receipt["checkpoint"] = {
+            **resumed_run_receipt.get("checkpoint", {}),
+            "skipped_sections": self.skipped_sections,
+            "invalidated": invalidated,
+        }
+        print(
+            f"Resuming run {run_receipt['run_id']} from s3://{self.bucket}/{self.key}: "
+            f"skipping {len(self.skipped_sections)} completed sections"
+            + (
+                f"; {invalidated['key']} {invalidated['reason']}, rerunning from {invalidated['sections'][0]}"
+                if invalidated is not None
+                else ""
+            )
+        )
+        return resumed_run_receipt
+
+    def run_section(self, layer: str, section_function, run_receipt: dict, *args, **kwargs):
+        section_name = section_function.__name__
+        if section_name in self.skipped_sections:
+            return self.rehydrate(layer, section_name, run_receipt)
+
+        result = self.artifact_store.performance.run_section(
+            layer, section_function, run_receipt, *args, **kwargs
+        )
+        self.pending_sections.append(section_name)
+        written_objects = self.artifact_store.storage.take_written_objects()
+        if written_objects:
+            self.record_completed_sections(result[0] if isinstance(result, tuple) else result, written_objects)
+        return result
+
+    def rehydrate(self, layer: str, section_name: str, run_receipt: dict):
+        # Stands in for the result of a skipped section. Hand-offs that only let a later section take
+        # a faster path (StableTrainingSet changes, training delta, rule hit aggregates) are dropped
+        # and those sections read their inputs from storage instead.
+        if section_name in RECEIPT_ONLY_SECTIONS:
+            return run_receipt
+        # Sections before 6.9 are skipped together, so the corpus and rules are only needed if 6.9 runs.
+        handoff_needed = "section6_9_write_product_rule_hits" not in self.skipped_sections
+        if section_name == "section4_5_build_tokenized_training_corpus" and handoff_needed:
+            return self.artifact_store.performance.run_section(
+                layer, rehydrate_tokenized_training_corpus, run_receipt, self.artifact_store
+            )
+        if section_name in RULE_GENERATION_SECTIONS:
+            rules_by_pim_category = None
+            if handoff_needed:
+                rules_snapshot = self.artifact_store.load_json(
+                    run_receipt["output_bucket"], run_receipt["outputs_written"]["rules_snapshot_key"]
+                )
+                rules_by_pim_category = rules_snapshot["rules_by_pim_category"]
+            return run_receipt, rules_by_pim_category, None
+        return run_receipt, None
+
+    def record_completed_sections(self, run_receipt: dict, written_objects: List[Tuple[str, str]]) -> None:
+        objects_written = []
+        for bucket, key in dict.fromkeys(written_objects):
+            head = self.artifact_store.storage.head(bucket, key)
+            objects_written.append({"bucket": bucket, "key": key, "etag": head["etag"], "size": head["size"]})
+        self.completed_sections.append(
+            {
+                "sections": self.pending_sections,
+                "objects_written": objects_written,
+                "run_receipt": deepcopy(run_receipt),
+            }
+        )
+        self.pending_sections = []
+        self.artifact_store.put_json(
+            self.bucket,
+            self.key,
+            {
+                "schema_version": RUN_CHECKPOINT_SCHEMA_VERSION,
+                "run_id": self.base_run_receipt["run_id"],
+                "base_run_receipt": self.base_run_receipt,
+                "completed_sections": list(self.completed_sections),
+            },
+        )
+        # The checkpoint itself is not an output of the next section.
+        self.artifact_store.storage.take_written_objects()
+
+
+class UncheckpointedRun(RunCheckpoint):
+    # Used by batch runs, which write no run checkpoint: every section runs and only the performance
+    # block records it. The written-object log is drained so it does not grow over the run.
+
+    def __init__(self, artifact_store: ArtifactStore):
+        self.artifact_store = artifact_store
+
+    def resume(self, run_receipt: dict) -> dict:
+        raise ValueError("checkpoint resume_run_id is not supported for batch runs")
+
+    def run_section(self, layer: str, section_function, run_receipt: dict, *args, **kwargs):
+        result = self.artifact_store.performance.run_section(
+            layer, section_function, run_receipt, *args, **kwargs
+        )
+        self.artifact_store.storage.take_written_objects()
+        return result
+
+    def record_completed_sections(self, run_receipt: dict, written_objects: List[Tuple[str, str]]) -> None:
+        return None
+
+
+# === Section 1: LOCKED – DO NOT TOUCH (Bootstrapping / Arg parsing / Key resolution / Run receipt) ===
+
+def resolve_optional_args(argv: List[str], defaults: Dict[str, str]) -> Dict[str, str]:
+    present_args = [name for name in defaults if f"--{name}" in argv]
+    resolved = dict(defaults)
+    if present_args:
+        resolved.update(getResolvedOptions(argv, present_args))
+    return resolved
+
+def select_latest_category_mapping_reference(storage_backend, bucket: str) -> str:
     prefix = "canonical_mappings/"
-    paginator = s3_client.get_paginator("list_objects_v2")
-    keys: List[str] = []
-    for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
-        for obj in page.get("Contents", []):
-            key = obj.get("Key", "")
-            if re.search(r"Category_Mapping_Reference_.*\.json$", key):
-                keys.append(key)
+    keys = [
+        key
+        for key in storage_backend.list(bucket, prefix)
+        if re.search(r"Category_Mapping_Reference_.*\.json$", key)
+    ]
     if not keys:
         raise RuntimeError("No Category_Mapping_Reference_*.json files found in canonical_mappings/")
     return max(keys)
@@ -97,6 +1167,36 @@ def main():
     ]
     args = getResolvedOptions(sys.argv, required_args)
     print(f"Received args: {args}")
+    optional_args = resolve_optional_args(
+        sys.argv,
+        {
+            "unigram_evidence_mode": UNIGRAM_EVIDENCE_BUILD_DEFAULTS["mode"],
+            "unigram_evidence_full_rebuild_interval": str(
+                UNIGRAM_EVIDENCE_BUILD_DEFAULTS["full_rebuild_interval"]
+            ),
+            "unigram_evidence_engine": UNIGRAM_EVIDENCE_BUILD_DEFAULTS["engine"],
+            "pair_evidence_mode": PAIR_EVIDENCE_BUILD_DEFAULTS["mode"],
+            "pair_evidence_engine": PAIR_EVIDENCE_BUILD_DEFAULTS["engine"],
+            "pair_evidence_counting": PAIR_EVIDENCE_BUILD_DEFAULTS["counting"],
+            "pair_evidence_sketch_memory_mb": str(PAIR_EVIDENCE_BUILD_DEFAULTS["sketch_memory_mb"]),
+            "pair_evidence_max_candidate_pairs": str(PAIR_EVIDENCE_BUILD_DEFAULTS["max_candidate_pairs"]),
+            "rule_generation_workers": str(RULE_GENERATION_DEFAULTS["workers"]),
+            "product_rule_hits_workers": str(PRODUCT_RULE_HITS_DEFAULTS["workers"]),
+            "product_rule_hits_chunk_size": str(PRODUCT_RULE_HITS_DEFAULTS["chunk_size"]),
+            "product_rule_hits_engine": PRODUCT_RULE_HITS_DEFAULTS["engine"],
+            "ndjson_output_compression": NDJSON_OUTPUT_DEFAULTS["compression"],
+            "ndjson_output_part_size_mb": str(NDJSON_OUTPUT_DEFAULTS["part_size_mb"]),
+            "performance_trace_memory": str(PERFORMANCE_DEFAULTS["trace_memory"]).lower(),
+            "storage_backend": STORAGE_DEFAULTS["backend"],
+            "storage_local_root": STORAGE_DEFAULTS["local_root"],
+            "resume_run_id": RUN_CHECKPOINT_DEFAULTS["resume_run_id"],
+            "batch_vendor_names": BATCH_RUN_DEFAULTS["vendor_names"],
+            "batch_vendor_workers": str(BATCH_RUN_DEFAULTS["vendor_workers"]),
+            "threshold_policy_sweep_grid": THRESHOLD_POLICY_SWEEP_DEFAULTS["grid"],
+            "stable_training_set_manifest_repair": str(STABLE_TRAINING_SET_DEFAULTS["manifest_repair"]).lower(),
+        },
+    )
+    print(f"Resolved optional args: {optional_args}")
 
     job_name = args["JOB_NAME"]
     vendor_name = args["vendor_name"]
@@ -106,143 +1206,241 @@ def main():
     output_bucket = args["OUTPUT_BUCKET"]
 
     prepared_output_prefix = prepared_output_prefix_raw.rstrip("/")
-    run_id = datetime.utcnow().strftime("%Y%m%d-T%H%M%SZ")
+    # A resumed run keeps the run_id of the failed run: its output keys and lineage fields embed it.
+    run_id = optional_args["resume_run_id"] or datetime.utcnow().strftime("%Y%m%d-T%H%M%SZ")
+
+    # In batch mode vendor_name names the batch: its shared outputs and receipt are keyed by it.
+    batch_vendor_names = [
+        name.strip() for name in optional_args["batch_vendor_names"].split(",") if name.strip()
+    ]
+    if batch_vendor_names:
+        if len(set(batch_vendor_names)) != len(batch_vendor_names):
+            raise ValueError(f"batch_vendor_names contains duplicate vendors: {batch_vendor_names}")
+        if vendor_name in batch_vendor_names:
+            raise ValueError(
+                f"vendor_name '{vendor_name}' names the batch and must not be one of batch_vendor_names"
+            )
+        if optional_args["resume_run_id"]:
+            raise ValueError("resume_run_id is not supported together with batch_vendor_names")
 
-    s3_client = boto3.client("s3")
+    threshold_policy_sweep_grid = parse_threshold_policy_sweep_grid(optional_args["threshold_policy_sweep_grid"])
+
+    storage_options = {
+        "backend": optional_args["storage_backend"],
+        "local_root": optional_args["storage_local_root"],
+    }
+    storage_backend = build_storage_backend(storage_options)
 
     step2_prefix = f"{prepared_output_prefix}/"
-    step2_full_key = f"{step2_prefix}{vendor_name}_category_matching_proposals.json"
-    step2_1to1_key = f"{step2_prefix}{vendor_name}_category_matching_proposals_one_vendor_to_one_pim_match.json"
+    step2_keys_by_vendor: Dict[str, Dict[str, str]] = {}
+    for step2_vendor_name in batch_vendor_names or [vendor_name]:
+        step2_keys_by_vendor[step2_vendor_name] = {
+            "step2_full_key": f"{step2_prefix}{step2_vendor_name}_category_matching_proposals.json",
+            "step2_1to1_key": (
+                f"{step2_prefix}{step2_vendor_name}_category_matching_proposals_one_vendor_to_one_pim_match.json"
+            ),
+        }
 
-    category_mapping_reference_key = select_latest_category_mapping_reference(s3_client, input_bucket)
-    stable_training_set_key = "canonical_mappings/stable_training_sets/StableTrainingSet.json"
+    category_mapping_reference_key = select_latest_category_mapping_reference(storage_backend, input_bucket)
+    stable_training_set_key = STABLE_TRAINING_SET_MANIFEST_KEY
 
-    print(f"Resolved step2_full_key: s3://{input_bucket}/{step2_full_key}")
-    print(f"Resolved step2_1to1_key: s3://{input_bucket}/{step2_1to1_key}")
+    for step2_keys in step2_keys_by_vendor.values():
+        print(f"Resolved step2_full_key: s3://{input_bucket}/{step2_keys['step2_full_key']}")
+        print(f"Resolved step2_1to1_key: s3://{input_bucket}/{step2_keys['step2_1to1_key']}")
     print(f"Selected category mapping reference key: s3://{input_bucket}/{category_mapping_reference_key}")
     print(f"Stable training set key: s3://{input_bucket}/{stable_training_set_key}")
 
-    step2_full_exists = s3_key_exists(s3_client, input_bucket, step2_full_key)
-    step2_1to1_exists = s3_key_exists(s3_client, input_bucket, step2_1to1_key)
-    category_mapping_reference_exists = s3_key_exists(
-        s3_client, input_bucket, category_mapping_reference_key
+    category_mapping_reference_exists = (
+        storage_backend.head(input_bucket, category_mapping_reference_key) is not None
     )
-    stable_training_set_exists = s3_key_exists(s3_client, input_bucket, stable_training_set_key)
+    stable_training_set_exists = (
+        storage_backend.head(input_bucket, stable_training_set_key) is not None
+        or storage_backend.head(input_bucket, STABLE_TRAINING_SET_LEGACY_KEY) is not None
+    )
+
+    for step2_keys in step2_keys_by_vendor.values():
+        step2_full_key = step2_keys["step2_full_key"]
+        step2_1to1_key = step2_keys["step2_1to1_key"]
+        step2_full_exists = storage_backend.head(input_bucket, step2_full_key) is not None
+        step2_1to1_exists = storage_backend.head(input_bucket, step2_1to1_key) is not None
+        print(f"step2_full_exists: {step2_full_exists}")
+        print(f"step2_1to1_exists: {step2_1to1_exists}")
+
+        if not step2_full_exists:
+            raise FileNotFoundError(
+                f"Missing Step2 full proposals file at s3://{input_bucket}/{step2_full_key}"
+            )
+        if not step2_1to1_exists:
+            raise FileNotFoundError(
+                f"Missing Step2 1:1 proposals file at s3://{input_bucket}/{step2_1to1_key}"
+            )
 
-    print(f"step2_full_exists: {step2_full_exists}")
-    print(f"step2_1to1_exists: {step2_1to1_exists}")
     print(f"category_mapping_reference_exists: {category_mapping_reference_exists}")
     print(f"stable_training_set_exists: {stable_training_set_exists}")
 
-    if not step2_full_exists:
-        raise FileNotFoundError(
-            f"Missing Step2 full proposals file at s3://{input_bucket}/{step2_full_key}"
-        )
-    if not step2_1to1_exists:
-        raise FileNotFoundError(
-            f"Missing Step2 1:1 proposals file at s3://{input_bucket}/{step2_1to1_key}"
-        )
     if not category_mapping_reference_exists:
         raise FileNotFoundError(
             f"Missing selected category mapping reference file at s3://{input_bucket}/{category_mapping_reference_key}"
         )
 
-    receipt = {
-        "job_name": job_name,
-        "script_version": "v0.10_section8_reference_update_no_internal_state",
-        "run_id": run_id,
-        "vendor_name": vendor_name,
-        "prepared_input_key": prepared_input_key,
-        "prepared_output_prefix": prepared_output_prefix,
-        "input_bucket": input_bucket,
-        "output_bucket": output_bucket,
-        "step2_full_key": step2_full_key,
-        "step2_1to1_key": step2_1to1_key,
-        "category_mapping_reference_key_selected": category_mapping_reference_key,
-        "stable_training_set_key": stable_training_set_key,
-        "stable_training_set_exists": stable_training_set_exists,
-        "counts": {},
-        "outputs_written": {},
-        "notes": [],
-        "threshold_policy": THRESHOLD_POLICY,
-    }
+    def build_receipt(receipt_vendor_name: str, step2_keys: Dict[str, str]) -> dict:
+        return {
+            "job_name": job_name,
+            "script_version": "v0.10_section8_reference_update_no_internal_state",
+            "run_id": run_id,
+            "vendor_name": receipt_vendor_name,
+            "prepared_input_key": prepared_input_key,
+            "prepared_output_prefix": prepared_output_prefix,
+            "input_bucket": input_bucket,
+            "output_bucket": output_bucket,
+            **step2_keys,
+            "category_mapping_reference_key_selected": category_mapping_reference_key,
+            "stable_training_set_key": stable_training_set_key,
+            "stable_training_set_exists": stable_training_set_exists,
+            "counts": {},
+            "outputs_written": {},
+            "notes": [],
+            "threshold_policy": THRESHOLD_POLICY,
+            "unigram_evidence_build": {
+                "mode": optional_args["unigram_evidence_mode"],
+                "full_rebuild_interval": int(optional_args["unigram_evidence_full_rebuild_interval"]),
+                "engine": optional_args["unigram_evidence_engine"],
+            },
+            "pair_evidence_build": {
+                "mode": optional_args["pair_evidence_mode"],
+                "engine": optional_args["pair_evidence_engine"],
+                "counting": optional_args["pair_evidence_counting"],
+                "sketch_memory_mb": int(optional_args["pair_evidence_sketch_memory_mb"]),
+                "sketch_depth": PAIR_EVIDENCE_BUILD_DEFAULTS["sketch_depth"],
+                "max_candidate_pairs": int(optional_args["pair_evidence_max_candidate_pairs"]),
+            },
+            "rule_generation": {"workers": int(optional_args["rule_generation_workers"])},
+            "product_rule_hits_evaluation": {
+                "workers": int(optional_args["product_rule_hits_workers"]),
+                "chunk_size": int(optional_args["product_rule_hits_chunk_size"]),
+                "engine": optional_args["product_rule_hits_engine"],
+            },
+            "ndjson_output": {
+                "compression": optional_args["ndjson_output_compression"],
+                "part_size_mb": int(optional_args["ndjson_output_part_size_mb"]),
+            },
+            "performance": {
+                "trace_memory": optional_args["performance_trace_memory"].strip().lower() == "true",
+            },
+            "storage": storage_options,
+            "checkpoint": {"resume_run_id": optional_args["resume_run_id"]},
+            "threshold_policy_sweep": {"grid": threshold_policy_sweep_grid},
+            "stable_training_set": {
+                "manifest_repair": optional_args["stable_training_set_manifest_repair"].strip().lower() == "true",
+            },
+        }
 
-    run_receipt = run_pipeline_layers(receipt)
-    run_receipt.pop("internal_state", None)
+    def build_receipt_key(receipt_vendor_name: str) -> str:
+        return (
+            f"{prepared_output_prefix}/mappingMethodTraining/run_receipts/"
+            f"run_receipt_{receipt_vendor_name}_{run_id}.json"
+        )
 
-    if isinstance(run_receipt.get("notes"), str) and "CISTEM not used" in run_receipt["notes"]:
-        run_receipt.pop("notes", None)
-    elif isinstance(run_receipt.get("notes"), list):
-        run_receipt["notes"] = [
-            n for n in run_receipt["notes"] if not (isinstance(n, str) and "CISTEM not used" in n)
-        ]
-        if not run_receipt["notes"]:
+    def write_receipt(run_receipt: dict) -> None:
+        run_receipt.pop("internal_state", None)
+
+        if isinstance(run_receipt.get("notes"), str) and "CISTEM not used" in run_receipt["notes"]:
             run_receipt.pop("notes", None)
+        elif isinstance(run_receipt.get("notes"), list):
+            run_receipt["notes"] = [
+                n for n in run_receipt["notes"] if not (isinstance(n, str) and "CISTEM not used" in n)
+            ]
+            if not run_receipt["notes"]:
+                run_receipt.pop("notes", None)
+
+        receipt_body = json.dumps(run_receipt, indent=2)
+        receipt_key = build_receipt_key(run_receipt["vendor_name"])
+
+        storage_backend.put(output_bucket, receipt_key, receipt_body.encode("utf-8"))
+        print(
+            f"Run receipt written to s3://{output_bucket}/{receipt_key} with run_id {run_id}"
+        )
 
-    receipt_body = json.dumps(run_receipt, indent=2)
-    receipt_key = (
-        f"{prepared_output_prefix}/mappingMethodTraining/run_receipts/"
-        f"run_receipt_{vendor_name}_{run_id}.json"
-    )
+    if not batch_vendor_names:
+        receipt = build_receipt(vendor_name, step2_keys_by_vendor[vendor_name])
+        write_receipt(run_pipeline_layers(receipt, storage_backend=storage_backend))
+        return
+
+    batch_receipt = build_receipt(vendor_name, {})
+    batch_receipt["batch"] = {
+        "vendor_names": batch_vendor_names,
+        "vendor_workers": int(optional_args["batch_vendor_workers"]),
+        "vendor_run_receipt_keys": {
+            batch_vendor_name: build_receipt_key(batch_vendor_name) for batch_vendor_name in batch_vendor_names
+        },
+    }
+    vendor_receipts = []
+    for batch_vendor_name in batch_vendor_names:
+        vendor_receipt = build_receipt(batch_vendor_name, step2_keys_by_vendor[batch_vendor_name])
+        vendor_receipt["batch"] = {
+            "batch_name": vendor_name,
+            "vendor_names": batch_vendor_names,
+            "batch_run_receipt_key": build_receipt_key(vendor_name),
+        }
+        vendor_receipts.append(vendor_receipt)
 
-    s3_client.put_object(Bucket=output_bucket, Key=receipt_key, Body=receipt_body)
-    print(
-        f"Run receipt written to s3://{output_bucket}/{receipt_key} with run_id {run_id}"
+    batch_receipt, vendor_receipts = run_batch_pipeline_layers(
+        batch_receipt, vendor_receipts, storage_backend=storage_backend
     )
+    for vendor_receipt in vendor_receipts:
+        write_receipt(vendor_receipt)
+    write_receipt(batch_receipt)
 
 
 # === Section 2: ACTIVE (Placeholder for next steps) ===
 
 
-def section2_placeholder(run_receipt: dict) -> dict:
+def section2_placeholder(run_receipt: dict, artifact_store: ArtifactStore | None = None) -> dict:
     input_bucket = run_receipt["input_bucket"]
-    s3_client = boto3.client("s3")
-
-    def load_json_from_s3(bucket: str, key: str):
-        response = s3_client.get_object(Bucket=bucket, Key=key)
-        body = response["Body"].read().decode("utf-8")
-        return json.loads(body)
+    artifact_store = artifact_store or ArtifactStore(build_storage_backend(run_receipt.get("storage")))
 
-    def validate_step2_data(step2_data, context: str):
-        if not isinstance(step2_data, dict):
-            raise ValueError(f"{context}: top-level data must be a dict keyed by vendor_category_id")
+    def validate_step2_entry(vendor_category_id, vendor_category_data, context: str):
+        if not isinstance(vendor_category_data, dict):
+            raise ValueError(
+                f"{context}: vendor category '{vendor_category_id}' must be a dict, got {type(vendor_category_data).__name__}"
+            )
 
-        for vendor_category_id, vendor_category_data in step2_data.items():
-            if not isinstance(vendor_category_data, dict):
+        for required_key in ["vendor_mappings", "total_products_in_vendor_category", "pim_matches"]:
+            if required_key not in vendor_category_data:
                 raise ValueError(
-                    f"{context}: vendor category '{vendor_category_id}' must be a dict, got {type(vendor_category_data).__name__}"
+                    f"{context}: vendor category '{vendor_category_id}' missing required key '{required_key}'"
                 )
 
-            for required_key in ["vendor_mappings", "total_products_in_vendor_category", "pim_matches"]:
-                if required_key not in vendor_category_data:
+        pim_matches = vendor_category_data["pim_matches"]
+        if not isinstance(pim_matches, list):
+            raise ValueError(
+                f"{context}: vendor category '{vendor_category_id}' pim_matches must be a list"
+            )
+
+        for pim_match in pim_matches:
+            for required_key in ["pim_category_id", "assignment_source", "assignment_confidence", "products"]:
+                if required_key not in pim_match:
                     raise ValueError(
-                        f"{context}: vendor category '{vendor_category_id}' missing required key '{required_key}'"
+                        f"{context}: vendor category '{vendor_category_id}' pim_match missing required key '{required_key}'"
                     )
 
-            pim_matches = vendor_category_data["pim_matches"]
-            if not isinstance(pim_matches, list):
+            products = pim_match["products"]
+            if not isinstance(products, list):
                 raise ValueError(
-                    f"{context}: vendor category '{vendor_category_id}' pim_matches must be a list"
+                    f"{context}: vendor category '{vendor_category_id}' pim_match products must be a list"
                 )
 
-            for pim_match in pim_matches:
-                for required_key in ["pim_category_id", "assignment_source", "assignment_confidence", "products"]:
-                    if required_key not in pim_match:
-                        raise ValueError(
-                            f"{context}: vendor category '{vendor_category_id}' pim_match missing required key '{required_key}'"
-                        )
-
-                products = pim_match["products"]
-                if not isinstance(products, list):
+            for product in products:
+                if "article_id" not in product:
                     raise ValueError(
-                        f"{context}: vendor category '{vendor_category_id}' pim_match products must be a list"
+                        f"{context}: vendor category '{vendor_category_id}' product missing required key 'article_id'"
                     )
 
-                for product in products:
-                    if "article_id" not in product:
-                        raise ValueError(
-                            f"{context}: vendor category '{vendor_category_id}' product missing required key 'article_id'"
-                        )
+    def iter_step2_data(key: str, context: str):
+        # Step2 files are streamed one vendor category at a time and validated as they are read.
+        for vendor_category_id, vendor_category_data in artifact_store.iter_json_object(input_bucket, key):
+            validate_step2_entry(vendor_category_id, vendor_category_data, context)
+            yield vendor_category_data
 
     def validate_category_mapping_reference(reference_data):
         if not isinstance(reference_data, (dict, list)):
@@ -255,38 +1453,20 @@ def section2_placeholder(run_receipt: dict) -> dict:
             if "pim_category_id" not in entry:
                 raise ValueError("Category_Mapping_Reference entry missing required key 'pim_category_id'")
 
-    def validate_stable_training_set(training_set):
-        if training_set is None:
-            return
-        if not isinstance(training_set, (dict, list)):
-            raise ValueError("StableTrainingSet must be a dict or list when present")
-
-    step2_full = load_json_from_s3(input_bucket, run_receipt["step2_full_key"])
-    step2_1to1 = load_json_from_s3(input_bucket, run_receipt["step2_1to1_key"])
-    category_mapping_reference = load_json_from_s3(
-        input_bucket, run_receipt["category_mapping_reference_key_selected"]
-    )
-
-    stable_training_set = None
-    if run_receipt.get("stable_training_set_exists"):
-        stable_training_set = load_json_from_s3(input_bucket, run_receipt["stable_training_set_key"])
-
-    validate_step2_data(step2_full, "Step2 full proposals")
-    validate_step2_data(step2_1to1, "Step2 1:1 proposals")
-    validate_category_mapping_reference(category_mapping_reference)
-    validate_stable_training_set(stable_training_set)
-
     run_receipt.setdefault("counts", {})
     run_receipt.setdefault("notes", [])
 
-    step2_full_vendor_category_count = len(step2_full)
-    step2_1to1_vendor_category_count = len(step2_1to1)
+    step2_full_vendor_category_count = sum(
+        1 for _ in iter_step2_data(run_receipt["step2_full_key"], "Step2 full proposals")
+    )
+    step2_1to1_vendor_category_count = 0
     existing_category_match_vendor_category_count = 0
     total_products_1to1 = 0
     missing_keywords_products = 0
     missing_description_products = 0
 
-    for vendor_category_data in step2_1to1.values():
+    for vendor_category_data in iter_step2_data(run_receipt["step2_1to1_key"], "Step2 1:1 proposals"):
+        step2_1to1_vendor_category_count += 1
         pim_matches = vendor_category_data.get("pim_matches", [])
         if len(pim_matches) == 1:
             only_match = pim_matches[0]
@@ -308,6 +1488,11 @@ def section2_placeholder(run_receipt: dict) -> dict:
                 if not description_short:
                     missing_description_products += 1
 
+    category_mapping_reference = artifact_store.load_json(
+        input_bucket, run_receipt["category_mapping_reference_key_selected"]
+    )
+    validate_category_mapping_reference(category_mapping_reference)
+
     if isinstance(category_mapping_reference, dict):
         pim_category_entry_count = len(category_mapping_reference)
     else:
@@ -315,10 +1500,9 @@ def section2_placeholder(run_receipt: dict) -> dict:
 
     stable_training_set_exists = bool(run_receipt.get("stable_training_set_exists"))
     if stable_training_set_exists:
-        if isinstance(stable_training_set, dict):
-            stable_training_set_record_count = len(stable_training_set)
-        else:
-            stable_training_set_record_count = len(stable_training_set)
+        stable_training_set_record_count = count_stable_training_set_records(
+            artifact_store, input_bucket, run_receipt["stable_training_set_key"]
+        )
     else:
         stable_training_set_record_count = 0
 
@@ -350,98 +1534,396 @@ def section2_placeholder(run_receipt: dict) -> dict:
     return run_receipt
 
 
-def layer_a_truth_training_base(run_receipt: dict) -> dict:
-    run_receipt = section2_placeholder(run_receipt)
-    run_receipt = section3_extract_stable_training_delta(run_receipt)
-    run_receipt = section4_upsert_stable_training_set(run_receipt)
-    return run_receipt
+def layer_a_truth_training_base(
+    run_receipt: dict, artifact_store: ArtifactStore, checkpoint: RunCheckpoint
+) -> Tuple[dict, dict]:
+    run_section = checkpoint.run_section
+    run_receipt = run_section("layer_a", section2_placeholder, run_receipt, artifact_store=artifact_store)
+    run_receipt = run_section(
+        "layer_a", section3_extract_stable_training_delta, run_receipt, artifact_store=artifact_store
+    )
+    run_receipt, stable_training_set_changes = run_section(
+        "layer_a", section4_upsert_stable_training_set, run_receipt, artifact_store=artifact_store
+    )
+    return run_receipt, stable_training_set_changes
 
 
-def layer_b_evidence_build(run_receipt: dict) -> dict:
-    run_receipt = section5_build_unigram_evidence(run_receipt)
-    run_receipt = section6_6_build_pair_evidence(run_receipt)
-    return run_receipt
+def layer_b_evidence_build(
+    run_receipt: dict,
+    artifact_store: ArtifactStore,
+    checkpoint: RunCheckpoint,
+    stable_training_set_changes: dict | None = None,
+) -> Tuple[dict, dict]:
+    run_section = checkpoint.run_section
+    run_receipt, training_corpus = run_section(
+        "layer_b", section4_5_build_tokenized_training_corpus, run_receipt, artifact_store=artifact_store
+    )
+    run_receipt, training_delta = run_section(
+        "layer_b",
+        section5_build_unigram_evidence,
+        run_receipt,
+        training_corpus=training_corpus,
+        artifact_store=artifact_store,
+        stable_training_set_changes=stable_training_set_changes,
+    )
+    run_receipt = run_section(
+        "layer_b",
+        section6_6_build_pair_evidence,
+        run_receipt,
+        training_corpus=training_corpus,
+        artifact_store=artifact_store,
+        training_delta=training_delta,
+    )
+    return run_receipt, training_corpus
 
 
-def layer_c_rule_build(run_receipt: dict) -> dict:
-    run_receipt, field_globals = section6_1_load_field_globals(run_receipt)
-    run_receipt, rules_by_pim_category, rules_summary = section6_2_generate_contains_any_rules(
-        run_receipt, field_globals
+def layer_c_rule_generation(
+    run_receipt: dict, artifact_store: ArtifactStore, checkpoint: RunCheckpoint
+) -> Tuple[dict, dict, Dict[str, List[dict]]]:
+    run_section = checkpoint.run_section
+    run_receipt, field_globals = run_section(
+        "layer_c", section6_1_load_field_globals, run_receipt, artifact_store=artifact_store
     )
-    run_receipt, rules_by_pim_category, rules_summary = section6_7_generate_contains_all_rules(
-        run_receipt, rules_by_pim_category, rules_summary
+    run_receipt, rules_by_pim_category, rules_summary = run_section(
+        "layer_c",
+        section6_2_generate_contains_any_rules,
+        run_receipt,
+        field_globals,
+        artifact_store=artifact_store,
     )
-    run_receipt, rules_by_pim_category, rules_summary = (
-        section6_8_generate_contains_any_exclude_any_rules(
-            run_receipt, field_globals, rules_by_pim_category, rules_summary
-        )
+    run_receipt, rules_by_pim_category, rules_summary = run_section(
+        "layer_c",
+        section6_7_generate_contains_all_rules,
+        run_receipt,
+        rules_by_pim_category,
+        rules_summary,
+        artifact_store=artifact_store,
     )
-    run_receipt = section6_3_write_rules_snapshot(
+    run_receipt, rules_by_pim_category, rules_summary = run_section(
+        "layer_c",
+        section6_8_generate_contains_any_exclude_any_rules,
+        run_receipt,
+        field_globals,
+        rules_by_pim_category,
+        rules_summary,
+        artifact_store=artifact_store,
+    )
+    run_receipt = run_section(
+        "layer_c",
+        section6_3_write_rules_snapshot,
         run_receipt,
         field_globals=field_globals,
         rules_by_pim_category=rules_by_pim_category,
         rules_summary=rules_summary,
+        artifact_store=artifact_store,
     )
-    run_receipt = section6_9_write_product_rule_hits(
+    return run_receipt, field_globals, rules_by_pim_category
+
+
+def layer_c_vendor_rule_validation(
+    run_receipt: dict,
+    artifact_store: ArtifactStore,
+    checkpoint: RunCheckpoint,
+    rules_by_pim_category: Dict[str, List[dict]] | None = None,
+    field_globals: dict | None = None,
+    training_corpus: dict | None = None,
+) -> dict:
+    run_section = checkpoint.run_section
+    run_receipt, rule_hit_aggregates = run_section(
+        "layer_c",
+        section6_9_write_product_rule_hits,
         run_receipt,
         rules_by_pim_category=rules_by_pim_category,
         field_globals=field_globals,
+        training_corpus=training_corpus,
+        artifact_store=artifact_store,
+    )
+    run_receipt, rule_hit_aggregates = run_section(
+        "layer_c",
+        section7_1_write_vendor_category_product_rule_hits,
+        run_receipt,
+        artifact_store=artifact_store,
+        rule_hit_aggregates=rule_hit_aggregates,
+    )
+    run_receipt = run_section(
+        "layer_c",
+        section7_2_write_rule_validation_status,
+        run_receipt,
+        artifact_store=artifact_store,
+        rule_hit_aggregates=rule_hit_aggregates,
+    )
+    run_receipt = run_section(
+        "layer_c", section7_3_write_vendor_category_mapping_status, run_receipt, artifact_store=artifact_store
+    )
+    run_receipt = run_section(
+        "layer_c",
+        section7_4_write_threshold_policy_sweep,
+        run_receipt,
+        field_globals=field_globals,
+        training_corpus=training_corpus,
+        artifact_store=artifact_store,
     )
-    run_receipt = section7_1_write_vendor_category_product_rule_hits(run_receipt)
-    run_receipt = section7_2_write_rule_validation_status(run_receipt)
-    run_receipt = section7_3_write_vendor_category_mapping_status(run_receipt)
-    run_receipt = section8_update_category_mapping_reference(run_receipt)
     return run_receipt
 
 
-def run_pipeline_layers(run_receipt: dict) -> dict:
-    run_receipt = layer_a_truth_training_base(run_receipt)
-    run_receipt = layer_b_evidence_build(run_receipt)
-    run_receipt = layer_c_rule_build(run_receipt)
+def layer_c_rule_build(
+    run_receipt: dict,
+    artifact_store: ArtifactStore,
+    checkpoint: RunCheckpoint,
+    training_corpus: dict | None = None,
+) -> dict:
+    run_receipt, field_globals, rules_by_pim_category = layer_c_rule_generation(
+        run_receipt, artifact_store, checkpoint
+    )
+    run_receipt = layer_c_vendor_rule_validation(
+        run_receipt,
+        artifact_store,
+        checkpoint,
+        rules_by_pim_category=rules_by_pim_category,
+        field_globals=field_globals,
+        training_corpus=training_corpus,
+    )
+    run_receipt = checkpoint.run_section(
+        "layer_c", section8_update_category_mapping_reference, run_receipt, artifact_store=artifact_store
+    )
     return run_receipt
 
 
-# === Section 3: ACTIVE (Extract StableTrainingSet delta from Step2 1:1 existing_category_match only) ===
-
+def run_pipeline_layers(run_receipt: dict, storage_backend=None) -> dict:
+    # One store per run: artifacts produced upstream are handed to later sections in memory.
+    performance_options = {**PERFORMANCE_DEFAULTS, **(run_receipt.get("performance") or {})}
+    performance = PipelinePerformance(trace_memory=bool(performance_options["trace_memory"]))
+    artifact_store = ArtifactStore(
+        storage_backend or build_storage_backend(run_receipt.get("storage")),
+        ndjson_output_options=run_receipt.get("ndjson_output"),
+        performance=performance,
+    )
+    checkpoint_options = {**RUN_CHECKPOINT_DEFAULTS, **(run_receipt.get("checkpoint") or {})}
+    checkpoint = RunCheckpoint(artifact_store, run_receipt)
+    if checkpoint_options["resume_run_id"]:
+        if checkpoint_options["resume_run_id"] != run_receipt["run_id"]:
+            raise ValueError(
+                f"checkpoint resume_run_id '{checkpoint_options['resume_run_id']}' must equal "
+                f"run_id '{run_receipt['run_id']}'"
+            )
+        run_receipt = checkpoint.resume(run_receipt)
+    run_receipt.setdefault("outputs_written", {})["run_checkpoint_key"] = checkpoint.key
+    try:
+        run_receipt, stable_training_set_changes = layer_a_truth_training_base(
+            run_receipt, artifact_store, checkpoint
+        )
+        performance.summarize_layer("layer_a")
+        run_receipt, training_corpus = layer_b_evidence_build(
+            run_receipt, artifact_store, checkpoint, stable_training_set_changes=stable_training_set_changes
+        )
+        performance.summarize_layer("layer_b")
+        run_receipt = layer_c_rule_build(
+            run_receipt, artifact_store, checkpoint, training_corpus=training_corpus
+        )
+        performance.summarize_layer("layer_c")
+    finally:
+        if performance.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+    run_receipt["performance"] = performance.to_receipt()
+    return run_receipt
 
-def section3_extract_stable_training_delta(run_receipt: dict) -> dict:
-    input_bucket = run_receipt["input_bucket"]
-    output_bucket = run_receipt["output_bucket"]
-    vendor_name = run_receipt["vendor_name"]
-    prepared_output_prefix = run_receipt["prepared_output_prefix"]
-    run_id = run_receipt["run_id"]
 
-    s3_client = boto3.client("s3")
+# Read-only rules and corpus of the running batch; forked vendor workers inherit them copy-on-write.
+_BATCH_VENDOR_SHARED: dict = {}
 
-    def load_json_from_s3(bucket: str, key: str):
-        response = s3_client.get_object(Bucket=bucket, Key=key)
-        body = response["Body"].read().decode("utf-8")
-        return json.loads(body)
 
-    def filter_product_fields(product: dict) -> dict:
-        return {
-            "article_id": product.get("article_id"),
-            "description_short": product.get("description_short"),
-            "keywords": product.get("keywords"),
-            "class_codes": product.get("class_codes"),
-        }
+def run_vendor_rule_validation(vendor_run_receipt: dict, storage_backend) -> dict:
+    # Sections 6.9-7.4 of one batch vendor, with its own store and performance block.
+    performance_options = {**PERFORMANCE_DEFAULTS, **(vendor_run_receipt.get("performance") or {})}
+    performance = PipelinePerformance(trace_memory=bool(performance_options["trace_memory"]))
+    artifact_store = ArtifactStore(
+        storage_backend,
+        ndjson_output_options=vendor_run_receipt.get("ndjson_output"),
+        performance=performance,
+    )
+    vendor_run_receipt = layer_c_vendor_rule_validation(
+        vendor_run_receipt,
+        artifact_store,
+        UncheckpointedRun(artifact_store),
+        rules_by_pim_category=_BATCH_VENDOR_SHARED["rules_by_pim_category"],
+        field_globals=_BATCH_VENDOR_SHARED["field_globals"],
+        training_corpus=_BATCH_VENDOR_SHARED["training_corpus"],
+    )
+    performance.summarize_layer("layer_c")
+    vendor_run_receipt["performance"] = performance.to_receipt()
+    return vendor_run_receipt
 
-    step2_1to1 = load_json_from_s3(input_bucket, run_receipt["step2_1to1_key"])
 
-    delta_records = []
-    total_product_count = 0
+def _run_forked_vendor_rule_validation(vendor_run_receipt: dict) -> dict:
+    # Pool workers are daemonic and cannot start the section 6.9 (or 7.4 sweep) pools of their own.
+    vendor_run_receipt["product_rule_hits_evaluation"] = {
+        **(vendor_run_receipt.get("product_rule_hits_evaluation") or {}),
+        "workers": 1,
+    }
+    vendor_run_receipt["rule_generation"] = {**(vendor_run_receipt.get("rule_generation") or {}), "workers": 1}
+    return run_vendor_rule_validation(
+        vendor_run_receipt, build_storage_backend(vendor_run_receipt.get("storage"))
+    )
 
-    for vendor_category_id, vendor_category_data in step2_1to1.items():
-        pim_matches = vendor_category_data.get("pim_matches", [])
-        if len(pim_matches) != 1:
-            continue
 
-        only_match = pim_matches[0]
-        if (
-            only_match.get("assignment_source") != "existing_category_match"
-            or only_match.get("pim_category_id") == "UNMATCHED"
-        ):
-            continue
+def validate_batch_vendor_rules(
+    run_receipt: dict,
+    vendor_run_receipts: List[dict],
+    storage_backend,
+    rules_by_pim_category: Dict[str, List[dict]],
+    field_globals: dict,
+    training_corpus: dict,
+    vendor_workers: int,
+) -> List[dict]:
+    # Every vendor is validated against the rules of the batch. Vendor receipts take the shared
+    # outputs (StableTrainingSet, evidence, rules snapshot) from the batch receipt. storage_backend
+    # is the uninstrumented backend: vendor I/O is counted in the vendor performance blocks only,
+    # as it is when forked workers build their own backends.
+    shared_outputs = {
+        key: value
+        for key, value in run_receipt["outputs_written"].items()
+        if key != "stable_training_delta_keys_by_vendor"
+    }
+    for vendor_run_receipt in vendor_run_receipts:
+        vendor_outputs = vendor_run_receipt.setdefault("outputs_written", {})
+        for key, value in shared_outputs.items():
+            vendor_outputs.setdefault(key, value)
+
+    _BATCH_VENDOR_SHARED.update(
+        {
+            "rules_by_pim_category": rules_by_pim_category,
+            "field_globals": field_globals,
+            "training_corpus": training_corpus,
+        }
+    )
+    try:
+        if vendor_workers <= 1 or len(vendor_run_receipts) <= 1:
+            return [
+                run_vendor_rule_validation(vendor_run_receipt, storage_backend)
+                for vendor_run_receipt in vendor_run_receipts
+            ]
+        with multiprocessing.get_context("fork").Pool(
+            processes=min(vendor_workers, len(vendor_run_receipts))
+        ) as pool:
+            return pool.map(_run_forked_vendor_rule_validation, vendor_run_receipts, chunksize=1)
+    finally:
+        _BATCH_VENDOR_SHARED.clear()
+
+
+def run_batch_pipeline_layers(
+    run_receipt: dict, vendor_run_receipts: List[dict], storage_backend=None
+) -> Tuple[dict, List[dict]]:
+    # One run over several vendors: sections 2 and 3 per vendor, one section 4 upsert of all deltas,
+    # layer B and rule generation once, sections 6.9-7.4 per vendor and one section 8 reference update.
+    batch_options = {**BATCH_RUN_DEFAULTS, **(run_receipt.get("batch") or {})}
+    vendor_workers = resolve_worker_count(batch_options["vendor_workers"], "batch")
+    storage_options = {**STORAGE_DEFAULTS, **(run_receipt.get("storage") or {})}
+    if vendor_workers > 1 and storage_options["backend"] == "memory":
+        raise ValueError("batch vendor_workers > 1 needs a storage backend shared across processes (s3 or local)")
+    if (run_receipt.get("checkpoint") or {}).get("resume_run_id"):
+        raise ValueError("checkpoint resume_run_id is not supported for batch runs")
+
+    performance_options = {**PERFORMANCE_DEFAULTS, **(run_receipt.get("performance") or {})}
+    performance = PipelinePerformance(trace_memory=bool(performance_options["trace_memory"]))
+    storage_backend = storage_backend or build_storage_backend(run_receipt.get("storage"))
+    artifact_store = ArtifactStore(
+        storage_backend,
+        ndjson_output_options=run_receipt.get("ndjson_output"),
+        performance=performance,
+    )
+    checkpoint = UncheckpointedRun(artifact_store)
+    run_section = checkpoint.run_section
+    try:
+        for vendor_run_receipt in vendor_run_receipts:
+            run_section("layer_a", section2_placeholder, vendor_run_receipt, artifact_store=artifact_store)
+            run_section(
+                "layer_a", section3_extract_stable_training_delta, vendor_run_receipt, artifact_store=artifact_store
+            )
+        run_receipt.setdefault("outputs_written", {})["stable_training_delta_keys_by_vendor"] = {
+            vendor_run_receipt["vendor_name"]: vendor_run_receipt["outputs_written"]["stable_training_delta_key"]
+            for vendor_run_receipt in vendor_run_receipts
+        }
+        run_receipt, stable_training_set_changes = run_section(
+            "layer_a", section4_upsert_stable_training_set, run_receipt, artifact_store=artifact_store
+        )
+        performance.summarize_layer("layer_a")
+        run_receipt, training_corpus = layer_b_evidence_build(
+            run_receipt, artifact_store, checkpoint, stable_training_set_changes=stable_training_set_changes
+        )
+        performance.summarize_layer("layer_b")
+        run_receipt, field_globals, rules_by_pim_category = layer_c_rule_generation(
+            run_receipt, artifact_store, checkpoint
+        )
+        vendor_run_receipts = run_section(
+            "layer_c",
+            validate_batch_vendor_rules,
+            run_receipt,
+            vendor_run_receipts,
+            storage_backend,
+            rules_by_pim_category,
+            field_globals,
+            training_corpus,
+            vendor_workers,
+        )
+        run_receipt["outputs_written"]["rule_validation_status_keys"] = [
+            vendor_run_receipt["outputs_written"]["rule_validation_status_key"]
+            for vendor_run_receipt in vendor_run_receipts
+        ]
+        run_receipt = run_section(
+            "layer_c", section8_update_category_mapping_reference, run_receipt, artifact_store=artifact_store
+        )
+        performance.summarize_layer("layer_c")
+    finally:
+        if performance.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+    run_receipt["performance"] = performance.to_receipt()
+
+    for vendor_run_receipt in vendor_run_receipts:
+        vendor_run_receipt["outputs_written"]["category_mapping_reference_key_written"] = run_receipt[
+            "outputs_written"
+        ]["category_mapping_reference_key_written"]
+        vendor_run_receipt["reference_update"] = run_receipt["reference_update"]
+    return run_receipt, vendor_run_receipts
+
+
+# === Section 3: ACTIVE (Extract StableTrainingSet delta from Step2 1:1 existing_category_match only) ===
+
+
+def section3_extract_stable_training_delta(
+    run_receipt: dict, artifact_store: ArtifactStore | None = None
+) -> dict:
+    input_bucket = run_receipt["input_bucket"]
+    output_bucket = run_receipt["output_bucket"]
+    vendor_name = run_receipt["vendor_name"]
+    prepared_output_prefix = run_receipt["prepared_output_prefix"]
+    run_id = run_receipt["run_id"]
+
+    artifact_store = artifact_store or ArtifactStore(build_storage_backend(run_receipt.get("storage")))
+
+    def filter_product_fields(product: dict) -> dict:
+        return {
+            "article_id": product.get("article_id"),
+            "description_short": product.get("description_short"),
+            "keywords": product.get("keywords"),
+            "class_codes": product.get("class_codes"),
+        }
+
+    delta_records = []
+    total_product_count = 0
+
+    for vendor_category_id, vendor_category_data in artifact_store.iter_json_object(
+        input_bucket, run_receipt["step2_1to1_key"]
+    ):
+        pim_matches = vendor_category_data.get("pim_matches", [])
+        if len(pim_matches) != 1:
+            continue
+
+        only_match = pim_matches[0]
+        if (
+            only_match.get("assignment_source") != "existing_category_match"
+            or only_match.get("pim_category_id") == "UNMATCHED"
+        ):
+            continue
 
         vendor_mappings = vendor_category_data.get("vendor_mappings", {})
         vendor_short_name = vendor_mappings.get("vendor_short_name") or vendor_name
@@ -468,18 +1950,12 @@ def section3_extract_stable_training_delta(run_receipt: dict) -> dict:
         delta_records.append(delta_record)
         total_product_count += len(filtered_products)
 
-    delta_body = json.dumps(delta_records, indent=2)
-
     stable_training_delta_key = (
         f"{prepared_output_prefix}/mappingMethodTraining/stable_training_deltas/"
         f"stable_training_delta_{vendor_name}_{run_id}.json"
     )
 
-    s3_client.put_object(
-        Bucket=output_bucket,
-        Key=stable_training_delta_key,
-        Body=delta_body,
-    )
+    artifact_store.put_json(output_bucket, stable_training_delta_key, delta_records)
 
     run_receipt.setdefault("outputs_written", {})[
         "stable_training_delta_key"
@@ -501,71 +1977,313 @@ def section3_extract_stable_training_delta(run_receipt: dict) -> dict:
 # === Section 4: ACTIVE (Upsert global StableTrainingSet using delta + lineage) ===
 
 
-def section4_upsert_stable_training_set(run_receipt: dict) -> dict:
-    input_bucket = run_receipt["input_bucket"]
-    output_bucket = run_receipt["output_bucket"]
-    vendor_name = run_receipt["vendor_name"]
-    run_id = run_receipt["run_id"]
-    stable_training_set_key = run_receipt["stable_training_set_key"]
-    stable_training_set_exists = run_receipt.get("stable_training_set_exists", False)
-    delta_key = run_receipt.get("outputs_written", {}).get("stable_training_delta_key")
+STABLE_TRAINING_SET_MANIFEST_KEY = "canonical_mappings/stable_training_sets/StableTrainingSet_manifest_v1.json"
+STABLE_TRAINING_SET_SHARD_PREFIX = "canonical_mappings/stable_training_sets/shards/"
+STABLE_TRAINING_SET_LEGACY_KEY = "canonical_mappings/stable_training_sets/StableTrainingSet.json"
+STABLE_TRAINING_SET_MANIFEST_SCHEMA_VERSION = "StableTrainingSet_ShardManifest_v1"
+STABLE_TRAINING_SET_MANIFEST_WRITE_ATTEMPTS = 5
 
-    if not delta_key:
-        raise ValueError("stable_training_delta_key missing from run_receipt outputs")
 
-    s3_client = boto3.client("s3")
+def stable_training_set_shard_id(stable_training_key: str) -> str:
+    # Records are keyed vendor::vendor_category_id, so one vendor's upserts touch a single shard.
+    return stable_training_key.split("::", 1)[0]
 
-    def load_json_from_s3(bucket: str, key: str):
-        response = s3_client.get_object(Bucket=bucket, Key=key)
-        body = response["Body"].read().decode("utf-8")
-        return json.loads(body)
 
-    if stable_training_set_exists:
-        stable_training_set = load_json_from_s3(input_bucket, stable_training_set_key)
-        if not isinstance(stable_training_set, dict):
-            raise ValueError("StableTrainingSet must be a JSON object keyed by vendor::category")
-    else:
-        stable_training_set = {}
+def build_stable_training_set_shard_key(shard_id: str) -> str:
+    return f"{STABLE_TRAINING_SET_SHARD_PREFIX}StableTrainingSet_{shard_id}.ndjson"
 
-    delta_records = load_json_from_s3(output_bucket, delta_key)
-    if not isinstance(delta_records, list):
-        raise ValueError("StableTrainingSet delta must be a JSON list")
 
-    created_key_count = 0
-    updated_key_count = 0
+def fingerprint_stable_training_set_shards(shards: Dict[str, dict]) -> str:
+    digest = hashlib.sha1()
+    for shard_id, shard_entry in shards.items():
+        digest.update(f"{shard_id}\t{shard_entry['sha1']}\n".encode("utf-8"))
+    return digest.hexdigest()
 
-    for record in delta_records:
-        if not isinstance(record, dict):
-            raise ValueError("Each delta record must be a JSON object")
-        vendor_category_id = record.get("vendor_category_id")
-        if vendor_category_id is None:
-            raise ValueError("Delta record missing required field 'vendor_category_id'")
 
-        upsert_key = f"{vendor_name}::{vendor_category_id}"
-        existing_record = stable_training_set.get(upsert_key) or {}
+def load_stable_training_set_manifest(artifact_store: ArtifactStore, bucket: str, manifest_key: str) -> dict | None:
+    manifest = artifact_store.load_json_if_exists(bucket, manifest_key)
+    validate_stable_training_set_manifest(manifest, bucket, manifest_key)
+    return manifest
 
-        first_seen_run_id = existing_record.get("first_seen_run_id") or run_id
 
-        new_record = dict(record)
-        new_record["first_seen_run_id"] = first_seen_run_id
-        new_record["last_seen_run_id"] = run_id
+def validate_stable_training_set_manifest(manifest, bucket: str, manifest_key: str) -> None:
+    if manifest is not None and (
+        not isinstance(manifest, dict)
+        or manifest.get("schema_version") != STABLE_TRAINING_SET_MANIFEST_SCHEMA_VERSION
+        or not isinstance(manifest.get("shards"), dict)
+    ):
+        raise ValueError(
+            f"StableTrainingSet manifest at s3://{bucket}/{manifest_key} is not a "
+            f"{STABLE_TRAINING_SET_MANIFEST_SCHEMA_VERSION} object"
+        )
 
-        if upsert_key in stable_training_set:
-            updated_key_count += 1
-        else:
-            created_key_count += 1
 
-        stable_training_set[upsert_key] = new_record
+def iter_stable_training_set_shard(artifact_store: ArtifactStore, bucket: str, shard_entry: dict):
+    # The shard SHA-1 is only known once the stream is exhausted, so a mismatch fails the section
+    # after its records were consumed.
+    for line in artifact_store.iter_ndjson(bucket, shard_entry["key"]):
+        yield line["key"], line["record"]
+    if artifact_store.ndjson_sha1(bucket, shard_entry["key"]) != shard_entry["sha1"]:
+        raise ValueError(
+            f"StableTrainingSet shard s3://{bucket}/{shard_entry['key']} does not match the manifest sha1; "
+            "rerun with stable_training_set_manifest_repair=true to re-record it from the shard"
+        )
 
-    stable_training_body = json.dumps(stable_training_set, indent=2)
 
-    s3_client.put_object(
-        Bucket=input_bucket,
-        Key=stable_training_set_key,
-        Body=stable_training_body,
+def iter_stable_training_set(artifact_store: ArtifactStore, bucket: str, manifest_key: str):
+    # Streams (key, record) pairs of all shards in manifest order. Until the first section 4 run
+    # migrates it, the monolithic StableTrainingSet.json is streamed instead.
+    manifest = load_stable_training_set_manifest(artifact_store, bucket, manifest_key)
+    if manifest is None:
+        try:
+            yield from artifact_store.iter_json_object(bucket, STABLE_TRAINING_SET_LEGACY_KEY)
+        except ValueError as exc:
+            raise ValueError(f"StableTrainingSet must be a JSON object keyed by vendor::category: {exc}") from exc
+        return
+    for shard_entry in manifest["shards"].values():
+        yield from iter_stable_training_set_shard(artifact_store, bucket, shard_entry)
+
+
+def count_stable_training_set_records(artifact_store: ArtifactStore, bucket: str, manifest_key: str) -> int:
+    manifest = load_stable_training_set_manifest(artifact_store, bucket, manifest_key)
+    if manifest is None:
+        return sum(1 for _ in iter_stable_training_set(artifact_store, bucket, manifest_key))
+    return manifest["record_count"]
+
+
+def stable_training_set_content_sha1(artifact_store: ArtifactStore, bucket: str, manifest_key: str) -> str:
+    manifest = load_stable_training_set_manifest(artifact_store, bucket, manifest_key)
+    if manifest is None:
+        return artifact_store.json_sha1(bucket, STABLE_TRAINING_SET_LEGACY_KEY)
+    return manifest["content_sha1"]
+
+
+def update_stable_training_set_manifest(
+    artifact_store: ArtifactStore,
+    bucket: str,
+    manifest_key: str,
+    shard_entries: Dict[str, dict],
+    run_id: str,
+    expect_new_manifest: bool = False,
+) -> dict:
+    # Read-modify-write against the current manifest, not the copy loaded at the start of the run:
+    # only the given shard entries are replaced, so entries written by an overlapping run of
+    # another vendor are kept. The write is conditional on the ETag read, and retried on conflict.
+    for attempt in range(1, STABLE_TRAINING_SET_MANIFEST_WRITE_ATTEMPTS + 1):
+        current_manifest, etag = artifact_store.reload_json(bucket, manifest_key)
+        validate_stable_training_set_manifest(current_manifest, bucket, manifest_key)
+        if expect_new_manifest and current_manifest is not None:
+            raise RuntimeError(
+                f"StableTrainingSet manifest s3://{bucket}/{manifest_key} was created by an overlapping run "
+                "while this run migrated the legacy StableTrainingSet; rerun with "
+                "stable_training_set_manifest_repair=true"
+            )
+        shards = dict(current_manifest["shards"]) if current_manifest is not None else {}
+        shards.update(shard_entries)
+        manifest = {
+            "schema_version": STABLE_TRAINING_SET_MANIFEST_SCHEMA_VERSION,
+            "updated_at_run_id": run_id,
+            "record_count": sum(shard_entry["record_count"] for shard_entry in shards.values()),
+            "content_sha1": fingerprint_stable_training_set_shards(shards),
+            "shards": shards,
+        }
+        if artifact_store.put_json_if_match(bucket, manifest_key, manifest, etag):
+            return manifest
+        print(
+            f"StableTrainingSet manifest s3://{bucket}/{manifest_key} changed since it was read; "
+            f"retrying ({attempt}/{STABLE_TRAINING_SET_MANIFEST_WRITE_ATTEMPTS})"
+        )
+    raise RuntimeError(
+        f"StableTrainingSet manifest s3://{bucket}/{manifest_key} kept changing; "
+        f"gave up after {STABLE_TRAINING_SET_MANIFEST_WRITE_ATTEMPTS} attempts"
     )
 
+
+def write_stable_training_set_shards(
+    artifact_store: ArtifactStore,
+    bucket: str,
+    manifest_key: str,
+    stable_training_set: dict,
+    touched_shard_ids: Set[str],
+    run_id: str,
+) -> dict:
+    # Rewrites the touched shards, or every shard when there is no manifest yet, then the manifest.
+    previous_manifest = load_stable_training_set_manifest(artifact_store, bucket, manifest_key)
+
+    lines_by_shard: Dict[str, List[dict]] = defaultdict(list)
+    for stable_training_key, record in stable_training_set.items():
+        shard_id = stable_training_set_shard_id(stable_training_key)
+        if previous_manifest is None or shard_id in touched_shard_ids:
+            lines_by_shard[shard_id].append({"key": stable_training_key, "record": record})
+
+    shard_entries: Dict[str, dict] = {}
+    shard_etags: Dict[str, str] = {}
+    for shard_id, lines in lines_by_shard.items():
+        shard_key = artifact_store.put_ndjson(
+            bucket, build_stable_training_set_shard_key(shard_id), lines, compress=False
+        )
+        shard_entries[shard_id] = {
+            "key": shard_key,
+            "record_count": len(lines),
+            "sha1": artifact_store.ndjson_sha1(bucket, shard_key),
+        }
+        shard_etags[shard_id] = artifact_store.storage.head(bucket, shard_key)["etag"]
+
+    manifest = previous_manifest
+    if lines_by_shard or previous_manifest is None:
+        # An overlapping run of the same vendor may have replaced a shard after it was written here;
+        # its manifest entry then belongs to that run.
+        for shard_id, shard_entry in shard_entries.items():
+            head = artifact_store.storage.head(bucket, shard_entry["key"])
+            if head is None or head["etag"] != shard_etags[shard_id]:
+                raise RuntimeError(
+                    f"StableTrainingSet shard s3://{bucket}/{shard_entry['key']} was rewritten by an "
+                    "overlapping run; its manifest entry is left to that run, rerun this one"
+                )
+        manifest = update_stable_training_set_manifest(
+            artifact_store,
+            bucket,
+            manifest_key,
+            shard_entries,
+            run_id,
+            expect_new_manifest=previous_manifest is None,
+        )
+
+    return {
+        "shard_count": len(manifest["shards"]),
+        "shards_written": sorted(lines_by_shard),
+        "migrated_from_legacy": previous_manifest is None,
+    }
+
+
+def repair_stable_training_set_manifest(
+    artifact_store: ArtifactStore, bucket: str, manifest_key: str, run_id: str
+) -> dict:
+    # Re-records every shard under the shard prefix from its current object: SHA-1 and record
+    # count, so a manifest left with a stale entry (or none) for a shard is usable again.
+    shard_entries: Dict[str, dict] = {}
+    for shard_key in artifact_store.storage.list(bucket, STABLE_TRAINING_SET_SHARD_PREFIX):
+        file_name = shard_key[len(STABLE_TRAINING_SET_SHARD_PREFIX):]
+        if not (file_name.startswith("StableTrainingSet_") and file_name.endswith(".ndjson")):
+            continue
+        shard_id = file_name[len("StableTrainingSet_"):-len(".ndjson")]
+        content_sha1 = hashlib.sha1()
+        readable = artifact_store.storage.stream(bucket, shard_key)
+        try:
+            record_count = sum(1 for line in iter_stream_lines(readable, content_sha1) if line.strip())
+        finally:
+            readable.close()
+        shard_entries[shard_id] = {"key": shard_key, "record_count": record_count, "sha1": content_sha1.hexdigest()}
+    if not shard_entries:
+        # Nothing migrated yet: the legacy StableTrainingSet.json stays the source.
+        return {"shards_checked": 0, "shards_repaired": []}
+
+    previous_manifest, _ = artifact_store.reload_json(bucket, manifest_key)
+    validate_stable_training_set_manifest(previous_manifest, bucket, manifest_key)
+    previous_shards = previous_manifest["shards"] if previous_manifest is not None else {}
+    update_stable_training_set_manifest(artifact_store, bucket, manifest_key, shard_entries, run_id)
+    return {
+        "shards_checked": len(shard_entries),
+        "shards_repaired": sorted(
+            shard_id
+            for shard_id, shard_entry in shard_entries.items()
+            if previous_shards.get(shard_id) != shard_entry
+        ),
+    }
+
+
+def section4_upsert_stable_training_set(
+    run_receipt: dict, artifact_store: ArtifactStore | None = None
+) -> Tuple[dict, dict]:
+    input_bucket = run_receipt["input_bucket"]
+    output_bucket = run_receipt["output_bucket"]
+    run_id = run_receipt["run_id"]
+    stable_training_set_key = run_receipt["stable_training_set_key"]
+    stable_training_set_exists = run_receipt.get("stable_training_set_exists", False)
     outputs_written = run_receipt.setdefault("outputs_written", {})
+
+    # A batch run upserts the deltas of all its vendors in one pass.
+    delta_keys_by_vendor = outputs_written.get("stable_training_delta_keys_by_vendor")
+    if delta_keys_by_vendor is None:
+        delta_key = outputs_written.get("stable_training_delta_key")
+        if not delta_key:
+            raise ValueError("stable_training_delta_key missing from run_receipt outputs")
+        delta_keys_by_vendor = {run_receipt["vendor_name"]: delta_key}
+
+    artifact_store = artifact_store or ArtifactStore(build_storage_backend(run_receipt.get("storage")))
+
+    stable_training_set_options = {**STABLE_TRAINING_SET_DEFAULTS, **(run_receipt.get("stable_training_set") or {})}
+    manifest_repair = None
+    if stable_training_set_options["manifest_repair"]:
+        manifest_repair = repair_stable_training_set_manifest(
+            artifact_store, input_bucket, stable_training_set_key, run_id
+        )
+        print(f"StableTrainingSet manifest repair: {manifest_repair}")
+
+    # Upsert keys all fall into the shards of the upserted vendors, so only those shards are loaded.
+    # Without a manifest the whole legacy set is loaded once to be migrated into shards.
+    manifest = load_stable_training_set_manifest(artifact_store, input_bucket, stable_training_set_key)
+    stable_training_set = {}
+    if manifest is not None:
+        for vendor_name in delta_keys_by_vendor:
+            vendor_shard_id = stable_training_set_shard_id(f"{vendor_name}::")
+            if vendor_shard_id in manifest["shards"]:
+                stable_training_set.update(
+                    iter_stable_training_set_shard(artifact_store, input_bucket, manifest["shards"][vendor_shard_id])
+                )
+    elif stable_training_set_exists:
+        stable_training_set = dict(iter_stable_training_set(artifact_store, input_bucket, stable_training_set_key))
+
+    delta_record_count = 0
+    created_key_count = 0
+    updated_key_count = 0
+    upserted_keys: List[str] = []
+    upserted_key_set: Set[str] = set()
+    replaced_records: Dict[str, dict] = {}
+
+    for vendor_name, delta_key in delta_keys_by_vendor.items():
+        delta_records = artifact_store.load_json(output_bucket, delta_key)
+        if not isinstance(delta_records, list):
+            raise ValueError("StableTrainingSet delta must be a JSON list")
+        delta_record_count += len(delta_records)
+
+        for record in delta_records:
+            if not isinstance(record, dict):
+                raise ValueError("Each delta record must be a JSON object")
+            vendor_category_id = record.get("vendor_category_id")
+            if vendor_category_id is None:
+                raise ValueError("Delta record missing required field 'vendor_category_id'")
+
+            upsert_key = f"{vendor_name}::{vendor_category_id}"
+            existing_record = stable_training_set.get(upsert_key) or {}
+
+            first_seen_run_id = existing_record.get("first_seen_run_id") or run_id
+
+            new_record = dict(record)
+            new_record["first_seen_run_id"] = first_seen_run_id
+            new_record["last_seen_run_id"] = run_id
+
+            if upsert_key in stable_training_set:
+                updated_key_count += 1
+            else:
+                created_key_count += 1
+
+            if upsert_key not in upserted_key_set:
+                upserted_key_set.add(upsert_key)
+                upserted_keys.append(upsert_key)
+                if upsert_key in stable_training_set:
+                    replaced_records[upsert_key] = stable_training_set[upsert_key]
+            stable_training_set[upsert_key] = new_record
+
+    shard_write = write_stable_training_set_shards(
+        artifact_store,
+        input_bucket,
+        stable_training_set_key,
+        stable_training_set,
+        {stable_training_set_shard_id(upsert_key) for upsert_key in upserted_keys},
+        run_id,
+    )
+
     outputs_written["stable_training_set_key"] = stable_training_set_key
 
     stable_training_set_upsert_counts = run_receipt.setdefault("counts", {}).setdefault(
@@ -573,19 +2291,333 @@ def section4_upsert_stable_training_set(run_receipt: dict) -> dict:
     )
     stable_training_set_upsert_counts.update(
         {
-            "delta_record_count": len(delta_records),
+            "delta_record_count": delta_record_count,
             "created_key_count": created_key_count,
             "updated_key_count": updated_key_count,
-            "final_total_key_count": len(stable_training_set),
+            "final_total_key_count": load_stable_training_set_manifest(
+                artifact_store, input_bucket, stable_training_set_key
+            )["record_count"],
+            "shards": shard_write,
+            "manifest_repair": manifest_repair,
         }
     )
 
-    if not delta_records:
+    if not delta_record_count:
         run_receipt.setdefault("notes", []).append(
-            "StableTrainingSet delta was empty; wrote existing dataset unchanged."
+            "StableTrainingSet delta was empty; no StableTrainingSet shards rewritten."
         )
 
-    return run_receipt
+    # Records replaced by this upsert, so evidence builders can subtract them instead of rebuilding.
+    stable_training_set_changes = {
+        "upserted_keys": upserted_keys,
+        "upserted_records": {upsert_key: stable_training_set[upsert_key] for upsert_key in upserted_keys},
+        "replaced_records": replaced_records,
+    }
+
+    return run_receipt, stable_training_set_changes
+
+
+# === Section 4.5: ACTIVE (Tokenize StableTrainingSet once for layer B/C consumers) ===
+
+
+PAIR_KEY_SHIFT = 32
+PAIR_KEY_MASK = (1 << PAIR_KEY_SHIFT) - 1
+PLURAL_MAPS_KEY = "canonical_mappings/stable_training_sets/StableTrainingPluralMaps_v1.json"
+PLURAL_MAP_FIELDS = ("KEYWORD", "DESCRIPTION_SHORT")
+
+
+class TokenVocabulary:
+    # Per-field token interning for evidence building. Ids follow lexicographic token order, so
+    # sorted ids are sorted tokens and an ordered id pair packs into one 64-bit int key.
+
+    def __init__(self, tokens):
+        self.tokens: List[str] = sorted(set(tokens))
+        self.token_ids: Dict[str, int] = {token: token_id for token_id, token in enumerate(self.tokens)}
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+    def encode(self, tokens) -> Set[int]:
+        token_ids = self.token_ids
+        return {token_ids[token] for token in tokens if token in token_ids}
+
+    def decode(self, token_ids) -> Set[str]:
+        return {self.tokens[token_id] for token_id in token_ids}
+
+    def decode_pair(self, pair_key: int) -> str:
+        return f"{self.tokens[pair_key >> PAIR_KEY_SHIFT]}||{self.tokens[pair_key & PAIR_KEY_MASK]}"
+
+
+def iter_token_id_pairs(token_ids: Set[int]):
+    for left, right in combinations(sorted(token_ids), 2):
+        yield left << PAIR_KEY_SHIFT | right
+
+
+def extend_plural_map(
+    previous_plural_map: Dict[str, str], previous_vocab: Set[str], current_vocab: Set[str]
+) -> Tuple[Dict[str, str], int]:
+    # canonicalize_plural only consults the vocab for token[:-1] / token[:-2], so besides new
+    # tokens only those whose stem entered or left the vocab need to be canonicalized again.
+    plural_map = {
+        token: previous_plural_map.get(token, token)
+        for token in current_vocab
+        if token in previous_vocab
+    }
+    tokens_to_canonicalize = current_vocab - previous_vocab
+    for candidate in previous_vocab ^ current_vocab:
+        for suffix in PLURAL_SUFFIXES:
+            token = candidate + suffix
+            if token in plural_map:
+                tokens_to_canonicalize.add(token)
+    for token in tokens_to_canonicalize:
+        plural_map[token] = canonicalize_plural(token, current_vocab)
+    return plural_map, len(tokens_to_canonicalize)
+
+
+def resolve_plural_maps(
+    vocab_by_field: Dict[str, Set[str]],
+    previous_plural_maps: dict | None,
+    stable_training_set_sha1: str | None,
+) -> Tuple[Dict[str, Dict[str, str]], dict]:
+    previous_fields = None
+    if (
+        isinstance(previous_plural_maps, dict)
+        and previous_plural_maps.get("normalization_version") == NORMALIZATION_VERSION
+        and isinstance(previous_plural_maps.get("fields"), dict)
+    ):
+        previous_fields = previous_plural_maps["fields"]
+    if previous_fields is None or any(
+        not isinstance(previous_fields.get(field_name), dict) for field_name in PLURAL_MAP_FIELDS
+    ):
+        plural_maps_by_field = {
+            field_name: build_plural_map(vocab_by_field[field_name]) for field_name in PLURAL_MAP_FIELDS
+        }
+        return plural_maps_by_field, {
+            "mode": "rebuilt",
+            "canonicalized_token_count_by_field": {
+                field_name: len(vocab_by_field[field_name]) for field_name in PLURAL_MAP_FIELDS
+            },
+        }
+
+    unchanged_training_set = (
+        stable_training_set_sha1 is not None
+        and previous_plural_maps.get("stable_training_set_sha1") == stable_training_set_sha1
+    )
+    plural_maps_by_field: Dict[str, Dict[str, str]] = {}
+    canonicalized_token_count_by_field: Dict[str, int] = {}
+    for field_name in PLURAL_MAP_FIELDS:
+        previous_field = previous_fields[field_name]
+        previous_vocab = set(previous_field.get("vocab") or [])
+        plural_forms = previous_field.get("plural_forms") or {}
+        current_vocab = vocab_by_field[field_name]
+        if unchanged_training_set and previous_vocab == current_vocab:
+            plural_maps_by_field[field_name] = {
+                token: plural_forms.get(token, token) for token in current_vocab
+            }
+            canonicalized_token_count_by_field[field_name] = 0
+            continue
+        unchanged_training_set = False
+        plural_maps_by_field[field_name], canonicalized_token_count_by_field[field_name] = (
+            extend_plural_map(plural_forms, previous_vocab, current_vocab)
+        )
+    return plural_maps_by_field, {
+        "mode": "reused" if unchanged_training_set else "extended",
+        "canonicalized_token_count_by_field": canonicalized_token_count_by_field,
+    }
+
+
+def build_plural_maps_body(run_id: str, stable_training_set_sha1: str, training_corpus: dict) -> dict:
+    vocab_by_field = training_corpus["vocab_by_field"]
+    plural_maps_by_field = {
+        "KEYWORD": training_corpus["plural_map_keyword"],
+        "DESCRIPTION_SHORT": training_corpus["plural_map_description"],
+    }
+    return {
+        "built_at_run_id": run_id,
+        "normalization_version": NORMALIZATION_VERSION,
+        "stable_training_set_sha1": stable_training_set_sha1,
+        "fields": {
+            field_name: {
+                "vocab": sorted(vocab_by_field[field_name]),
+                "plural_forms": {
+                    token: canonical
+                    for token, canonical in sorted(plural_maps_by_field[field_name].items())
+                    if token != canonical
+                },
+            }
+            for field_name in PLURAL_MAP_FIELDS
+        },
+    }
+
+
+def build_tokenized_training_corpus(
+    stable_training_items,
+    tokenizer: "TextTokenizer",
+    denylist_config: dict,
+    previous_plural_maps: dict | None = None,
+    stable_training_set_sha1: str | None = None,
+) -> dict:
+    # Consumes (key, record) pairs in one pass, so the StableTrainingSet can be streamed. Products
+    # hold per-field sets of raw token ids first, then ids in token_vocabularies once plural
+    # canonicalization and the denylist are applied.
+    raw_token_ids_by_field: Dict[str, Dict[str, int]] = {
+        "KEYWORD": {},
+        "DESCRIPTION_SHORT": {},
+        "CLASS_CODES": {},
+    }
+    products: List[Tuple[str, Dict[str, Set[int]]]] = []
+    pim_categories_seen: Set[str] = set()
+    missing_pim_categories = 0
+    invalid_product_collections = 0
+    record_last_seen_run_ids: Dict[str, str | None] = {}
+
+    for stable_training_key, record in stable_training_items:
+        if not isinstance(record, dict):
+            continue
+        record_last_seen_run_ids[stable_training_key] = record.get("last_seen_run_id")
+        pim_category_id = record.get("pim_category_id")
+        if pim_category_id is None:
+            missing_pim_categories += 1
+            continue
+
+        pim_category_key = str(pim_category_id)
+        pim_categories_seen.add(pim_category_key)
+        record_products = record.get("products") or []
+        if not isinstance(record_products, list):
+            invalid_product_collections += 1
+            continue
+
+        for product in record_products:
+            if not isinstance(product, dict):
+                continue
+            product_token_sets = build_token_set_for_product(product, tokenizer=tokenizer)
+            product_token_ids: Dict[str, Set[int]] = {}
+            for field_name, tokens in product_token_sets.items():
+                raw_token_ids = raw_token_ids_by_field[field_name]
+                product_token_ids[field_name] = {
+                    raw_token_ids.setdefault(token, len(raw_token_ids)) for token in tokens
+                }
+            products.append((pim_category_key, product_token_ids))
+
+    vocab_by_field: Dict[str, Set[str]] = {
+        field_name: set(raw_token_ids) for field_name, raw_token_ids in raw_token_ids_by_field.items()
+    }
+    plural_maps_by_field, plural_map_build = resolve_plural_maps(
+        vocab_by_field, previous_plural_maps, stable_training_set_sha1
+    )
+    plural_map_keyword = plural_maps_by_field["KEYWORD"]
+    plural_map_description = plural_maps_by_field["DESCRIPTION_SHORT"]
+
+    token_vocabularies: Dict[str, TokenVocabulary] = {}
+    canonical_id_by_raw_id_by_field: Dict[str, List[int]] = {}
+    for field_name, raw_token_ids in raw_token_ids_by_field.items():
+        plural_map = plural_maps_by_field.get(field_name, {})
+        canonical_tokens = [plural_map.get(token, token) for token in raw_token_ids]
+        vocabulary = TokenVocabulary(canonical_tokens)
+        token_vocabularies[field_name] = vocabulary
+        canonical_id_by_raw_id_by_field[field_name] = [
+            vocabulary.token_ids[token] for token in canonical_tokens
+        ]
+
+    plural_changed_counts = {"KEYWORD": 0, "DESCRIPTION_SHORT": 0}
+    denylist_removed_counts = {"KEYWORD": 0, "DESCRIPTION_SHORT": 0}
+    plural_changed_ids_by_field = {
+        field_name: {
+            token_id
+            for token_id, token in enumerate(token_vocabularies[field_name].tokens)
+            if token not in vocab_by_field[field_name]
+        }
+        for field_name in ("KEYWORD", "DESCRIPTION_SHORT")
+    }
+    denylist_ids_by_field = {
+        field_name: token_vocabularies[field_name].encode(
+            denylist_config["global"] | denylist_config["by_field"][field_name]
+        )
+        for field_name in ("KEYWORD", "DESCRIPTION_SHORT")
+    }
+
+    for _, product_token_ids in products:
+        for field_name, raw_ids in product_token_ids.items():
+            canonical_id_by_raw_id = canonical_id_by_raw_id_by_field[field_name]
+            token_ids = {canonical_id_by_raw_id[raw_id] for raw_id in raw_ids}
+            if field_name in plural_changed_ids_by_field:
+                plural_changed_counts[field_name] += len(token_ids & plural_changed_ids_by_field[field_name])
+                denylisted_ids = token_ids & denylist_ids_by_field[field_name]
+                if denylisted_ids:
+                    denylist_removed_counts[field_name] += len(denylisted_ids)
+                    token_ids -= denylisted_ids
+            product_token_ids[field_name] = token_ids
+
+    return {
+        "products": products,
+        "token_vocabularies": token_vocabularies,
+        "vocab_by_field": vocab_by_field,
+        "plural_map_keyword": plural_map_keyword,
+        "plural_map_description": plural_map_description,
+        "plural_map_build": plural_map_build,
+        "denylist_config": denylist_config,
+        "text_tokenizer": tokenizer,
+        "pim_categories_seen": pim_categories_seen,
+        "missing_pim_categories": missing_pim_categories,
+        "invalid_product_collections": invalid_product_collections,
+        "record_last_seen_run_ids": record_last_seen_run_ids,
+        "plural_changed_counts": plural_changed_counts,
+        "denylist_removed_counts": denylist_removed_counts,
+    }
+
+
+def section4_5_build_tokenized_training_corpus(
+    run_receipt: dict, artifact_store: ArtifactStore | None = None
+) -> Tuple[dict, dict]:
+    input_bucket = run_receipt["input_bucket"]
+    stable_training_set_key = run_receipt["stable_training_set_key"]
+
+    artifact_store = artifact_store or ArtifactStore(build_storage_backend(run_receipt.get("storage")))
+    denylist_config = load_denylist_config(
+        artifact_store, input_bucket, DENYLIST_CONFIG_KEY_DEFAULT
+    )
+    print(
+        "Loaded denylist config for tokenized training corpus from "
+        f"s3://{input_bucket}/{DENYLIST_CONFIG_KEY_DEFAULT}"
+    )
+
+    stable_training_set_sha1 = stable_training_set_content_sha1(artifact_store, input_bucket, stable_training_set_key)
+    previous_plural_maps = artifact_store.load_json_if_exists(input_bucket, PLURAL_MAPS_KEY)
+
+    training_corpus = build_tokenized_training_corpus(
+        iter_stable_training_set(artifact_store, input_bucket, stable_training_set_key),
+        TextTokenizer(build_stopword_set()),
+        denylist_config,
+        previous_plural_maps=previous_plural_maps,
+        stable_training_set_sha1=stable_training_set_sha1,
+    )
+    plural_map_build = training_corpus["plural_map_build"]
+    if plural_map_build["mode"] != "reused":
+        artifact_store.put_json(
+            input_bucket,
+            PLURAL_MAPS_KEY,
+            build_plural_maps_body(run_receipt["run_id"], stable_training_set_sha1, training_corpus),
+        )
+        run_receipt.setdefault("outputs_written", {})["stable_training_plural_maps_key"] = PLURAL_MAPS_KEY
+
+    run_receipt.setdefault("counts", {})["tokenized_training_corpus"] = {
+        "product_count": len(training_corpus["products"]),
+        "vocab_size_by_field": {
+            field_name: len(tokens) for field_name, tokens in training_corpus["vocab_by_field"].items()
+        },
+        "plural_map_build": plural_map_build,
+    }
+
+    return run_receipt, training_corpus
+
+
+def rehydrate_tokenized_training_corpus(run_receipt: dict, artifact_store: ArtifactStore) -> Tuple[dict, dict]:
+    # Rebuilds the corpus for a resumed run without touching the restored receipt. The StableTrainingSet
+    # is unchanged since the checkpoint, so the plural maps written by the original run are reused.
+    _, training_corpus = section4_5_build_tokenized_training_corpus(
+        deepcopy(run_receipt), artifact_store=artifact_store
+    )
+    return run_receipt, training_corpus
 
 
 # === Section 5: ACTIVE (Build StableTrainingEvidence_Unigrams_v1) ===
@@ -653,44 +2685,73 @@ def build_stopword_set() -> Set[str]:
     return stopwords
 
 
-def tokenize_text_value(value: str, field_name: str, stopwords: Set[str]) -> List[str]:
-    if not value:
-        return []
-    normalized_tokens: List[str] = []
-    for token in TOKEN_PATTERN.findall(value):
-        trimmed = TRIM_PATTERN.sub("", token)
-        if not trimmed:
-            continue
-        normalized = normalize_german_chars(trimmed)
-        if not normalized:
-            continue
-        numeric_only_candidate = re.sub(r"[^0-9]", "", normalized)
-        if (
-            field_name in DROP_NUMERIC_ONLY_FIELDS
-            and numeric_only_candidate
-            and len(numeric_only_candidate) == len(normalized)
-        ):
-            continue
-        if len(normalized) < MIN_TOKEN_LENGTH:
-            continue
-        if normalized in stopwords:
-            continue
-        normalized_tokens.append(normalized)
-    return normalized_tokens
+# Tokens are runs of ASCII letters/digits and ÄÖÜäöüß. This table maps those characters to lowercase
+# ASCII, so translating a whole value and splitting on [a-z0-9]+ yields the same tokens as splitting
+# first and applying normalize_german_chars to each token.
+TOKEN_NORMALIZATION_TABLE = str.maketrans(
+    {
+        **{chr(code): chr(code).lower() for code in range(ord("A"), ord("Z") + 1)},
+        "ä": "ae",
+        "ö": "oe",
+        "ü": "ue",
+        "ß": "ss",
+        "Ä": "ae",
+        "Ö": "oe",
+        "Ü": "ue",
+    }
+)
+NORMALIZED_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+TEXT_TOKENIZER_CACHE_SIZE = 200_000
+
+
+class TextTokenizer:
+    # Field values repeat heavily across a catalog, so normalized tokens are memoized per
+    # (value, field_name) in a bounded LRU cache. The cache is dropped when pickled.
+
+    def __init__(self, stopwords: Set[str], cache_size: int = TEXT_TOKENIZER_CACHE_SIZE):
+        self.stopwords = stopwords
+        self.cache_size = cache_size
+        self._tokenize_cached = lru_cache(maxsize=cache_size)(self._tokenize_uncached)
+
+    def __getstate__(self) -> dict:
+        return {"stopwords": self.stopwords, "cache_size": self.cache_size}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(state["stopwords"], state["cache_size"])
+
+    def _tokenize_uncached(self, value: str, field_name: str) -> Tuple[str, ...]:
+        drop_numeric_only = field_name in DROP_NUMERIC_ONLY_FIELDS
+        stopwords = self.stopwords
+        return tuple(
+            token
+            for token in NORMALIZED_TOKEN_PATTERN.findall(value.translate(TOKEN_NORMALIZATION_TABLE))
+            if len(token) >= MIN_TOKEN_LENGTH
+            and not (drop_numeric_only and token.isdigit())
+            and token not in stopwords
+        )
 
+    def tokenize(self, value: str, field_name: str) -> Tuple[str, ...]:
+        if not value:
+            return ()
+        return self._tokenize_cached(value, field_name)
 
-def tokenize_keywords(keywords, stopwords: Set[str]) -> List[str]:
-    tokens: List[str] = []
+    def tokenize_many(self, values, field_name: str) -> List[str]:
+        tokens: List[str] = []
+        for value in values:
+            if isinstance(value, str) and value:
+                tokens.extend(self._tokenize_cached(value, field_name))
+        return tokens
+
+
+def tokenize_keywords(keywords, tokenizer: TextTokenizer) -> List[str]:
     if isinstance(keywords, list):
-        for keyword in keywords:
-            if isinstance(keyword, str):
-                tokens.extend(tokenize_text_value(keyword, "KEYWORD", stopwords))
-    return tokens
+        return tokenizer.tokenize_many(keywords, "KEYWORD")
+    return []
 
 
-def tokenize_description(description_short, stopwords: Set[str]) -> List[str]:
+def tokenize_description(description_short, tokenizer: TextTokenizer) -> List[str]:
     if isinstance(description_short, str):
-        return tokenize_text_value(description_short, "DESCRIPTION_SHORT", stopwords)
+        return list(tokenizer.tokenize(description_short, "DESCRIPTION_SHORT"))
     return []
 
 
@@ -709,9 +2770,9 @@ def tokenize_class_codes(class_codes) -> List[str]:
     return tokens
 
 
-def build_token_set_for_product(product: dict, stopwords: Set[str]) -> Dict[str, Set[str]]:
-    keyword_tokens = set(tokenize_keywords(product.get("keywords"), stopwords))
-    description_tokens = set(tokenize_description(product.get("description_short"), stopwords))
+def build_token_set_for_product(product: dict, tokenizer: TextTokenizer) -> Dict[str, Set[str]]:
+    keyword_tokens = set(tokenize_keywords(product.get("keywords"), tokenizer))
+    description_tokens = set(tokenize_description(product.get("description_short"), tokenizer))
     class_code_tokens = set(tokenize_class_codes(product.get("class_codes")))
     return {
         "KEYWORD": keyword_tokens,
@@ -753,40 +2814,8 @@ def build_plural_map(vocab: Set[str]) -> Dict[str, str]:
     return {token: canonicalize_plural(token, vocab) for token in vocab}
 
 
-def build_plural_maps_from_training_set(
-    stable_training_set: dict, stopwords: Set[str]
-) -> Tuple[Dict[str, str], Dict[str, str], Dict[str, Set[str]]]:
-    vocab_by_field: Dict[str, Set[str]] = {
-        "KEYWORD": set(),
-        "DESCRIPTION_SHORT": set(),
-        "CLASS_CODES": set(),
-    }
-
-    for record in stable_training_set.values():
-        if not isinstance(record, dict):
-            continue
-        pim_category_id = record.get("pim_category_id")
-        if pim_category_id is None:
-            continue
-        products = record.get("products") or []
-        if not isinstance(products, list):
-            continue
-        for product in products:
-            if not isinstance(product, dict):
-                continue
-            product_token_sets = build_token_set_for_product(product, stopwords=stopwords)
-            for field_name, tokens in product_token_sets.items():
-                vocab_by_field[field_name].update(tokens)
-
-    plural_map_keyword = build_plural_map(vocab_by_field["KEYWORD"])
-    plural_map_description = build_plural_map(vocab_by_field["DESCRIPTION_SHORT"])
-    return plural_map_keyword, plural_map_description, vocab_by_field
-
-
-def load_denylist_config(s3_client, input_bucket: str, key: str) -> dict:
-    response = s3_client.get_object(Bucket=input_bucket, Key=key)
-    body = response["Body"].read().decode("utf-8")
-    denylist_raw = json.loads(body)
+def load_denylist_config(artifact_store: ArtifactStore, input_bucket: str, key: str) -> dict:
+    denylist_raw = artifact_store.load_json(input_bucket, key)
     if not isinstance(denylist_raw, dict):
         raise ValueError("Denylist config must be a JSON object")
     schema_version = denylist_raw.get("schema_version")
@@ -826,122 +2855,439 @@ def is_denylisted_token(token: str, field_name: str, denylist_config: dict) -> b
     return normalized in denylist_config.get("global", set()) or normalized in field_denylist
 
 
-def section5_build_unigram_evidence(run_receipt: dict) -> dict:
-    input_bucket = run_receipt["input_bucket"]
-    run_id = run_receipt["run_id"]
-    stable_training_set_key = run_receipt["stable_training_set_key"]
+PLURAL_SUFFIXES = ("n", "e", "s", "en", "er")
 
-    s3_client = boto3.client("s3")
-    denylist_config = load_denylist_config(
-        s3_client, input_bucket, DENYLIST_CONFIG_KEY_DEFAULT
-    )
-    print(
-        "Loaded denylist config for unigram evidence from "
-        f"s3://{input_bucket}/{DENYLIST_CONFIG_KEY_DEFAULT}"
-    )
-
-    def load_json_from_s3(bucket: str, key: str):
-        response = s3_client.get_object(Bucket=bucket, Key=key)
-        body = response["Body"].read().decode("utf-8")
-        return json.loads(body)
-
-    stable_training_set = load_json_from_s3(input_bucket, stable_training_set_key)
-    if not isinstance(stable_training_set, dict):
-        raise ValueError("StableTrainingSet must be a JSON object keyed by vendor::category")
 
-    stopwords_for_filtering = build_stopword_set()
-    plural_map_keyword, plural_map_description, vocab_by_field = build_plural_maps_from_training_set(
-        stable_training_set, stopwords_for_filtering
-    )
-
-    field_aggregates: Dict[str, Dict[str, dict]] = {
-        "KEYWORD": {"by_pim_category": defaultdict(lambda: {"products_total": 0, "token_product_counts": defaultdict(int)})},
-        "DESCRIPTION_SHORT": {"by_pim_category": defaultdict(lambda: {"products_total": 0, "token_product_counts": defaultdict(int)})},
-        "CLASS_CODES": {"by_pim_category": defaultdict(lambda: {"products_total": 0, "token_product_counts": defaultdict(int)})},
+def fingerprint_denylist_config(denylist_config: dict) -> str:
+    canonical_denylist = {
+        "global": sorted(denylist_config["global"]),
+        "by_field": {
+            field_name: sorted(tokens) for field_name, tokens in sorted(denylist_config["by_field"].items())
+        },
     }
-    field_unique_tokens: Dict[str, Set[str]] = {
-        "KEYWORD": set(),
-        "DESCRIPTION_SHORT": set(),
-        "CLASS_CODES": set(),
+    return hashlib.sha1(json.dumps(canonical_denylist, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def tokenize_training_records(
+    records: List[dict],
+    tokenizer: TextTokenizer,
+    plural_vocab_by_field: Dict[str, Set[str]],
+    denylist_config: dict,
+) -> List[Tuple[str, Dict[str, Set[str]]]]:
+    denylist_tokens_by_field = {
+        field_name: denylist_config["global"] | denylist_config["by_field"][field_name]
+        for field_name in ("KEYWORD", "DESCRIPTION_SHORT")
     }
-    plural_changed_counts = {"KEYWORD": 0, "DESCRIPTION_SHORT": 0}
-    denylist_removed_counts = {"KEYWORD": 0, "DESCRIPTION_SHORT": 0}
-
-    pim_categories_seen: Set[str] = set()
-    product_count_total = 0
-    missing_pim_categories = 0
-    invalid_product_collections = 0
+    products: List[Tuple[str, Dict[str, Set[str]]]] = []
 
-    for record in stable_training_set.values():
+    for record in records:
         if not isinstance(record, dict):
             continue
         pim_category_id = record.get("pim_category_id")
-        if pim_category_id is None:
-            missing_pim_categories += 1
-            continue
-
-        pim_categories_seen.add(str(pim_category_id))
-        products = record.get("products") or []
-        if not isinstance(products, list):
-            invalid_product_collections += 1
+        record_products = record.get("products") or []
+        if pim_category_id is None or not isinstance(record_products, list):
             continue
 
-        for product in products:
+        for product in record_products:
             if not isinstance(product, dict):
                 continue
-            product_count_total += 1
-            product_token_sets = build_token_set_for_product(
-                product, stopwords=stopwords_for_filtering
-            )
+            product_token_sets = build_token_set_for_product(product, tokenizer=tokenizer)
+            for field_name, denylist_tokens in denylist_tokens_by_field.items():
+                vocab = plural_vocab_by_field[field_name]
+                product_token_sets[field_name] = {
+                    canonicalize_plural(token, vocab) for token in product_token_sets[field_name]
+                } - denylist_tokens
+            products.append((str(pim_category_id), product_token_sets))
+
+    return products
+
+
+def plural_canonicalization_changed(
+    previous_vocab: Set[str], current_vocab: Set[str]
+) -> bool:
+    # canonicalize_plural only consults the vocab for token[:-1] / token[:-2], so a shared token can
+    # only map differently if one of those candidates entered or left the vocab.
+    for candidate in previous_vocab ^ current_vocab:
+        for suffix in PLURAL_SUFFIXES:
+            token = candidate + suffix
+            if token not in previous_vocab or token not in current_vocab:
+                continue
+            if canonicalize_plural(token, previous_vocab) != canonicalize_plural(token, current_vocab):
+                return True
+    return False
+
+
+def build_unigram_field_aggregates(
+    products: List[Tuple[str, Dict[str, Set[int]]]],
+    token_vocabularies: Dict[str, TokenVocabulary],
+) -> Dict[str, Dict[str, dict]]:
+    counts_by_field: Dict[str, Dict[str, dict]] = {
+        "KEYWORD": defaultdict(lambda: {"products_total": 0, "token_product_counts": defaultdict(int)}),
+        "DESCRIPTION_SHORT": defaultdict(lambda: {"products_total": 0, "token_product_counts": defaultdict(int)}),
+        "CLASS_CODES": defaultdict(lambda: {"products_total": 0, "token_product_counts": defaultdict(int)}),
+    }
 
-            product_token_sets["KEYWORD"] = {
-                plural_map_keyword.get(token, token) for token in product_token_sets["KEYWORD"]
+    for pim_category_key, product_token_ids in products:
+        for field_name, token_ids in product_token_ids.items():
+            field_entry = counts_by_field[field_name][pim_category_key]
+            field_entry["products_total"] += 1
+            token_product_counts = field_entry["token_product_counts"]
+            for token_id in token_ids:
+                token_product_counts[token_id] += 1
+
+    # Token strings only come back here, when the JSON schema is produced.
+    field_aggregates: Dict[str, Dict[str, dict]] = {}
+    for field_name, counts_by_pim_category in counts_by_field.items():
+        tokens = token_vocabularies[field_name].tokens
+        token_category_occurrence_count = [0] * len(tokens)
+        by_pim_category: Dict[str, dict] = {}
+        for pim_category_id, pim_data in counts_by_pim_category.items():
+            token_product_counts = pim_data["token_product_counts"]
+            for token_id in token_product_counts:
+                token_category_occurrence_count[token_id] += 1
+            by_pim_category[pim_category_id] = {
+                "products_total": pim_data["products_total"],
+                "token_product_counts": {
+                    tokens[token_id]: token_product_counts[token_id]
+                    for token_id in sorted(token_product_counts)
+                },
             }
-            product_token_sets["DESCRIPTION_SHORT"] = {
-                plural_map_description.get(token, token)
-                for token in product_token_sets["DESCRIPTION_SHORT"]
+        field_aggregates[field_name] = {
+            "by_pim_category": by_pim_category,
+            "token_category_occurrence_count": {
+                tokens[token_id]: count
+                for token_id, count in enumerate(token_category_occurrence_count)
+                if count
+            },
+        }
+        counts_by_pim_category.clear()
+
+    return field_aggregates
+
+
+def build_field_incidence_matrix(
+    products: List[Tuple[str, Dict[str, Set[int]]]], field_name: str, token_count: int
+) -> Tuple["sparse.csr_matrix", List[str], "np.ndarray"]:
+    # Product x token CSR incidence of one field. Rows are grouped by pim category, categories in
+    # first-appearance order like the dict-based builders; rows of category i start at offsets[i].
+    if sparse is None:
+        raise ImportError("numpy and scipy are required for the sparse evidence engine")
+    category_indexes: Dict[str, int] = {}
+    product_category_indexes: List[int] = []
+    product_token_ids: List[Set[int]] = []
+    for pim_category_key, token_ids_by_field in products:
+        token_ids = token_ids_by_field.get(field_name)
+        if token_ids is None:
+            continue
+        product_category_indexes.append(category_indexes.setdefault(pim_category_key, len(category_indexes)))
+        product_token_ids.append(token_ids)
+
+    row_order = np.argsort(np.array(product_category_indexes, dtype=np.int64), kind="stable").tolist()
+    row_token_ids = [product_token_ids[row] for row in row_order]
+    indptr = np.zeros(len(row_token_ids) + 1, dtype=np.int64)
+    np.cumsum(np.fromiter(map(len, row_token_ids), dtype=np.int64, count=len(row_token_ids)), out=indptr[1:])
+    indices = np.fromiter(chain.from_iterable(row_token_ids), dtype=np.int32, count=int(indptr[-1]))
+    incidence = sparse.csr_matrix(
+        (np.ones(len(indices), dtype=np.int32), indices, indptr), shape=(len(row_token_ids), token_count)
+    )
+    incidence.sort_indices()
+
+    offsets = np.zeros(len(category_indexes) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(product_category_indexes, minlength=len(category_indexes)), out=offsets[1:])
+    return incidence, list(category_indexes), offsets
+
+
+def build_unigram_field_aggregates_sparse(
+    products: List[Tuple[str, Dict[str, Set[int]]]],
+    token_vocabularies: Dict[str, TokenVocabulary],
+) -> Dict[str, Dict[str, dict]]:
+    # Same output as build_unigram_field_aggregates. token_product_counts of every category are the
+    # column sums of its incidence rows, computed at once as category indicator @ incidence.
+    field_aggregates: Dict[str, Dict[str, dict]] = {}
+    for field_name in ["KEYWORD", "DESCRIPTION_SHORT", "CLASS_CODES"]:
+        tokens = token_vocabularies[field_name].tokens
+        incidence, pim_category_keys, offsets = build_field_incidence_matrix(products, field_name, len(tokens))
+        category_indicator = sparse.csr_matrix(
+            (np.ones(incidence.shape[0], dtype=np.int32), np.arange(incidence.shape[0]), offsets),
+            shape=(len(pim_category_keys), incidence.shape[0]),
+        )
+        token_counts = (category_indicator @ incidence).tocsr()
+        token_counts.sort_indices()
+        del incidence, category_indicator
+
+        products_totals = np.diff(offsets).tolist()
+        by_pim_category: Dict[str, dict] = {}
+        for category_index, pim_category_id in enumerate(pim_category_keys):
+            start, end = token_counts.indptr[category_index], token_counts.indptr[category_index + 1]
+            by_pim_category[pim_category_id] = {
+                "products_total": products_totals[category_index],
+                "token_product_counts": {
+                    tokens[token_id]: count
+                    for token_id, count in zip(
+                        token_counts.indices[start:end].tolist(), token_counts.data[start:end].tolist()
+                    )
+                },
             }
+        token_category_occurrence_count = np.bincount(token_counts.indices, minlength=len(tokens))
+        field_aggregates[field_name] = {
+            "by_pim_category": by_pim_category,
+            "token_category_occurrence_count": {
+                tokens[token_id]: count
+                for token_id, count in enumerate(token_category_occurrence_count.tolist())
+                if count
+            },
+        }
 
-            plural_changed_counts["KEYWORD"] += sum(
-                1 for token in product_token_sets["KEYWORD"] if token not in vocab_by_field["KEYWORD"]
-            )
-            plural_changed_counts["DESCRIPTION_SHORT"] += sum(
-                1
-                for token in product_token_sets["DESCRIPTION_SHORT"]
-                if token not in vocab_by_field["DESCRIPTION_SHORT"]
-            )
+    return field_aggregates
 
-            for field_name in ("KEYWORD", "DESCRIPTION_SHORT"):
-                denylist_tokens = denylist_config["global"] | denylist_config["by_field"][field_name]
-                if not denylist_tokens:
-                    continue
-                filtered = {token for token in product_token_sets[field_name] if token not in denylist_tokens}
-                denylist_removed_counts[field_name] += (
-                    len(product_token_sets[field_name]) - len(filtered)
+
+def sort_unigram_evidence_fields(fields: Dict[str, Dict[str, dict]]) -> Dict[str, Dict[str, dict]]:
+    # Canonical key order of the written evidence: pim categories and tokens sorted, so an
+    # incremental update serializes to the same bytes as a full rebuild of either engine.
+    return {
+        field_name: {
+            "by_pim_category": {
+                pim_category_id: {
+                    "products_total": pim_data["products_total"],
+                    "token_product_counts": dict(sorted(pim_data["token_product_counts"].items())),
+                }
+                for pim_category_id, pim_data in sorted(field_data["by_pim_category"].items())
+            },
+            "token_category_occurrence_count": dict(sorted(field_data["token_category_occurrence_count"].items())),
+        }
+        for field_name, field_data in fields.items()
+    }
+
+
+def serialized_json_equal(left, right) -> bool:
+    # Key order matters here: both sides must serialize to the same JSON text, not just equal values.
+    return json.dumps(left) == json.dumps(right)
+
+
+def apply_unigram_evidence_delta(
+    fields: Dict[str, Dict[str, dict]],
+    removed_products: List[Tuple[str, Dict[str, Set[str]]]],
+    added_products: List[Tuple[str, Dict[str, Set[str]]]],
+) -> None:
+    # Additions go first so categories and tokens present before and after keep their entries.
+    for pim_category_key, product_token_sets in added_products:
+        for field_name, tokens in product_token_sets.items():
+            field_data = fields[field_name]
+            pim_data = field_data["by_pim_category"].setdefault(
+                pim_category_key, {"products_total": 0, "token_product_counts": {}}
+            )
+            pim_data["products_total"] += 1
+            token_product_counts = pim_data["token_product_counts"]
+            occurrence_counts = field_data["token_category_occurrence_count"]
+            for token in tokens:
+                if token not in token_product_counts:
+                    token_product_counts[token] = 0
+                    occurrence_counts[token] = occurrence_counts.get(token, 0) + 1
+                token_product_counts[token] += 1
+
+    for pim_category_key, product_token_sets in removed_products:
+        for field_name, tokens in product_token_sets.items():
+            field_data = fields[field_name]
+            pim_data = field_data["by_pim_category"].get(pim_category_key)
+            if pim_data is None or pim_data["products_total"] < 1:
+                raise ValueError(
+                    f"Unigram evidence {field_name} has no products for pim category '{pim_category_key}' to remove"
                 )
-                product_token_sets[field_name] = filtered
+            pim_data["products_total"] -= 1
+            token_product_counts = pim_data["token_product_counts"]
+            occurrence_counts = field_data["token_category_occurrence_count"]
+            for token in tokens:
+                remaining = token_product_counts.get(token, 0) - 1
+                if remaining < 0:
+                    raise ValueError(
+                        f"Unigram evidence {field_name} count for token '{token}' in pim category "
+                        f"'{pim_category_key}' would become negative"
+                    )
+                if remaining:
+                    token_product_counts[token] = remaining
+                    continue
+                del token_product_counts[token]
+                if occurrence_counts[token] > 1:
+                    occurrence_counts[token] -= 1
+                else:
+                    del occurrence_counts[token]
+            if pim_data["products_total"] == 0:
+                del field_data["by_pim_category"][pim_category_key]
 
-            for field_name, tokens in product_token_sets.items():
-                field_entry = field_aggregates[field_name]["by_pim_category"][str(pim_category_id)]
-                field_entry["products_total"] += 1
-                for token in tokens:
-                    field_entry["token_product_counts"][token] += 1
-                field_unique_tokens[field_name].update(tokens)
-
-    for field_name, field_data in field_aggregates.items():
-        token_category_occurrence_count: Dict[str, int] = defaultdict(int)
-        for pim_category_id, pim_data in field_data["by_pim_category"].items():
-            for token in pim_data["token_product_counts"].keys():
-                token_category_occurrence_count[token] += 1
-        field_data["token_category_occurrence_count"] = dict(token_category_occurrence_count)
-        # Convert defaultdicts to normal dicts for serialization
-        field_data["by_pim_category"] = {
-            pim_category_id: {
-                "products_total": pim_data["products_total"],
-                "token_product_counts": dict(pim_data["token_product_counts"]),
-            }
-            for pim_category_id, pim_data in field_data["by_pim_category"].items()
+
+def resolve_unigram_evidence_incremental_base(
+    run_receipt: dict,
+    artifact_store: ArtifactStore,
+    evidence_key: str,
+    state_key: str,
+    stable_training_set_changes: dict | None,
+    training_corpus: dict,
+    build_options: dict,
+) -> Tuple[dict | None, dict | None, str | None]:
+    input_bucket = run_receipt["input_bucket"]
+
+    if build_options["mode"] == "full":
+        return None, None, "build_mode_full"
+    if stable_training_set_changes is None:
+        return None, None, "stable_training_set_changes_unavailable"
+
+    previous_state = artifact_store.load_json_if_exists(input_bucket, state_key)
+    previous_evidence = artifact_store.load_json_if_exists(input_bucket, evidence_key)
+    if not isinstance(previous_state, dict) or not isinstance(previous_evidence, dict):
+        return None, None, "previous_evidence_or_state_missing"
+
+    if previous_state.get("normalization_version") != NORMALIZATION_VERSION:
+        return None, None, "normalization_version_changed"
+    if previous_state.get("evidence_built_at_run_id") != previous_evidence.get("built_at_run_id"):
+        return None, None, "state_out_of_sync_with_evidence"
+    if previous_state.get("denylist_fingerprint") != fingerprint_denylist_config(
+        training_corpus["denylist_config"]
+    ):
+        return None, None, "denylist_changed"
+    if previous_state.get("incremental_updates_since_full_rebuild", 0) >= build_options["full_rebuild_interval"]:
+        return None, None, "full_rebuild_interval_reached"
+
+    previous_fields = previous_evidence.get("fields")
+    if not isinstance(previous_fields, dict) or any(
+        not isinstance(previous_fields.get(field_name), dict)
+        or not isinstance(previous_fields[field_name].get("by_pim_category"), dict)
+        or not isinstance(previous_fields[field_name].get("token_category_occurrence_count"), dict)
+        for field_name in ("KEYWORD", "DESCRIPTION_SHORT", "CLASS_CODES")
+    ):
+        return None, None, "previous_evidence_incomplete"
+
+    upserted_keys = set(stable_training_set_changes["upserted_keys"])
+    replaced_records = stable_training_set_changes["replaced_records"]
+    expected_record_run_ids = {
+        key: last_seen_run_id
+        for key, last_seen_run_id in training_corpus["record_last_seen_run_ids"].items()
+        if key not in upserted_keys
+    }
+    for key, record in replaced_records.items():
+        if isinstance(record, dict):
+            expected_record_run_ids[key] = record.get("last_seen_run_id")
+    if previous_state.get("record_last_seen_run_ids") != expected_record_run_ids:
+        return None, None, "stable_training_set_out_of_sync"
+
+    previous_vocab_by_field = previous_state.get("vocab_by_field") or {}
+    for field_name in ("KEYWORD", "DESCRIPTION_SHORT"):
+        previous_vocab = set(previous_vocab_by_field.get(field_name) or [])
+        if plural_canonicalization_changed(previous_vocab, training_corpus["vocab_by_field"][field_name]):
+            return None, None, "plural_canonicalization_changed"
+
+    return previous_evidence, previous_state, None
+
+
+def section5_build_unigram_evidence(
+    run_receipt: dict,
+    training_corpus: dict | None = None,
+    artifact_store: ArtifactStore | None = None,
+    stable_training_set_changes: dict | None = None,
+) -> Tuple[dict, dict | None]:
+    input_bucket = run_receipt["input_bucket"]
+    run_id = run_receipt["run_id"]
+    stable_training_set_key = run_receipt["stable_training_set_key"]
+    build_options = {**UNIGRAM_EVIDENCE_BUILD_DEFAULTS, **(run_receipt.get("unigram_evidence_build") or {})}
+    if build_options["mode"] not in EVIDENCE_BUILD_MODES:
+        raise ValueError(
+            f"Unsupported unigram_evidence_mode '{build_options['mode']}'; "
+            f"expected one of {', '.join(EVIDENCE_BUILD_MODES)}"
+        )
+    if build_options["engine"] not in EVIDENCE_BUILD_ENGINES:
+        raise ValueError(
+            f"Unsupported unigram_evidence_engine '{build_options['engine']}'; "
+            f"expected one of {', '.join(EVIDENCE_BUILD_ENGINES)}"
+        )
+
+    artifact_store = artifact_store or ArtifactStore(build_storage_backend(run_receipt.get("storage")))
+
+    if training_corpus is None:
+        run_receipt, training_corpus = section4_5_build_tokenized_training_corpus(
+            run_receipt, artifact_store=artifact_store
+        )
+
+    plural_map_keyword = training_corpus["plural_map_keyword"]
+    plural_map_description = training_corpus["plural_map_description"]
+    plural_changed_counts = training_corpus["plural_changed_counts"]
+    denylist_removed_counts = training_corpus["denylist_removed_counts"]
+
+    pim_categories_seen = training_corpus["pim_categories_seen"]
+    product_count_total = len(training_corpus["products"])
+    missing_pim_categories = training_corpus["missing_pim_categories"]
+    invalid_product_collections = training_corpus["invalid_product_collections"]
+
+    evidence_key = "canonical_mappings/stable_training_sets/StableTrainingEvidence_Unigrams_v1.json"
+    state_key = "canonical_mappings/stable_training_sets/StableTrainingEvidence_Unigrams_v1_state.json"
+    previous_evidence, previous_state, full_rebuild_reason = resolve_unigram_evidence_incremental_base(
+        run_receipt,
+        artifact_store,
+        evidence_key,
+        state_key,
+        stable_training_set_changes,
+        training_corpus,
+        build_options,
+    )
+
+    field_aggregates = None
+    verify_matches_full_rebuild = None
+    training_delta = None
+    if previous_evidence is not None:
+        tokenizer = training_corpus["text_tokenizer"]
+        previous_vocab_by_field = {
+            field_name: set(tokens) for field_name, tokens in previous_state["vocab_by_field"].items()
         }
+        removed_products = tokenize_training_records(
+            list(stable_training_set_changes["replaced_records"].values()),
+            tokenizer,
+            previous_vocab_by_field,
+            training_corpus["denylist_config"],
+        )
+        added_products = tokenize_training_records(
+            list(stable_training_set_changes["upserted_records"].values()),
+            tokenizer,
+            training_corpus["vocab_by_field"],
+            training_corpus["denylist_config"],
+        )
+        field_aggregates = previous_evidence["fields"]
+        try:
+            apply_unigram_evidence_delta(field_aggregates, removed_products, added_products)
+            field_aggregates = sort_unigram_evidence_fields(field_aggregates)
+        except ValueError as exc:
+            print(f"Incremental unigram evidence update failed, rebuilding in full: {exc}")
+            field_aggregates = None
+            full_rebuild_reason = "incremental_update_inconsistent"
+        else:
+            training_delta = {
+                "previous_unigram_evidence_run_id": previous_evidence.get("built_at_run_id"),
+                "removed_products": removed_products,
+                "added_products": added_products,
+            }
+
+    if field_aggregates is None or build_options["mode"] == "verify":
+        build_field_aggregates = (
+            build_unigram_field_aggregates_sparse
+            if build_options["engine"] == "sparse"
+            else build_unigram_field_aggregates
+        )
+        full_field_aggregates = sort_unigram_evidence_fields(
+            build_field_aggregates(training_corpus["products"], training_corpus["token_vocabularies"])
+        )
+        if field_aggregates is not None:
+            verify_matches_full_rebuild = serialized_json_equal(field_aggregates, full_field_aggregates)
+            if not verify_matches_full_rebuild:
+                run_receipt.setdefault("notes", []).append(
+                    "Incremental unigram evidence differed from full rebuild; wrote full rebuild."
+                )
+                full_rebuild_reason = "verify_mismatch"
+                training_delta = None
+        field_aggregates = full_field_aggregates
+
+    if full_rebuild_reason is None and build_options["mode"] != "verify":
+        incremental_updates_since_full_rebuild = (
+            previous_state.get("incremental_updates_since_full_rebuild", 0) + 1
+        )
+    else:
+        incremental_updates_since_full_rebuild = 0
 
     evidence_body = {
         "schema_version": "StableTrainingEvidence_Unigrams_v1",
@@ -987,17 +3333,32 @@ def section5_build_unigram_evidence(run_receipt: dict) -> dict:
         "fields": field_aggregates,
     }
 
-    evidence_key = "canonical_mappings/stable_training_sets/StableTrainingEvidence_Unigrams_v1.json"
-    s3_client.put_object(Bucket=input_bucket, Key=evidence_key, Body=json.dumps(evidence_body, indent=2))
+    artifact_store.put_json(input_bucket, evidence_key, evidence_body)
+
+    state_body = {
+        "schema_version": "StableTrainingEvidence_Unigrams_v1_State",
+        "evidence_built_at_run_id": run_id,
+        "normalization_version": NORMALIZATION_VERSION,
+        "denylist_fingerprint": fingerprint_denylist_config(training_corpus["denylist_config"]),
+        "incremental_updates_since_full_rebuild": incremental_updates_since_full_rebuild,
+        "record_last_seen_run_ids": training_corpus["record_last_seen_run_ids"],
+        "vocab_by_field": {
+            field_name: sorted(training_corpus["vocab_by_field"][field_name])
+            for field_name in ("KEYWORD", "DESCRIPTION_SHORT")
+        },
+    }
+    artifact_store.put_json(input_bucket, state_key, state_body)
 
     outputs_written = run_receipt.setdefault("outputs_written", {})
     outputs_written["stable_training_evidence_unigrams_key"] = evidence_key
+    outputs_written["stable_training_evidence_unigrams_state_key"] = state_key
 
     run_receipt.setdefault("counts", {})["stable_training_evidence_unigrams"] = {
         "pim_category_count": len(pim_categories_seen),
         "product_count_total": product_count_total,
         "unique_token_count_by_field": {
-            field_name: len(tokens) for field_name, tokens in field_unique_tokens.items()
+            field_name: len(field_data["token_category_occurrence_count"])
+            for field_name, field_data in field_aggregates.items()
         },
         "plural_map_size_by_field": {
             "KEYWORD": len(plural_map_keyword),
@@ -1006,6 +3367,14 @@ def section5_build_unigram_evidence(run_receipt: dict) -> dict:
         "plural_normalization_changed_tokens_keyword": plural_changed_counts["KEYWORD"],
         "plural_normalization_changed_tokens_description": plural_changed_counts["DESCRIPTION_SHORT"],
         "denylist_removed_tokens_by_field": denylist_removed_counts,
+        "build": {
+            "mode": build_options["mode"],
+            "incremental": full_rebuild_reason is None,
+            "full_rebuild_reason": full_rebuild_reason,
+            "incremental_updates_since_full_rebuild": incremental_updates_since_full_rebuild,
+            "delta_upserted_key_count": len((stable_training_set_changes or {}).get("upserted_keys", [])),
+            "verify_matches_full_rebuild": verify_matches_full_rebuild,
+        },
     }
 
     if missing_pim_categories:
@@ -1017,35 +3386,758 @@ def section5_build_unigram_evidence(run_receipt: dict) -> dict:
             f"Skipped {invalid_product_collections} StableTrainingSet records with non-list products"
         )
 
-    return run_receipt
+    return run_receipt, training_delta
+
+
+# === Section 6.6: ACTIVE (Build StableTrainingEvidence_Pairs_v1) ===
+
+
+def iter_token_pairs(tokens: Set[str]):
+    for left, right in combinations(sorted(tokens), 2):
+        yield f"{left}||{right}"
+
+
+def build_pair_evidence_fields(
+    products: List[Tuple[str, Dict[str, Set[int]]]],
+    token_vocabularies: Dict[str, TokenVocabulary],
+    eligible_tokens_by_field: Dict[str, Dict[str, Set[str]]],
+    stored_pair_count_min: int,
+) -> Tuple[Dict[str, dict], Dict[str, Dict[str, Dict[str, int]]]]:
+    eligible_ids_by_field: Dict[str, Dict[str, Set[int]]] = {
+        field_name: {
+            pim_category_id: token_vocabularies[field_name].encode(tokens)
+            for pim_category_id, tokens in eligible_tokens_by_category.items()
+        }
+        for field_name, eligible_tokens_by_category in eligible_tokens_by_field.items()
+    }
+
+    field_pair_aggregates: Dict[str, Dict[str, dict]] = {
+        "KEYWORD": {
+            "by_pim_category": defaultdict(
+                lambda: {"products_total": 0, "pair_counts": defaultdict(int)}
+            )
+        },
+        "DESCRIPTION_SHORT": {
+            "by_pim_category": defaultdict(
+                lambda: {"products_total": 0, "pair_counts": defaultdict(int)}
+            )
+        },
+        "CLASS_CODES": {
+            "by_pim_category": defaultdict(
+                lambda: {"products_total": 0, "pair_counts": defaultdict(int)}
+            )
+        },
+    }
+
+    stored_pairs_by_field: Dict[str, Set[int]] = {
+        "KEYWORD": set(),
+        "DESCRIPTION_SHORT": set(),
+        "CLASS_CODES": set(),
+    }
+
+    for pim_category_key, product_token_ids in products:
+        for field_name, token_ids in product_token_ids.items():
+            field_entry = field_pair_aggregates[field_name]["by_pim_category"][
+                pim_category_key
+            ]
+            field_entry["products_total"] += 1
+
+            eligible_ids = eligible_ids_by_field[field_name].get(pim_category_key, set())
+            eligible_product_ids = token_ids & eligible_ids
+            if len(eligible_product_ids) < 2:
+                continue
+
+            pair_counts = field_entry["pair_counts"]
+            for pair_key in iter_token_id_pairs(eligible_product_ids):
+                pair_counts[pair_key] += 1
+
+    pair_category_occurrence_count_by_field: Dict[str, Dict[int, int]] = {}
+    pair_counts_pruned_by_field: Dict[str, Dict[str, Dict[int, int]]] = {}
+
+    for field_name in ["KEYWORD", "DESCRIPTION_SHORT", "CLASS_CODES"]:
+        pair_category_occurrence_count: Dict[int, int] = defaultdict(int)
+        pair_counts_pruned_by_category: Dict[str, Dict[int, int]] = {}
+
+        for pim_category_id, pim_data in field_pair_aggregates[field_name]["by_pim_category"].items():
+            pair_counts_pruned = {
+                pair_key: count
+                for pair_key, count in pim_data["pair_counts"].items()
+                if count >= stored_pair_count_min
+            }
+            stored_pairs_by_field[field_name].update(pair_counts_pruned.keys())
+            for pair_key in pair_counts_pruned.keys():
+                pair_category_occurrence_count[pair_key] += 1
+            pair_counts_pruned_by_category[pim_category_id] = pair_counts_pruned
+
+        pair_category_occurrence_count_by_field[field_name] = pair_category_occurrence_count
+        pair_counts_pruned_by_field[field_name] = pair_counts_pruned_by_category
+
+    # Pass 2: compute occurrence_any for stored pairs only
+    pair_category_occurrence_any_by_field: Dict[str, Dict[int, int]] = {
+        "KEYWORD": defaultdict(int),
+        "DESCRIPTION_SHORT": defaultdict(int),
+        "CLASS_CODES": defaultdict(int),
+    }
+    pair_counts_any_by_field: Dict[str, Dict[str, Dict[int, int]]] = {
+        "KEYWORD": defaultdict(lambda: defaultdict(int)),
+        "DESCRIPTION_SHORT": defaultdict(lambda: defaultdict(int)),
+        "CLASS_CODES": defaultdict(lambda: defaultdict(int)),
+    }
+
+    ids_in_stored_pairs: Dict[str, Set[int]] = {
+        field_name: set() for field_name in ["KEYWORD", "DESCRIPTION_SHORT", "CLASS_CODES"]
+    }
+    for field_name, stored_pairs in stored_pairs_by_field.items():
+        for pair_key in stored_pairs:
+            ids_in_stored_pairs[field_name].add(pair_key >> PAIR_KEY_SHIFT)
+            ids_in_stored_pairs[field_name].add(pair_key & PAIR_KEY_MASK)
+
+    for pim_category_key, product_token_ids in products:
+        for field_name, token_ids in product_token_ids.items():
+            candidate_ids = token_ids & ids_in_stored_pairs[field_name]
+            if len(candidate_ids) < 2:
+                continue
+
+            stored_pairs = stored_pairs_by_field[field_name]
+            pair_counts_any = pair_counts_any_by_field[field_name][pim_category_key]
+            for pair_key in iter_token_id_pairs(candidate_ids):
+                if pair_key not in stored_pairs:
+                    continue
+                if pair_key not in pair_counts_any:
+                    pair_category_occurrence_any_by_field[field_name][pair_key] += 1
+                pair_counts_any[pair_key] += 1
+
+    # Pair strings only come back here, when the JSON schema is produced.
+    fields_output: Dict[str, dict] = {}
+    raw_pair_counts_by_field: Dict[str, Dict[str, Dict[str, int]]] = {}
+
+    for field_name in ["KEYWORD", "DESCRIPTION_SHORT", "CLASS_CODES"]:
+        decode_pair = token_vocabularies[field_name].decode_pair
+        # Every stored or any-counted pair is also a raw pair, so one decoded string is shared.
+        pair_strings: Dict[int, str] = {}
+        for pim_data in field_pair_aggregates[field_name]["by_pim_category"].values():
+            for pair_key in pim_data["pair_counts"]:
+                if pair_key not in pair_strings:
+                    pair_strings[pair_key] = decode_pair(pair_key)
+        by_pim_category_output: Dict[str, dict] = {}
+        raw_pair_counts_by_field[field_name] = {}
+
+        for pim_category_id, pim_data in field_pair_aggregates[field_name]["by_pim_category"].items():
+            raw_pair_counts = pim_data["pair_counts"]
+            pair_counts_pruned = pair_counts_pruned_by_field[field_name][pim_category_id]
+            pair_counts_any = pair_counts_any_by_field[field_name].get(pim_category_id, {})
+            raw_pair_counts_by_field[field_name][pim_category_id] = {
+                pair_strings[pair_key]: raw_pair_counts[pair_key] for pair_key in sorted(raw_pair_counts)
+            }
+            by_pim_category_output[pim_category_id] = {
+                "products_total": pim_data["products_total"],
+                "pair_counts": {
+                    pair_strings[pair_key]: pair_counts_pruned[pair_key]
+                    for pair_key in sorted(pair_counts_pruned)
+                },
+                "pair_counts_any": {
+                    pair_strings[pair_key]: pair_counts_any[pair_key]
+                    for pair_key in sorted(pair_counts_any)
+                },
+            }
+
+        pair_category_occurrence_count = pair_category_occurrence_count_by_field[field_name]
+        pair_category_occurrence_any = pair_category_occurrence_any_by_field[field_name]
+        fields_output[field_name] = {
+            "by_pim_category": by_pim_category_output,
+            "pair_category_occurrence_count": {
+                pair_strings[pair_key]: pair_category_occurrence_count[pair_key]
+                for pair_key in sorted(pair_category_occurrence_count)
+            },
+            "pair_category_occurrence_any": {
+                pair_strings[pair_key]: pair_category_occurrence_any[pair_key]
+                for pair_key in sorted(pair_category_occurrence_any)
+            },
+        }
+        # Release the int-keyed counts of this field before decoding the next one.
+        field_pair_aggregates[field_name]["by_pim_category"].clear()
+        pair_counts_pruned_by_field[field_name].clear()
+        pair_counts_any_by_field[field_name].clear()
+
+    return fields_output, raw_pair_counts_by_field
+
+
+def _category_pair_counts(category_incidence: "sparse.csr_matrix", token_ids: "np.ndarray") -> Tuple["np.ndarray", "np.ndarray"]:
+    # Pair keys and product counts of a category over token_ids (sorted): the strict upper triangle of
+    # the Gram matrix of its incidence rows restricted to those token columns, sorted by pair key.
+    if len(token_ids) < 2:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    restricted = category_incidence[:, token_ids]
+    gram = sparse.triu(restricted.T @ restricted, k=1).tocoo()
+    pair_keys = token_ids[gram.row] << PAIR_KEY_SHIFT | token_ids[gram.col]
+    pair_order = np.argsort(pair_keys)
+    return pair_keys[pair_order], gram.data[pair_order].astype(np.int64)
+
+
+def build_pair_evidence_fields_sparse(
+    products: List[Tuple[str, Dict[str, Set[int]]]],
+    token_vocabularies: Dict[str, TokenVocabulary],
+    eligible_tokens_by_field: Dict[str, Dict[str, Set[str]]],
+    stored_pair_count_min: int,
+) -> Tuple[Dict[str, dict], Dict[str, Dict[str, Dict[str, int]]]]:
+    # Same outputs as build_pair_evidence_fields. A category's raw pair counts come from the Gram
+    # matrix over its eligible tokens, its pair_counts_any from the Gram matrix over the tokens of
+    # stored pairs, keeping stored pairs only.
+    fields_output: Dict[str, dict] = {}
+    raw_pair_counts_by_field: Dict[str, Dict[str, Dict[str, int]]] = {}
+
+    for field_name in ["KEYWORD", "DESCRIPTION_SHORT", "CLASS_CODES"]:
+        token_vocabulary = token_vocabularies[field_name]
+        incidence, pim_category_keys, offsets = build_field_incidence_matrix(
+            products, field_name, len(token_vocabulary)
+        )
+        eligible_tokens_by_category = eligible_tokens_by_field.get(field_name, {})
+        category_incidences = [
+            incidence[offsets[category_index] : offsets[category_index + 1]]
+            for category_index in range(len(pim_category_keys))
+        ]
+
+        raw_pair_counts: List[Tuple["np.ndarray", "np.ndarray"]] = []
+        for category_index, pim_category_id in enumerate(pim_category_keys):
+            eligible_ids = np.array(
+                sorted(token_vocabulary.encode(eligible_tokens_by_category.get(pim_category_id, set()))),
+                dtype=np.int64,
+            )
+            raw_pair_counts.append(_category_pair_counts(category_incidences[category_index], eligible_ids))
+
+        stored_pair_keys = [pair_keys[counts >= stored_pair_count_min] for pair_keys, counts in raw_pair_counts]
+        stored_pairs, pair_category_occurrence_count = np.unique(
+            np.concatenate(stored_pair_keys or [np.zeros(0, dtype=np.int64)]), return_counts=True
+        )
+        ids_in_stored_pairs = np.union1d(stored_pairs >> PAIR_KEY_SHIFT, stored_pairs & PAIR_KEY_MASK)
+
+        any_pair_counts: List[Tuple["np.ndarray", "np.ndarray"]] = []
+        for category_incidence in category_incidences:
+            pair_keys, counts = _category_pair_counts(category_incidence, ids_in_stored_pairs)
+            is_stored = np.isin(pair_keys, stored_pairs, assume_unique=True)
+            any_pair_counts.append((pair_keys[is_stored], counts[is_stored]))
+        any_pairs, pair_category_occurrence_any = np.unique(
+            np.concatenate([pair_keys for pair_keys, _ in any_pair_counts] or [np.zeros(0, dtype=np.int64)]),
+            return_counts=True,
+        )
+        del incidence, category_incidences
+
+        # Pair strings only come back here, when the JSON schema is produced.
+        decode_pair = token_vocabulary.decode_pair
+        pair_strings: Dict[int, str] = {}
+
+        def decode_counts(pair_keys: "np.ndarray", counts: "np.ndarray") -> Dict[str, int]:
+            decoded: Dict[str, int] = {}
+            for pair_key, count in zip(pair_keys.tolist(), counts.tolist()):
+                pair_string = pair_strings.get(pair_key)
+                if pair_string is None:
+                    pair_string = pair_strings[pair_key] = decode_pair(pair_key)
+                decoded[pair_string] = count
+            return decoded
+
+        products_totals = np.diff(offsets).tolist()
+        by_pim_category_output: Dict[str, dict] = {}
+        raw_pair_counts_by_field[field_name] = {}
+        for category_index, pim_category_id in enumerate(pim_category_keys):
+            pair_keys, counts = raw_pair_counts[category_index]
+            is_stored = counts >= stored_pair_count_min
+            raw_pair_counts_by_field[field_name][pim_category_id] = decode_counts(pair_keys, counts)
+            by_pim_category_output[pim_category_id] = {
+                "products_total": products_totals[category_index],
+                "pair_counts": decode_counts(pair_keys[is_stored], counts[is_stored]),
+                "pair_counts_any": decode_counts(*any_pair_counts[category_index]),
+            }
+
+        fields_output[field_name] = {
+            "by_pim_category": by_pim_category_output,
+            "pair_category_occurrence_count": decode_counts(stored_pairs, pair_category_occurrence_count),
+            "pair_category_occurrence_any": decode_counts(any_pairs, pair_category_occurrence_any),
+        }
+
+    return fields_output, raw_pair_counts_by_field
+
+
+PAIR_SKETCH_BATCH_SIZE = 1 << 18
+
+
+class CountMinSketch:
+    # Count-Min sketch over (category index, pair key) occurrences: depth rows of width uint32
+    # counters, one multiply-shift hash per row. Estimates never undercount; with probability
+    # 1 - delta one overcounts by at most epsilon * total.
+
+    _ROW_SEEDS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0xD6E8FEB86659FD93,
+                  0xFF51AFD7ED558CCD, 0xC4CEB9FE1A85EC53, 0x27D4EB2F165667C5, 0x85EBCA77C2B2AE63)
+
+    def __init__(self, memory_bytes: int, depth: int):
+        if np is None:
+            raise ImportError("numpy is required for heavy_hitters pair evidence counting")
+        if not 1 <= depth <= len(self._ROW_SEEDS):
+            raise ValueError(f"Count-Min sketch depth must be between 1 and {len(self._ROW_SEEDS)}, got {depth}")
+        width_bits = (memory_bytes // (4 * depth)).bit_length() - 1
+        if width_bits < 10:
+            raise ValueError(f"Count-Min sketch memory of {memory_bytes} bytes is too small for depth {depth}")
+        self.depth = depth
+        self.width = 1 << width_bits
+        self._shift = np.uint64(64 - width_bits)
+        self._row_seeds = [np.uint64(seed) for seed in self._ROW_SEEDS[:depth]]
+        self.counters = np.zeros((depth, self.width), dtype=np.uint32)
+        self.total = 0
+
+    @property
+    def epsilon(self) -> float:
+        return math.e / self.width
+
+    @property
+    def delta(self) -> float:
+        return math.exp(-self.depth)
+
+    def _columns(self, category_indexes: "np.ndarray", pair_keys: "np.ndarray"):
+        # splitmix64 finalizer of the mixed key, then the top width_bits of one odd multiplier per row.
+        mixed = pair_keys ^ (category_indexes * np.uint64(0xBF58476D1CE4E5B9))
+        mixed ^= mixed >> np.uint64(31)
+        mixed *= np.uint64(0x94D049BB133111EB)
+        mixed ^= mixed >> np.uint64(29)
+        for row_seed in self._row_seeds:
+            yield ((mixed * row_seed) >> self._shift).astype(np.intp)
+
+    def add(self, category_indexes: "np.ndarray", pair_keys: "np.ndarray") -> None:
+        for row, columns in zip(self.counters, self._columns(category_indexes, pair_keys)):
+            # In place: a bincount over the full width would allocate twice the row per batch.
+            np.add.at(row, columns, 1)
+        self.total += len(pair_keys)
+
+    def estimate(self, category_indexes: "np.ndarray", pair_keys: "np.ndarray") -> "np.ndarray":
+        estimates = None
+        for row, columns in zip(self.counters, self._columns(category_indexes, pair_keys)):
+            row_estimates = row[columns]
+            estimates = row_estimates if estimates is None else np.minimum(estimates, row_estimates)
+        return estimates
+
+
+def _iter_field_pair_batches(
+    products: List[Tuple[str, Dict[str, Set[int]]]],
+    field_name: str,
+    category_indexes: Dict[str, int],
+    eligible_ids_by_category: List[Set[int]],
+):
+    # (category indexes, pair keys) of every eligible pair occurrence of the field, as uint64
+    # arrays of at most PAIR_SKETCH_BATCH_SIZE pairs.
+    batch_categories: List[int] = []
+    batch_pair_keys: List[int] = []
+    for pim_category_key, product_token_ids in products:
+        category_index = category_indexes[pim_category_key]
+        eligible_product_ids = product_token_ids[field_name] & eligible_ids_by_category[category_index]
+        if len(eligible_product_ids) < 2:
+            continue
+        pairs_before = len(batch_pair_keys)
+        batch_pair_keys.extend(iter_token_id_pairs(eligible_product_ids))
+        batch_categories.extend([category_index] * (len(batch_pair_keys) - pairs_before))
+        if len(batch_pair_keys) >= PAIR_SKETCH_BATCH_SIZE:
+            yield np.array(batch_categories, dtype=np.uint64), np.array(batch_pair_keys, dtype=np.uint64)
+            batch_categories.clear()
+            batch_pair_keys.clear()
+    if batch_pair_keys:
+        yield np.array(batch_categories, dtype=np.uint64), np.array(batch_pair_keys, dtype=np.uint64)
+
+
+def build_pair_evidence_fields_heavy_hitters(
+    products: List[Tuple[str, Dict[str, Set[int]]]],
+    token_vocabularies: Dict[str, TokenVocabulary],
+    eligible_tokens_by_field: Dict[str, Dict[str, Set[str]]],
+    stored_pair_count_min: int,
+    sketch_memory_mb: int,
+    sketch_depth: int,
+    max_candidate_pairs: int,
+) -> Tuple[Dict[str, dict], Dict[str, Dict[str, Dict[str, int]]], dict]:
+    # Same evidence as build_pair_evidence_fields without holding every raw pair count. Pass 1 feeds
+    # all pair occurrences of a field into a Count-Min sketch; pass 2 counts exactly only the pairs
+    # whose estimate reaches stored_pair_count_min. Estimates never undercount, so no stored pair is
+    # missed and every stored count is exact. Raw pair counts are not kept (returned empty).
+    fields_output: Dict[str, dict] = {}
+    raw_pair_counts_by_field: Dict[str, Dict[str, Dict[str, int]]] = {}
+    report_by_field: Dict[str, dict] = {}
+
+    for field_name in ["KEYWORD", "DESCRIPTION_SHORT", "CLASS_CODES"]:
+        token_vocabulary = token_vocabularies[field_name]
+        eligible_tokens_by_category = eligible_tokens_by_field.get(field_name, {})
+        category_indexes: Dict[str, int] = {}
+        products_totals: List[int] = []
+        eligible_ids_by_category: List[Set[int]] = []
+        for pim_category_key, _ in products:
+            category_index = category_indexes.setdefault(pim_category_key, len(category_indexes))
+            if category_index == len(products_totals):
+                products_totals.append(0)
+                eligible_ids_by_category.append(
+                    token_vocabulary.encode(eligible_tokens_by_category.get(pim_category_key, set()))
+                )
+            products_totals[category_index] += 1
+
+        # Pass 1: sketch every pair occurrence. The previous field's sketch is dropped first, so
+        # only one is allocated at a time.
+        sketch = None
+        sketch = CountMinSketch(sketch_memory_mb * 1024 * 1024, sketch_depth)
+        for batch_categories, batch_pair_keys in _iter_field_pair_batches(
+            products, field_name, category_indexes, eligible_ids_by_category
+        ):
+            sketch.add(batch_categories, batch_pair_keys)
+
+        # Pass 2: exact counts for candidate pairs only, within the candidate cap.
+        candidate_counts: List[Dict[int, int]] = [{} for _ in category_indexes]
+        candidate_pairs = 0
+        for batch_categories, batch_pair_keys in _iter_field_pair_batches(
+            products, field_name, category_indexes, eligible_ids_by_category
+        ):
+            is_candidate = sketch.estimate(batch_categories, batch_pair_keys) >= stored_pair_count_min
+            for category_index, pair_key in zip(
+                batch_categories[is_candidate].tolist(), batch_pair_keys[is_candidate].tolist()
+            ):
+                category_counts = candidate_counts[category_index]
+                if pair_key in category_counts:
+                    category_counts[pair_key] += 1
+                    continue
+                if candidate_pairs >= max_candidate_pairs:
+                    raise ValueError(
+                        f"Heavy-hitter pair counting for {field_name} exceeded max_candidate_pairs "
+                        f"({max_candidate_pairs}); raise pair_evidence_max_candidate_pairs, or "
+                        f"pair_evidence_sketch_memory_mb to cut false-positive candidates"
+                    )
+                category_counts[pair_key] = 1
+                candidate_pairs += 1
+
+        pair_counts_pruned_by_category: List[Dict[int, int]] = []
+        pair_category_occurrence_count: Dict[int, int] = defaultdict(int)
+        for category_counts in candidate_counts:
+            pair_counts_pruned = {
+                pair_key: count for pair_key, count in category_counts.items() if count >= stored_pair_count_min
+            }
+            for pair_key in pair_counts_pruned:
+                pair_category_occurrence_count[pair_key] += 1
+            pair_counts_pruned_by_category.append(pair_counts_pruned)
+        stored_pair_entries = sum(len(pair_counts_pruned) for pair_counts_pruned in pair_counts_pruned_by_category)
+        del candidate_counts
+
+        # pair_counts_any: stored pairs counted over all products of every category.
+        stored_pairs = set(pair_category_occurrence_count)
+        ids_in_stored_pairs: Set[int] = set()
+        for pair_key in stored_pairs:
+            ids_in_stored_pairs.add(pair_key >> PAIR_KEY_SHIFT)
+            ids_in_stored_pairs.add(pair_key & PAIR_KEY_MASK)
+        pair_counts_any_by_category: List[Dict[int, int]] = [defaultdict(int) for _ in category_indexes]
+        pair_category_occurrence_any: Dict[int, int] = defaultdict(int)
+        for pim_category_key, product_token_ids in products:
+            candidate_ids = product_token_ids[field_name] & ids_in_stored_pairs
+            if len(candidate_ids) < 2:
+                continue
+            pair_counts_any = pair_counts_any_by_category[category_indexes[pim_category_key]]
+            for pair_key in iter_token_id_pairs(candidate_ids):
+                if pair_key not in stored_pairs:
+                    continue
+                if pair_key not in pair_counts_any:
+                    pair_category_occurrence_any[pair_key] += 1
+                pair_counts_any[pair_key] += 1
+
+        # Pair strings only come back here, when the JSON schema is produced.
+        decode_pair = token_vocabulary.decode_pair
+        pair_strings = {pair_key: decode_pair(pair_key) for pair_key in stored_pairs}
+        by_pim_category_output: Dict[str, dict] = {}
+        for pim_category_id, category_index in category_indexes.items():
+            pair_counts_pruned = pair_counts_pruned_by_category[category_index]
+            pair_counts_any = pair_counts_any_by_category[category_index]
+            by_pim_category_output[pim_category_id] = {
+                "products_total": products_totals[category_index],
+                "pair_counts": {
+                    pair_strings[pair_key]: pair_counts_pruned[pair_key] for pair_key in sorted(pair_counts_pruned)
+                },
+                "pair_counts_any": {
+                    pair_strings[pair_key]: pair_counts_any[pair_key] for pair_key in sorted(pair_counts_any)
+                },
+            }
+        fields_output[field_name] = {
+            "by_pim_category": by_pim_category_output,
+            "pair_category_occurrence_count": {
+                pair_strings[pair_key]: pair_category_occurrence_count[pair_key]
+                for pair_key in sorted(pair_category_occurrence_count)
+            },
+            "pair_category_occurrence_any": {
+                pair_strings[pair_key]: pair_category_occurrence_any[pair_key]
+                for pair_key in sorted(pair_category_occurrence_any)
+            },
+        }
+        raw_pair_counts_by_field[field_name] = {}
+        report_by_field[field_name] = {
+            "pair_occurrences": sketch.total,
+            "overestimate_bound": math.ceil(sketch.epsilon * sketch.total),
+            "candidate_pairs": candidate_pairs,
+            "false_positive_candidate_pairs": candidate_pairs - stored_pair_entries,
+        }
+
+    heavy_hitter_report = {
+        "sketch_depth": sketch.depth,
+        "sketch_width": sketch.width,
+        "sketch_bytes": sketch.counters.nbytes,
+        "epsilon": sketch.epsilon,
+        "delta": sketch.delta,
+        "max_candidate_pairs": max_candidate_pairs,
+        "stored_pairs_exact": True,
+        **{
+            f"{report_key}_by_field": {
+                field_name: field_report[report_key] for field_name, field_report in report_by_field.items()
+            }
+            for report_key in ["pair_occurrences", "overestimate_bound", "candidate_pairs", "false_positive_candidate_pairs"]
+        },
+    }
+    return fields_output, raw_pair_counts_by_field, heavy_hitter_report
+
+
+def _adjust_pair_count(pair_counts: Dict[str, int], pair_key: str, step: int) -> int:
+    updated = pair_counts.get(pair_key, 0) + step
+    if updated < 0:
+        raise ValueError(f"Pair evidence count for '{pair_key}' would become negative")
+    if updated:
+        pair_counts[pair_key] = updated
+    else:
+        pair_counts.pop(pair_key, None)
+    return updated
+
+
+def pair_sort_key(pair_key: str) -> Tuple[str, str]:
+    # Order of packed token-id pairs: by left token, then right token (not by the joined string).
+    left, _, right = pair_key.partition("||")
+    return left, right
+
+
+def sort_pair_evidence_fields(
+    fields_output: Dict[str, dict], raw_pair_counts_by_field: Dict[str, Dict[str, Dict[str, int]]]
+) -> Tuple[Dict[str, dict], Dict[str, Dict[str, Dict[str, int]]]]:
+    # Canonical key order of the written evidence and state: pim categories sorted, pairs in the
+    # order of the full builders, so incremental updates and full rebuilds write the same bytes.
+    def sort_pairs(pair_counts: Dict[str, int]) -> Dict[str, int]:
+        return {pair_key: pair_counts[pair_key] for pair_key in sorted(pair_counts, key=pair_sort_key)}
+
+    sorted_fields_output = {
+        field_name: {
+            "by_pim_category": {
+                pim_category_id: {
+                    "products_total": pim_data["products_total"],
+                    "pair_counts": sort_pairs(pim_data["pair_counts"]),
+                    "pair_counts_any": sort_pairs(pim_data["pair_counts_any"]),
+                }
+                for pim_category_id, pim_data in sorted(field_data["by_pim_category"].items())
+            },
+            "pair_category_occurrence_count": sort_pairs(field_data["pair_category_occurrence_count"]),
+            "pair_category_occurrence_any": sort_pairs(field_data["pair_category_occurrence_any"]),
+        }
+        for field_name, field_data in fields_output.items()
+    }
+    sorted_raw_pair_counts_by_field = {
+        field_name: {
+            pim_category_id: sort_pairs(raw_pair_counts)
+            for pim_category_id, raw_pair_counts in sorted(raw_pair_counts_by_category.items())
+        }
+        for field_name, raw_pair_counts_by_category in raw_pair_counts_by_field.items()
+    }
+    return sorted_fields_output, sorted_raw_pair_counts_by_field
+
+
+def apply_pair_evidence_delta(
+    fields_output: Dict[str, dict],
+    raw_pair_counts_by_field: Dict[str, Dict[str, Dict[str, int]]],
+    previous_eligible_tokens_by_field: Dict[str, Dict[str, Set[str]]],
+    eligible_tokens_by_field: Dict[str, Dict[str, Set[str]]],
+    products_total_by_field: Dict[str, Dict[str, int]],
+    training_delta: dict,
+    products: List[Tuple[str, Dict[str, Set[int]]]],
+    token_vocabularies: Dict[str, TokenVocabulary],
+    stored_pair_count_min: int,
+) -> Dict[str, int]:
+    products_by_category: Dict[str, List[Dict[str, Set[int]]]] | None = None
+    recounted_categories_by_field: Dict[str, int] = {}
+
+    for field_name in ["KEYWORD", "DESCRIPTION_SHORT", "CLASS_CODES"]:
+        by_pim_category = fields_output[field_name]["by_pim_category"]
+        occurrence_count = fields_output[field_name]["pair_category_occurrence_count"]
+        occurrence_any = fields_output[field_name]["pair_category_occurrence_any"]
+        raw_pair_counts = raw_pair_counts_by_field[field_name]
+        products_total = products_total_by_field[field_name]
+        vocabulary = token_vocabularies[field_name]
+
+        added_by_category: Dict[str, List[Set[str]]] = defaultdict(list)
+        removed_by_category: Dict[str, List[Set[str]]] = defaultdict(list)
+        for pim_category_key, product_token_sets in training_delta["added_products"]:
+            added_by_category[pim_category_key].append(product_token_sets[field_name])
+        for pim_category_key, product_token_sets in training_delta["removed_products"]:
+            removed_by_category[pim_category_key].append(product_token_sets[field_name])
+        affected_categories = list(dict.fromkeys([*added_by_category, *removed_by_category]))
+
+        stored_pairs_before = set(occurrence_count)
+        recounted_categories_by_field[field_name] = 0
+
+        # Raw pair counts and the pruned pair_counts, for affected categories only.
+        for pim_category_key in affected_categories:
+            pim_entry = by_pim_category.get(pim_category_key)
+            if pim_category_key not in products_total:
+                raw_pair_counts.pop(pim_category_key, None)
+                if pim_entry is not None:
+                    del by_pim_category[pim_category_key]
+                    for pair_key in pim_entry["pair_counts"]:
+                        _adjust_pair_count(occurrence_count, pair_key, -1)
+                    for pair_key in pim_entry["pair_counts_any"]:
+                        _adjust_pair_count(occurrence_any, pair_key, -1)
+                continue
+
+            eligible_tokens = eligible_tokens_by_field[field_name].get(pim_category_key, set())
+            category_raw_counts = raw_pair_counts.get(pim_category_key)
+            if (
+                category_raw_counts is not None
+                and previous_eligible_tokens_by_field[field_name].get(pim_category_key) == eligible_tokens
+            ):
+                for tokens in added_by_category.get(pim_category_key, []):
+                    for pair_key in iter_token_pairs(tokens & eligible_tokens):
+                        _adjust_pair_count(category_raw_counts, pair_key, 1)
+                for tokens in removed_by_category.get(pim_category_key, []):
+                    for pair_key in iter_token_pairs(tokens & eligible_tokens):
+                        _adjust_pair_count(category_raw_counts, pair_key, -1)
+            else:
+                # Eligible tokens moved: recount this category's products from the corpus.
+                if products_by_category is None:
+                    products_by_category = defaultdict(list)
+                    for product_category_key, product_token_ids in products:
+                        products_by_category[product_category_key].append(product_token_ids)
+                eligible_ids = vocabulary.encode(eligible_tokens)
+                category_raw_counts = defaultdict(int)
+                for product_token_ids in products_by_category.get(pim_category_key, []):
+                    eligible_product_ids = product_token_ids[field_name] & eligible_ids
+                    if len(eligible_product_ids) < 2:
+                        continue
+                    for pair_key in iter_token_id_pairs(eligible_product_ids):
+                        category_raw_counts[pair_key] += 1
+                category_raw_counts = {
+                    vocabulary.decode_pair(pair_key): category_raw_counts[pair_key]
+                    for pair_key in sorted(category_raw_counts)
+                }
+                recounted_categories_by_field[field_name] += 1
+            raw_pair_counts[pim_category_key] = category_raw_counts
 
+            pair_counts_pruned = {
+                pair_key: count
+                for pair_key, count in category_raw_counts.items()
+                if count >= stored_pair_count_min
+            }
+            previous_pair_counts = pim_entry["pair_counts"] if pim_entry is not None else {}
+            for pair_key in previous_pair_counts.keys() - pair_counts_pruned.keys():
+                _adjust_pair_count(occurrence_count, pair_key, -1)
+            for pair_key in pair_counts_pruned.keys() - previous_pair_counts.keys():
+                _adjust_pair_count(occurrence_count, pair_key, 1)
+
+            if pim_entry is None:
+                by_pim_category[pim_category_key] = {
+                    "products_total": products_total[pim_category_key],
+                    "pair_counts": pair_counts_pruned,
+                    "pair_counts_any": {},
+                }
+            else:
+                pim_entry["products_total"] = products_total[pim_category_key]
+                pim_entry["pair_counts"] = pair_counts_pruned
+
+        # pair_counts_any / occurrence_any: delta for pairs stored before and after, a corpus
+        # count for newly stored pairs, and removal of pairs no longer stored anywhere.
+        stored_pairs_after = set(occurrence_count)
+        kept_pairs = stored_pairs_before & stored_pairs_after
+        entering_pairs = stored_pairs_after - stored_pairs_before
+        leaving_pairs = stored_pairs_before - stored_pairs_after
+
+        tokens_in_kept_pairs: Set[str] = set()
+        for pair_key in kept_pairs:
+            tokens_in_kept_pairs.update(pair_key.split("||"))
+
+        for pim_category_key in affected_categories:
+            pim_entry = by_pim_category.get(pim_category_key)
+            if pim_entry is None:
+                continue
+            pair_counts_any = pim_entry["pair_counts_any"]
+            for step, token_sets in (
+                (1, added_by_category.get(pim_category_key, [])),
+                (-1, removed_by_category.get(pim_category_key, [])),
+            ):
+                for tokens in token_sets:
+                    candidate_tokens = tokens & tokens_in_kept_pairs
+                    if len(candidate_tokens) < 2:
+                        continue
+                    for pair_key in iter_token_pairs(candidate_tokens):
+                        if pair_key not in kept_pairs:
+                            continue
+                        updated = _adjust_pair_count(pair_counts_any, pair_key, step)
+                        if step > 0 and updated == 1:
+                            _adjust_pair_count(occurrence_any, pair_key, 1)
+                        elif step < 0 and updated == 0:
+                            _adjust_pair_count(occurrence_any, pair_key, -1)
+
+        if leaving_pairs:
+            for pim_entry in by_pim_category.values():
+                for pair_key in leaving_pairs:
+                    pim_entry["pair_counts_any"].pop(pair_key, None)
+            for pair_key in leaving_pairs:
+                occurrence_any.pop(pair_key, None)
+
+        if entering_pairs:
+            tokens_in_entering_pairs: Set[str] = set()
+            for pair_key in entering_pairs:
+                tokens_in_entering_pairs.update(pair_key.split("||"))
+            ids_in_entering_pairs = vocabulary.encode(tokens_in_entering_pairs)
+            for pim_category_key, product_token_ids in products:
+                candidate_ids = product_token_ids[field_name] & ids_in_entering_pairs
+                if len(candidate_ids) < 2:
+                    continue
+                pair_counts_any = by_pim_category[pim_category_key]["pair_counts_any"]
+                for pair_key in map(vocabulary.decode_pair, iter_token_id_pairs(candidate_ids)):
+                    if pair_key not in entering_pairs:
+                        continue
+                    if _adjust_pair_count(pair_counts_any, pair_key, 1) == 1:
+                        _adjust_pair_count(occurrence_any, pair_key, 1)
 
-# === Section 6.6: ACTIVE (Build StableTrainingEvidence_Pairs_v1) ===
+    return recounted_categories_by_field
 
 
-def section6_6_build_pair_evidence(run_receipt: dict) -> dict:
+def section6_6_build_pair_evidence(
+    run_receipt: dict,
+    training_corpus: dict | None = None,
+    artifact_store: ArtifactStore | None = None,
+    training_delta: dict | None = None,
+) -> dict:
     input_bucket = run_receipt["input_bucket"]
     run_id = run_receipt["run_id"]
     stable_training_set_key = run_receipt["stable_training_set_key"]
     stable_training_evidence_unigrams_key = run_receipt.get("outputs_written", {}).get(
         "stable_training_evidence_unigrams_key"
     )
+    build_options = {**PAIR_EVIDENCE_BUILD_DEFAULTS, **(run_receipt.get("pair_evidence_build") or {})}
+    if build_options["mode"] not in EVIDENCE_BUILD_MODES:
+        raise ValueError(
+            f"Unsupported pair_evidence_mode '{build_options['mode']}'; "
+            f"expected one of {', '.join(EVIDENCE_BUILD_MODES)}"
+        )
+    if build_options["engine"] not in EVIDENCE_BUILD_ENGINES:
+        raise ValueError(
+            f"Unsupported pair_evidence_engine '{build_options['engine']}'; "
+            f"expected one of {', '.join(EVIDENCE_BUILD_ENGINES)}"
+        )
+    if build_options["counting"] not in PAIR_EVIDENCE_COUNTING_METHODS:
+        raise ValueError(
+            f"Unsupported pair_evidence_counting '{build_options['counting']}'; "
+            f"expected one of {', '.join(PAIR_EVIDENCE_COUNTING_METHODS)}"
+        )
 
     if not stable_training_evidence_unigrams_key:
         raise ValueError("stable_training_evidence_unigrams_key missing from run_receipt outputs")
 
-    s3_client = boto3.client("s3")
+    artifact_store = artifact_store or ArtifactStore(build_storage_backend(run_receipt.get("storage")))
 
-    def load_json_from_s3(bucket: str, key: str):
-        response = s3_client.get_object(Bucket=bucket, Key=key)
-        body = response["Body"].read().decode("utf-8")
-        return json.loads(body)
-
-    stable_training_set = load_json_from_s3(input_bucket, stable_training_set_key)
-    if not isinstance(stable_training_set, dict):
-        raise ValueError("StableTrainingSet must be a JSON object keyed by vendor::category")
+    if training_corpus is None:
+        run_receipt, training_corpus = section4_5_build_tokenized_training_corpus(
+            run_receipt, artifact_store=artifact_store
+        )
 
-    unigram_evidence = load_json_from_s3(input_bucket, stable_training_evidence_unigrams_key)
+    unigram_evidence = artifact_store.load_json(input_bucket, stable_training_evidence_unigrams_key)
     normalization_profile = unigram_evidence.get("normalization_profile")
     if not isinstance(normalization_profile, dict):
         raise ValueError("StableTrainingEvidence normalization_profile must be a dict")
@@ -1054,11 +4146,6 @@ def section6_6_build_pair_evidence(run_receipt: dict) -> dict:
     if not isinstance(fields, dict):
         raise ValueError("StableTrainingEvidence fields must be a dict")
 
-    stopwords_for_filtering = build_stopword_set()
-    plural_map_keyword, plural_map_description, _ = build_plural_maps_from_training_set(
-        stable_training_set, stopwords_for_filtering
-    )
-
     products_total_min = 8
     eligible_token_support_min = 5
     stored_pair_count_min = 5
@@ -1107,107 +4194,134 @@ def section6_6_build_pair_evidence(run_receipt: dict) -> dict:
                         eligible_tokens.add(token)
             eligible_tokens_by_field[field_name][str(pim_category_id)] = eligible_tokens
 
-    field_pair_aggregates: Dict[str, Dict[str, dict]] = {
-        "KEYWORD": {
-            "by_pim_category": defaultdict(
-                lambda: {"products_total": 0, "pair_counts": defaultdict(int)}
-            )
-        },
-        "DESCRIPTION_SHORT": {
-            "by_pim_category": defaultdict(
-                lambda: {"products_total": 0, "pair_counts": defaultdict(int)}
-            )
-        },
-        "CLASS_CODES": {
-            "by_pim_category": defaultdict(
-                lambda: {"products_total": 0, "pair_counts": defaultdict(int)}
-            )
-        },
+    evidence_key = "canonical_mappings/stable_training_sets/StableTrainingEvidence_Pairs_v1.json"
+    state_key = "canonical_mappings/stable_training_sets/StableTrainingEvidence_Pairs_v1_state.json"
+    pair_policy_thresholds = {
+        "products_total_min": products_total_min,
+        "eligible_token_support_min": eligible_token_support_min,
+        "stored_pair_count_min": stored_pair_count_min,
     }
-
-    stored_pairs_by_field: Dict[str, Set[str]] = {
-        "KEYWORD": set(),
-        "DESCRIPTION_SHORT": set(),
-        "CLASS_CODES": set(),
+    products_total_by_field = {
+        field_name: {
+            str(pim_category_id): pim_data["products_total"]
+            for pim_category_id, pim_data in fields[field_name]["by_pim_category"].items()
+        }
+        for field_name in ["KEYWORD", "DESCRIPTION_SHORT", "CLASS_CODES"]
     }
 
-    for record in stable_training_set.values():
-        if not isinstance(record, dict):
-            continue
-        pim_category_id = record.get("pim_category_id")
-        if pim_category_id is None:
-            continue
-
-        products = record.get("products") or []
-        if not isinstance(products, list):
-            continue
-
-        pim_category_key = str(pim_category_id)
-
-        for product in products:
-            if not isinstance(product, dict):
-                continue
-
-            product_token_sets = build_token_set_for_product(product, stopwords=stopwords_for_filtering)
-            product_token_sets["KEYWORD"] = {
-                plural_map_keyword.get(token, token) for token in product_token_sets["KEYWORD"]
+    full_rebuild_reason = None
+    previous_evidence = previous_state = None
+    if build_options["counting"] == "heavy_hitters":
+        # The incremental update needs the raw count of every pair, which this mode does not keep.
+        full_rebuild_reason = "pair_counting_heavy_hitters"
+    elif build_options["mode"] == "full":
+        full_rebuild_reason = "build_mode_full"
+    elif training_delta is None:
+        full_rebuild_reason = "training_delta_unavailable"
+    else:
+        previous_evidence = artifact_store.load_json_if_exists(input_bucket, evidence_key)
+        previous_state = artifact_store.load_json_if_exists(input_bucket, state_key)
+        if not isinstance(previous_evidence, dict) or not isinstance(previous_state, dict):
+            full_rebuild_reason = "previous_evidence_or_state_missing"
+        elif previous_state.get("evidence_built_at_run_id") != previous_evidence.get("built_at_run_id"):
+            full_rebuild_reason = "state_out_of_sync_with_evidence"
+        elif previous_state.get("unigram_evidence_built_at_run_id") != training_delta[
+            "previous_unigram_evidence_run_id"
+        ]:
+            full_rebuild_reason = "state_out_of_sync_with_unigram_evidence"
+        elif previous_state.get("pair_counting", "exact") != "exact":
+            full_rebuild_reason = "previous_state_without_raw_pair_counts"
+        elif previous_state.get("pair_policy_thresholds") != pair_policy_thresholds:
+            full_rebuild_reason = "pair_policy_changed"
+
+    fields_output = None
+    verify_matches_full_rebuild = None
+    recounted_categories_by_field = None
+    heavy_hitter_report = None
+    if build_options["counting"] == "heavy_hitters":
+        fields_output, raw_pair_counts_by_field, heavy_hitter_report = build_pair_evidence_fields_heavy_hitters(
+            training_corpus["products"],
+            training_corpus["token_vocabularies"],
+            eligible_tokens_by_field,
+            stored_pair_count_min,
+            int(build_options["sketch_memory_mb"]),
+            int(build_options["sketch_depth"]),
+            int(build_options["max_candidate_pairs"]),
+        )
+        fields_output, raw_pair_counts_by_field = sort_pair_evidence_fields(fields_output, raw_pair_counts_by_field)
+    elif full_rebuild_reason is None:
+        try:
+            fields_output = previous_evidence["fields"]
+            raw_pair_counts_by_field = {
+                field_name: previous_state["fields"][field_name]["raw_pair_counts_by_pim_category"]
+                for field_name in ["KEYWORD", "DESCRIPTION_SHORT", "CLASS_CODES"]
             }
-            product_token_sets["DESCRIPTION_SHORT"] = {
-                plural_map_description.get(token, token)
-                for token in product_token_sets["DESCRIPTION_SHORT"]
+            previous_eligible_tokens_by_field = {
+                field_name: {
+                    pim_category_id: set(tokens)
+                    for pim_category_id, tokens in previous_state["fields"][field_name][
+                        "eligible_tokens_by_pim_category"
+                    ].items()
+                }
+                for field_name in ["KEYWORD", "DESCRIPTION_SHORT", "CLASS_CODES"]
             }
+            recounted_categories_by_field = apply_pair_evidence_delta(
+                fields_output,
+                raw_pair_counts_by_field,
+                previous_eligible_tokens_by_field,
+                eligible_tokens_by_field,
+                products_total_by_field,
+                training_delta,
+                training_corpus["products"],
+                training_corpus["token_vocabularies"],
+                stored_pair_count_min,
+            )
+            fields_output, raw_pair_counts_by_field = sort_pair_evidence_fields(
+                fields_output, raw_pair_counts_by_field
+            )
+        except (KeyError, TypeError, ValueError) as exc:
+            print(f"Incremental pair evidence update failed, rebuilding in full: {exc}")
+            fields_output = None
+            full_rebuild_reason = "incremental_update_inconsistent"
+
+    if fields_output is None or build_options["mode"] == "verify":
+        # With heavy_hitters counting, verify mode checks the sketched evidence against exact counts.
+        build_fields = (
+            build_pair_evidence_fields_sparse if build_options["engine"] == "sparse" else build_pair_evidence_fields
+        )
+        full_fields_output, full_raw_pair_counts_by_field = sort_pair_evidence_fields(
+            *build_fields(
+                training_corpus["products"],
+                training_corpus["token_vocabularies"],
+                eligible_tokens_by_field,
+                stored_pair_count_min,
+            )
+        )
+        if heavy_hitter_report is not None:
+            heavy_hitter_report["verify_matches_exact"] = serialized_json_equal(fields_output, full_fields_output)
+            if not heavy_hitter_report["verify_matches_exact"]:
+                run_receipt.setdefault("notes", []).append(
+                    "Heavy-hitter pair evidence differed from exact counting; wrote exact counts."
+                )
+                fields_output = full_fields_output
+        else:
+            if fields_output is not None:
+                verify_matches_full_rebuild = serialized_json_equal(
+                    fields_output, full_fields_output
+                ) and serialized_json_equal(raw_pair_counts_by_field, full_raw_pair_counts_by_field)
+                if not verify_matches_full_rebuild:
+                    run_receipt.setdefault("notes", []).append(
+                        "Incremental pair evidence differed from full rebuild; wrote full rebuild."
+                    )
+                    full_rebuild_reason = "verify_mismatch"
+            fields_output = full_fields_output
+            raw_pair_counts_by_field = full_raw_pair_counts_by_field
 
-            for field_name, tokens in product_token_sets.items():
-                field_entry = field_pair_aggregates[field_name]["by_pim_category"][
-                    pim_category_key
-                ]
-                field_entry["products_total"] += 1
-
-                eligible_tokens = eligible_tokens_by_field[field_name].get(pim_category_key, set())
-                eligible_product_tokens = set(tokens) & eligible_tokens
-                if len(eligible_product_tokens) < 2:
-                    continue
-
-                sorted_tokens = sorted(eligible_product_tokens)
-                for left, right in combinations(sorted_tokens, 2):
-                    pair_key = f"{left}||{right}"
-                    field_entry["pair_counts"][pair_key] += 1
-
-    fields_output: Dict[str, dict] = {}
     pim_categories_total_by_field: Dict[str, int] = {}
     pim_categories_with_any_pair_by_field: Dict[str, int] = {}
     pairs_total_by_field: Dict[str, int] = {}
-    pair_category_occurrence_any_by_field: Dict[str, Dict[str, int]] = {
-        "KEYWORD": {},
-        "DESCRIPTION_SHORT": {},
-        "CLASS_CODES": {},
-    }
-
     for field_name in ["KEYWORD", "DESCRIPTION_SHORT", "CLASS_CODES"]:
-        by_pim_category_output: Dict[str, dict] = {}
-        pair_category_occurrence_count: Dict[str, int] = defaultdict(int)
-
-        for pim_category_id, pim_data in field_pair_aggregates[field_name]["by_pim_category"].items():
-            products_total = pim_data["products_total"]
-            pair_counts_pruned = {
-                pair_key: count
-                for pair_key, count in pim_data["pair_counts"].items()
-                if count >= stored_pair_count_min
-            }
-            stored_pairs_by_field[field_name].update(pair_counts_pruned.keys())
-            for pair_key in pair_counts_pruned.keys():
-                pair_category_occurrence_count[pair_key] += 1
-
-            by_pim_category_output[pim_category_id] = {
-                "products_total": products_total,
-                "pair_counts": pair_counts_pruned,
-            }
-
-        fields_output[field_name] = {
-            "by_pim_category": by_pim_category_output,
-            "pair_category_occurrence_count": dict(pair_category_occurrence_count),
-        }
-
+        by_pim_category_output = fields_output[field_name]["by_pim_category"]
         pim_categories_total_by_field[field_name] = len(by_pim_category_output)
         pim_categories_with_any_pair_by_field[field_name] = sum(
             1 for entry in by_pim_category_output.values() if entry["pair_counts"]
@@ -1216,76 +4330,6 @@ def section6_6_build_pair_evidence(run_receipt: dict) -> dict:
             len(entry["pair_counts"]) for entry in by_pim_category_output.values()
         )
 
-    # Pass 2: compute occurrence_any for stored pairs only
-    pair_seen_categories_by_field: Dict[str, Dict[str, Set[str]]] = {
-        "KEYWORD": defaultdict(set),
-        "DESCRIPTION_SHORT": defaultdict(set),
-        "CLASS_CODES": defaultdict(set),
-    }
-    pair_counts_any_by_field: Dict[str, Dict[str, Dict[str, int]]] = {
-        "KEYWORD": defaultdict(lambda: defaultdict(int)),
-        "DESCRIPTION_SHORT": defaultdict(lambda: defaultdict(int)),
-        "CLASS_CODES": defaultdict(lambda: defaultdict(int)),
-    }
-
-    tokens_in_stored_pairs: Dict[str, Set[str]] = {
-        field_name: set() for field_name in ["KEYWORD", "DESCRIPTION_SHORT", "CLASS_CODES"]
-    }
-    for field_name, stored_pairs in stored_pairs_by_field.items():
-        for pair_key in stored_pairs:
-            parts = pair_key.split("||")
-            if len(parts) != 2:
-                continue
-            tokens_in_stored_pairs[field_name].update(parts)
-
-    for record in stable_training_set.values():
-        if not isinstance(record, dict):
-            continue
-        pim_category_id = record.get("pim_category_id")
-        if pim_category_id is None:
-            continue
-
-        products = record.get("products") or []
-        if not isinstance(products, list):
-            continue
-
-        pim_category_key = str(pim_category_id)
-
-        for product in products:
-            if not isinstance(product, dict):
-                continue
-
-            product_token_sets = build_token_set_for_product(product, stopwords=stopwords_for_filtering)
-            product_token_sets["KEYWORD"] = {
-                plural_map_keyword.get(token, token) for token in product_token_sets["KEYWORD"]
-            }
-            product_token_sets["DESCRIPTION_SHORT"] = {
-                plural_map_description.get(token, token)
-                for token in product_token_sets["DESCRIPTION_SHORT"]
-            }
-
-            for field_name, tokens in product_token_sets.items():
-                candidate_tokens = set(tokens) & tokens_in_stored_pairs[field_name]
-                if len(candidate_tokens) < 2:
-                    continue
-
-                sorted_tokens = sorted(candidate_tokens)
-                for left, right in combinations(sorted_tokens, 2):
-                    pair_key = f"{left}||{right}"
-                    if pair_key not in stored_pairs_by_field[field_name]:
-                        continue
-                    pair_counts_any_by_field[field_name][pim_category_key][pair_key] += 1
-                    pair_seen_categories_by_field[field_name][pair_key].add(pim_category_key)
-
-    for field_name in ["KEYWORD", "DESCRIPTION_SHORT", "CLASS_CODES"]:
-        pair_category_occurrence_any_by_field[field_name] = {
-            pair_key: len(categories)
-            for pair_key, categories in pair_seen_categories_by_field[field_name].items()
-        }
-        for pim_category_id, pim_entry in fields_output[field_name]["by_pim_category"].items():
-            pair_counts_any = pair_counts_any_by_field[field_name].get(pim_category_id, {})
-            pim_entry["pair_counts_any"] = dict(pair_counts_any)
-
     evidence_body = {
         "schema_version": "StableTrainingEvidence_Pairs_v1",
         "built_at_run_id": run_id,
@@ -1306,25 +4350,48 @@ def section6_6_build_pair_evidence(run_receipt: dict) -> dict:
         "fields": fields_output,
     }
 
-    for field_name in ["KEYWORD", "DESCRIPTION_SHORT", "CLASS_CODES"]:
-        evidence_body["fields"][field_name]["pair_category_occurrence_any"] = (
-            pair_category_occurrence_any_by_field[field_name]
-        )
-
-    evidence_key = "canonical_mappings/stable_training_sets/StableTrainingEvidence_Pairs_v1.json"
-    s3_client.put_object(Bucket=input_bucket, Key=evidence_key, Body=json.dumps(evidence_body, indent=2))
+    artifact_store.put_json(input_bucket, evidence_key, evidence_body)
+
+    state_body = {
+        "schema_version": "StableTrainingEvidence_Pairs_v1_State",
+        "evidence_built_at_run_id": run_id,
+        "unigram_evidence_built_at_run_id": unigram_evidence.get("built_at_run_id"),
+        "pair_policy_thresholds": pair_policy_thresholds,
+        "pair_counting": build_options["counting"],
+        "fields": {
+            field_name: {
+                "eligible_tokens_by_pim_category": {
+                    pim_category_id: sorted(tokens)
+                    for pim_category_id, tokens in eligible_tokens_by_field[field_name].items()
+                },
+                "raw_pair_counts_by_pim_category": raw_pair_counts_by_field[field_name],
+            }
+            for field_name in ["KEYWORD", "DESCRIPTION_SHORT", "CLASS_CODES"]
+        },
+    }
+    artifact_store.put_json(input_bucket, state_key, state_body)
 
     outputs_written = run_receipt.setdefault("outputs_written", {})
     outputs_written["stable_training_evidence_pairs_key"] = evidence_key
+    outputs_written["stable_training_evidence_pairs_state_key"] = state_key
 
     run_receipt.setdefault("counts", {})["stable_training_evidence_pairs"] = {
         "pim_categories_total_by_field": pim_categories_total_by_field,
         "pim_categories_with_any_pair_by_field": pim_categories_with_any_pair_by_field,
         "pairs_total_by_field": pairs_total_by_field,
         "pairs_any_occurrence_indexed_by_field": {
-            field_name: len(pair_category_occurrence_any_by_field[field_name])
+            field_name: len(fields_output[field_name]["pair_category_occurrence_any"])
             for field_name in ["KEYWORD", "DESCRIPTION_SHORT", "CLASS_CODES"]
         },
+        "build": {
+            "mode": build_options["mode"],
+            "incremental": full_rebuild_reason is None,
+            "full_rebuild_reason": full_rebuild_reason,
+            "recounted_categories_by_field": recounted_categories_by_field,
+            "verify_matches_full_rebuild": verify_matches_full_rebuild,
+            "counting": build_options["counting"],
+            "heavy_hitters": heavy_hitter_report,
+        },
     }
 
     return run_receipt
@@ -1412,7 +4479,9 @@ def _compute_field_globals(evidence: dict, field_name: str) -> Tuple[dict, Dict[
     return field_globals, by_pim_category
 
 
-def section6_1_load_field_globals(run_receipt: dict) -> Tuple[dict, dict]:
+def section6_1_load_field_globals(
+    run_receipt: dict, artifact_store: ArtifactStore | None = None
+) -> Tuple[dict, dict]:
     input_bucket = run_receipt["input_bucket"]
     evidence_key = run_receipt.get("outputs_written", {}).get(
         "stable_training_evidence_unigrams_key"
@@ -1421,14 +4490,9 @@ def section6_1_load_field_globals(run_receipt: dict) -> Tuple[dict, dict]:
     if not evidence_key:
         raise ValueError("stable_training_evidence_unigrams_key missing from run_receipt outputs")
 
-    s3_client = boto3.client("s3")
-
-    def load_json_from_s3(bucket: str, key: str):
-        response = s3_client.get_object(Bucket=bucket, Key=key)
-        body = response["Body"].read().decode("utf-8")
-        return json.loads(body)
+    artifact_store = artifact_store or ArtifactStore(build_storage_backend(run_receipt.get("storage")))
 
-    evidence = load_json_from_s3(input_bucket, evidence_key)
+    evidence = artifact_store.load_json(input_bucket, evidence_key)
 
     normalization_profile = evidence.get("normalization_profile")
     if not isinstance(normalization_profile, dict):
@@ -1454,10 +4518,164 @@ def section6_1_load_field_globals(run_receipt: dict) -> Tuple[dict, dict]:
     return run_receipt, field_globals
 
 
+RULE_GENERATION_SHARDS_PER_WORKER = 4
+
+# Read-only inputs of the running rule generation; forked workers inherit them copy-on-write.
+_RULE_GENERATION_SHARED: dict = {}
+
+
+def resolve_worker_count(requested_workers, option_name: str) -> int:
+    workers = int(requested_workers)
+    if workers < 0:
+        raise ValueError(f"{option_name} workers must be >= 0, got {workers}")
+    if workers == 0:
+        workers = os.cpu_count() or 1
+    if "fork" not in multiprocessing.get_all_start_methods():
+        return 1
+    return workers
+
+
+def resolve_rule_generation_workers(run_receipt: dict) -> int:
+    options = {**RULE_GENERATION_DEFAULTS, **(run_receipt.get("rule_generation") or {})}
+    return resolve_worker_count(options["workers"], "rule_generation")
+
+
+def _generate_rule_shard(shard: Tuple[str, int, int]) -> List[Tuple[str, List[dict]]]:
+    field_name, start, stop = shard
+    generate_category_rules = _RULE_GENERATION_SHARED["generate_category_rules"]
+    field_context = _RULE_GENERATION_SHARED["field_contexts"][field_name]
+    shard_rules: List[Tuple[str, List[dict]]] = []
+    for pim_category_id, pim_data in field_context["category_items"][start:stop]:
+        rules = generate_category_rules(field_name, pim_category_id, pim_data, field_context)
+        if rules:
+            shard_rules.append((str(pim_category_id), rules))
+    return shard_rules
+
+
+def generate_rules_by_shard(
+    generate_category_rules,
+    field_contexts: Dict[str, dict],
+    workers: int,
+) -> List[Tuple[str, str, List[dict]]]:
+    shards: List[Tuple[str, int, int]] = []
+    for field_name, field_context in field_contexts.items():
+        category_count = len(field_context["category_items"])
+        shard_size = max(1, -(-category_count // (workers * RULE_GENERATION_SHARDS_PER_WORKER)))
+        for start in range(0, category_count, shard_size):
+            shards.append((field_name, start, min(start + shard_size, category_count)))
+
+    _RULE_GENERATION_SHARED.update(
+        {"generate_category_rules": generate_category_rules, "field_contexts": field_contexts}
+    )
+    try:
+        if workers <= 1 or len(shards) <= 1:
+            shard_results = [_generate_rule_shard(shard) for shard in shards]
+        else:
+            with multiprocessing.get_context("fork").Pool(processes=min(workers, len(shards))) as pool:
+                shard_results = pool.map(_generate_rule_shard, shards, chunksize=1)
+    finally:
+        _RULE_GENERATION_SHARED.clear()
+
+    # Shards are merged in submission order, which is the serial field/category order.
+    return [
+        (field_name, pim_category_key, rules)
+        for (field_name, _, _), shard_rules in zip(shards, shard_results)
+        for pim_category_key, rules in shard_rules
+    ]
+
+
+def _generate_contains_any_rules_for_category(
+    field_name: str, pim_category_id: str, pim_data: dict, field_context: dict
+) -> List[dict]:
+    if not isinstance(pim_data, dict):
+        raise ValueError(
+            f"StableTrainingEvidence {field_name}.by_pim_category entry '{pim_category_id}' must be a dict"
+        )
+
+    products_total = pim_data.get("products_total")
+    token_product_counts = pim_data.get("token_product_counts")
+
+    if not isinstance(products_total, int):
+        raise ValueError(
+            f"StableTrainingEvidence {field_name}.by_pim_category['{pim_category_id}'].products_total must be an int"
+        )
+    if products_total < field_context["products_total_min"]:
+        return []
+
+    if not isinstance(token_product_counts, dict):
+        raise ValueError(
+            f"StableTrainingEvidence {field_name}.by_pim_category['{pim_category_id}'].token_product_counts must be a dict"
+        )
+
+    support_ratio_min = field_context["support_ratio_min"]
+    support_count_min = field_context["support_count_min"]
+    global_products_total = field_context["global_products_total"]
+    global_token_support_count = field_context["global_token_support_count"]
+    token_category_occurrence_count = field_context["token_category_occurrence_count"]
+
+    rules: List[dict] = []
+    for token, inside_support in token_product_counts.items():
+        if not isinstance(inside_support, int):
+            raise ValueError(
+                f"StableTrainingEvidence token_product_counts values must be ints for {field_name}"
+            )
+
+        inside_ratio = inside_support / products_total if products_total else 0.0
+        if not (inside_ratio >= support_ratio_min or inside_support >= support_count_min):
+            continue
+
+        outside_total = global_products_total - products_total
+        outside_support = global_token_support_count.get(token, 0) - inside_support
+        outside_categories_with_support_count = (
+            token_category_occurrence_count.get(token, 0) - 1
+        )
+        if outside_support != 0:
+            continue
+
+        values_include = [token]
+        values_exclude: List[str] = []
+        include_str = ",".join(sorted(values_include))
+        exclude_str = ",".join(sorted(values_exclude))
+        rule_id_source = (
+            f"{pim_category_id}|{field_name}|contains_any|{include_str}|{exclude_str}"
+        )
+        rule_id = hashlib.sha1(rule_id_source.encode("utf-8")).hexdigest()
+
+        rule = {
+            "rule_id": rule_id,
+            "rule_spec": {
+                "field_name": field_name,
+                "operator": "contains_any",
+                "values_include": values_include,
+                "values_exclude": values_exclude,
+            },
+            "training_proof": {
+                "training_inside_products_total": products_total,
+                "training_inside_support_count": inside_support,
+                "training_inside_support_ratio": inside_ratio,
+                "training_outside_products_total": outside_total,
+                "training_outside_support_count": outside_support,
+                "training_outside_categories_with_support_count": max(
+                    outside_categories_with_support_count, 0
+                ),
+            },
+            "lifecycle": {
+                "created_run_id": field_context["run_id"],
+                "status": "active_unvalidated",
+                "last_validated_run_id": None,
+            },
+        }
+        rules.append(rule)
+
+    return rules
+
+
 def section6_2_generate_contains_any_rules(
     run_receipt: dict,
     field_globals: dict,
     evidence: dict | None = None,
+    artifact_store: ArtifactStore | None = None,
+    threshold_policy: dict | None = None,
 ) -> Tuple[dict, Dict[str, List[dict]], dict]:
     input_bucket = run_receipt["input_bucket"]
     evidence_key = run_receipt.get("outputs_written", {}).get(
@@ -1467,14 +4685,9 @@ def section6_2_generate_contains_any_rules(
     if not evidence_key:
         raise ValueError("stable_training_evidence_unigrams_key missing from run_receipt outputs")
 
-    s3_client = boto3.client("s3")
-
-    def load_json_from_s3(bucket: str, key: str):
-        response = s3_client.get_object(Bucket=bucket, Key=key)
-        body = response["Body"].read().decode("utf-8")
-        return json.loads(body)
+    artifact_store = artifact_store or ArtifactStore(build_storage_backend(run_receipt.get("storage")))
 
-    evidence = evidence or load_json_from_s3(input_bucket, evidence_key)
+    evidence = evidence or artifact_store.load_json(input_bucket, evidence_key)
 
     normalization_profile = evidence.get("normalization_profile")
     if not isinstance(normalization_profile, dict):
@@ -1491,13 +4704,15 @@ def section6_2_generate_contains_any_rules(
     total_rules_generated = 0
     rules_total_by_field: Dict[str, int] = defaultdict(int)
 
-    products_total_min = 8
-    support_ratio_min = 0.60
-    support_count_min = 5
+    threshold_policy = threshold_policy or THRESHOLD_POLICY
+    products_total_min = threshold_policy["products_total_min"]
+    support_ratio_min = threshold_policy["support_ratio_min"]
+    support_count_min = threshold_policy["support_count_min"]
 
-    def generate_rules_for_field(field_name: str):
-        nonlocal total_rules_generated
+    fields_processed = ["KEYWORD", "DESCRIPTION_SHORT", "CLASS_CODES"]
+    field_contexts: Dict[str, dict] = {}
 
+    for field_name in fields_processed:
         field_data = fields.get(field_name)
         if not isinstance(field_data, dict):
             raise ValueError(f"StableTrainingEvidence {field_name} section missing or invalid")
@@ -1526,87 +4741,27 @@ def section6_2_generate_contains_any_rules(
                 f"field_globals[{field_name}] token_category_occurrence_count must be a dict"
             )
 
-        for pim_category_id, pim_data in by_pim_category.items():
-            if not isinstance(pim_data, dict):
-                raise ValueError(
-                    f"StableTrainingEvidence {field_name}.by_pim_category entry '{pim_category_id}' must be a dict"
-                )
-
-            products_total = pim_data.get("products_total")
-            token_product_counts = pim_data.get("token_product_counts")
-
-            if not isinstance(products_total, int):
-                raise ValueError(
-                    f"StableTrainingEvidence {field_name}.by_pim_category['{pim_category_id}'].products_total must be an int"
-                )
-            if products_total < products_total_min:
-                continue
-
-            if not isinstance(token_product_counts, dict):
-                raise ValueError(
-                    f"StableTrainingEvidence {field_name}.by_pim_category['{pim_category_id}'].token_product_counts must be a dict"
-                )
-
-            for token, inside_support in token_product_counts.items():
-                if not isinstance(inside_support, int):
-                    raise ValueError(
-                        f"StableTrainingEvidence token_product_counts values must be ints for {field_name}"
-                    )
-
-                inside_ratio = inside_support / products_total if products_total else 0.0
-                if not (inside_ratio >= support_ratio_min or inside_support >= support_count_min):
-                    continue
-
-                outside_total = global_products_total - products_total
-                outside_support = global_token_support_count.get(token, 0) - inside_support
-                outside_categories_with_support_count = (
-                    token_category_occurrence_count.get(token, 0) - 1
-                )
-                if outside_support != 0:
-                    continue
-
-                values_include = [token]
-                values_exclude: List[str] = []
-                include_str = ",".join(sorted(values_include))
-                exclude_str = ",".join(sorted(values_exclude))
-                rule_id_source = (
-                    f"{pim_category_id}|{field_name}|contains_any|{include_str}|{exclude_str}"
-                )
-                rule_id = hashlib.sha1(rule_id_source.encode("utf-8")).hexdigest()
-
-                rule = {
-                    "rule_id": rule_id,
-                    "rule_spec": {
-                        "field_name": field_name,
-                        "operator": "contains_any",
-                        "values_include": values_include,
-                        "values_exclude": values_exclude,
-                    },
-                    "training_proof": {
-                        "training_inside_products_total": products_total,
-                        "training_inside_support_count": inside_support,
-                        "training_inside_support_ratio": inside_ratio,
-                        "training_outside_products_total": outside_total,
-                        "training_outside_support_count": outside_support,
-                        "training_outside_categories_with_support_count": max(
-                            outside_categories_with_support_count, 0
-                        ),
-                    },
-                    "lifecycle": {
-                        "created_run_id": run_receipt.get("run_id"),
-                        "status": "active_unvalidated",
-                        "last_validated_run_id": None,
-                    },
-                }
+        field_contexts[field_name] = {
+            "category_items": list(by_pim_category.items()),
+            "run_id": run_receipt.get("run_id"),
+            "products_total_min": products_total_min,
+            "support_ratio_min": support_ratio_min,
+            "support_count_min": support_count_min,
+            "global_products_total": global_products_total,
+            "global_token_support_count": global_token_support_count,
+            "token_category_occurrence_count": token_category_occurrence_count,
+        }
 
-                rules_by_pim_category[str(pim_category_id)].append(rule)
-                total_rules_generated += 1
-                rules_total_by_field[field_name] += 1
+    for field_name, pim_category_key, rules in generate_rules_by_shard(
+        _generate_contains_any_rules_for_category,
+        field_contexts,
+        resolve_rule_generation_workers(run_receipt),
+    ):
+        rules_by_pim_category[pim_category_key].extend(rules)
+        total_rules_generated += len(rules)
+        rules_total_by_field[field_name] += len(rules)
 
-    for field in ["KEYWORD", "DESCRIPTION_SHORT", "CLASS_CODES"]:
-        generate_rules_for_field(field)
 
-    fields_processed = ["KEYWORD", "DESCRIPTION_SHORT", "CLASS_CODES"]
     rules_summary = {
         "normalization_version": field_globals.get("normalization_version"),
         "total_rules_generated": total_rules_generated,
@@ -1617,13 +4772,98 @@ def section6_2_generate_contains_any_rules(
         "rules_total_by_operator": {"contains_any": total_rules_generated},
     }
 
-    return run_receipt, dict(rules_by_pim_category), rules_summary
+    return run_receipt, dict(rules_by_pim_category), rules_summary
+
+
+def _generate_contains_all_rules_for_category(
+    field_name: str, pim_category_id: str, pim_data: dict, field_context: dict
+) -> List[dict]:
+    if not isinstance(pim_data, dict):
+        raise ValueError(
+            f"StableTrainingEvidence_Pairs {field_name}.by_pim_category entry '{pim_category_id}' must be a dict"
+        )
+
+    products_total = pim_data.get("products_total")
+    pair_counts = pim_data.get("pair_counts")
+
+    if not isinstance(products_total, int):
+        raise ValueError(
+            f"StableTrainingEvidence_Pairs {field_name}.by_pim_category['{pim_category_id}'].products_total must be an int"
+        )
+    if products_total < field_context["products_total_min"]:
+        return []
+
+    if not isinstance(pair_counts, dict):
+        raise ValueError(
+            f"StableTrainingEvidence_Pairs {field_name}.by_pim_category['{pim_category_id}'].pair_counts must be a dict"
+        )
+
+    support_ratio_min = field_context["support_ratio_min"]
+    support_count_min = field_context["support_count_min"]
+    pair_category_occurrence_any = field_context["pair_category_occurrence_any"]
+
+    rules: List[dict] = []
+    for pair_key, inside_support in pair_counts.items():
+        if not isinstance(inside_support, int):
+            raise ValueError(
+                f"StableTrainingEvidence_Pairs {field_name} pair_counts values must be ints"
+            )
+
+        parts = pair_key.split("||")
+        if len(parts) != 2:
+            continue
+        values_include = [parts[0], parts[1]]
+
+        inside_ratio = inside_support / products_total if products_total else 0.0
+        if not (inside_support >= support_count_min or inside_ratio >= support_ratio_min):
+            continue
+
+        outside_occurrence_any = pair_category_occurrence_any.get(pair_key, 0)
+        if outside_occurrence_any != 1:
+            continue
+
+        values_exclude: List[str] = []
+        include_str = ",".join(values_include)
+        exclude_str = ",".join(sorted(values_exclude))
+        rule_id_source = (
+            f"{pim_category_id}|{field_name}|contains_all|{include_str}|{exclude_str}"
+        )
+        rule_id = hashlib.sha1(rule_id_source.encode("utf-8")).hexdigest()
+
+        rule = {
+            "rule_id": rule_id,
+            "rule_spec": {
+                "field_name": field_name,
+                "operator": "contains_all",
+                "values_include": values_include,
+                "values_exclude": values_exclude,
+            },
+            "training_proof": {
+                "training_inside_products_total": products_total,
+                "training_inside_support_count": inside_support,
+                "training_inside_support_ratio": inside_ratio,
+                "training_outside_support_count": 0,
+                "training_outside_categories_with_support_count": 0,
+                "training_uniqueness_basis": "pair_category_occurrence_any==1",
+            },
+            "evidence_source": "StableTrainingEvidence_Pairs_v1",
+            "lifecycle": {
+                "created_run_id": field_context["run_id"],
+                "status": "active_unvalidated",
+                "last_validated_run_id": None,
+            },
+        }
+        rules.append(rule)
+
+    return rules
 
 
 def section6_7_generate_contains_all_rules(
     run_receipt: dict,
     rules_by_pim_category: Dict[str, List[dict]],
     rules_summary: dict | None = None,
+    artifact_store: ArtifactStore | None = None,
+    threshold_policy: dict | None = None,
 ) -> Tuple[dict, Dict[str, List[dict]], dict]:
     input_bucket = run_receipt["input_bucket"]
     evidence_key = run_receipt.get("outputs_written", {}).get(
@@ -1633,21 +4873,17 @@ def section6_7_generate_contains_all_rules(
     if not evidence_key:
         raise ValueError("stable_training_evidence_pairs_key missing from run_receipt outputs")
 
-    s3_client = boto3.client("s3")
-
-    def load_json_from_s3(bucket: str, key: str):
-        response = s3_client.get_object(Bucket=bucket, Key=key)
-        body = response["Body"].read().decode("utf-8")
-        return json.loads(body)
+    artifact_store = artifact_store or ArtifactStore(build_storage_backend(run_receipt.get("storage")))
 
-    evidence = load_json_from_s3(input_bucket, evidence_key)
+    evidence = artifact_store.load_json(input_bucket, evidence_key)
     fields = evidence.get("fields")
     if not isinstance(fields, dict):
         raise ValueError("StableTrainingEvidence_Pairs fields must be a dict")
 
-    products_total_min = 8
-    support_ratio_min = 0.60
-    support_count_min = 5
+    threshold_policy = threshold_policy or THRESHOLD_POLICY
+    products_total_min = threshold_policy["products_total_min"]
+    support_ratio_min = threshold_policy["support_ratio_min"]
+    support_count_min = threshold_policy["support_count_min"]
 
     contains_all_total_by_field: Dict[str, int] = defaultdict(int)
     mutable_rules_by_category: Dict[str, List[dict]] = defaultdict(list)
@@ -1655,6 +4891,8 @@ def section6_7_generate_contains_all_rules(
     for pim_category_id, rules in rules_by_pim_category.items():
         mutable_rules_by_category[str(pim_category_id)].extend(rules)
 
+    field_contexts: Dict[str, dict] = {}
+
     for field_name in ["KEYWORD", "DESCRIPTION_SHORT", "CLASS_CODES"]:
         field_data = fields.get(field_name)
         if not isinstance(field_data, dict):
@@ -1672,80 +4910,22 @@ def section6_7_generate_contains_all_rules(
                 f"StableTrainingEvidence_Pairs {field_name}.pair_category_occurrence_any must be a dict"
             )
 
-        for pim_category_id, pim_data in by_pim_category.items():
-            if not isinstance(pim_data, dict):
-                raise ValueError(
-                    f"StableTrainingEvidence_Pairs {field_name}.by_pim_category entry '{pim_category_id}' must be a dict"
-                )
-
-            products_total = pim_data.get("products_total")
-            pair_counts = pim_data.get("pair_counts")
-
-            if not isinstance(products_total, int):
-                raise ValueError(
-                    f"StableTrainingEvidence_Pairs {field_name}.by_pim_category['{pim_category_id}'].products_total must be an int"
-                )
-            if products_total < products_total_min:
-                continue
-
-            if not isinstance(pair_counts, dict):
-                raise ValueError(
-                    f"StableTrainingEvidence_Pairs {field_name}.by_pim_category['{pim_category_id}'].pair_counts must be a dict"
-                )
-
-            for pair_key, inside_support in pair_counts.items():
-                if not isinstance(inside_support, int):
-                    raise ValueError(
-                        f"StableTrainingEvidence_Pairs {field_name} pair_counts values must be ints"
-                    )
-
-                parts = pair_key.split("||")
-                if len(parts) != 2:
-                    continue
-                values_include = [parts[0], parts[1]]
-
-                inside_ratio = inside_support / products_total if products_total else 0.0
-                if not (inside_support >= support_count_min or inside_ratio >= support_ratio_min):
-                    continue
-
-                outside_occurrence_any = pair_category_occurrence_any.get(pair_key, 0)
-                if outside_occurrence_any != 1:
-                    continue
-
-                values_exclude: List[str] = []
-                include_str = ",".join(values_include)
-                exclude_str = ",".join(sorted(values_exclude))
-                rule_id_source = (
-                    f"{pim_category_id}|{field_name}|contains_all|{include_str}|{exclude_str}"
-                )
-                rule_id = hashlib.sha1(rule_id_source.encode("utf-8")).hexdigest()
-
-                rule = {
-                    "rule_id": rule_id,
-                    "rule_spec": {
-                        "field_name": field_name,
-                        "operator": "contains_all",
-                        "values_include": values_include,
-                        "values_exclude": values_exclude,
-                    },
-                    "training_proof": {
-                        "training_inside_products_total": products_total,
-                        "training_inside_support_count": inside_support,
-                        "training_inside_support_ratio": inside_ratio,
-                        "training_outside_support_count": 0,
-                        "training_outside_categories_with_support_count": 0,
-                        "training_uniqueness_basis": "pair_category_occurrence_any==1",
-                    },
-                    "evidence_source": "StableTrainingEvidence_Pairs_v1",
-                    "lifecycle": {
-                        "created_run_id": run_receipt.get("run_id"),
-                        "status": "active_unvalidated",
-                        "last_validated_run_id": None,
-                    },
-                }
+        field_contexts[field_name] = {
+            "category_items": list(by_pim_category.items()),
+            "run_id": run_receipt.get("run_id"),
+            "products_total_min": products_total_min,
+            "support_ratio_min": support_ratio_min,
+            "support_count_min": support_count_min,
+            "pair_category_occurrence_any": pair_category_occurrence_any,
+        }
 
-                mutable_rules_by_category[str(pim_category_id)].append(rule)
-                contains_all_total_by_field[field_name] += 1
+    for field_name, pim_category_key, rules in generate_rules_by_shard(
+        _generate_contains_all_rules_for_category,
+        field_contexts,
+        resolve_rule_generation_workers(run_receipt),
+    ):
+        mutable_rules_by_category[pim_category_key].extend(rules)
+        contains_all_total_by_field[field_name] += len(rules)
 
     rules_total_by_field: Dict[str, int] = defaultdict(int)
     if rules_summary and "rules_total_by_field" in rules_summary:
@@ -1783,11 +4963,166 @@ def section6_7_generate_contains_all_rules(
     return run_receipt, dict(mutable_rules_by_category), updated_rules_summary
 
 
+def _build_token_postings(by_pim_category_unigram: dict, field_name: str) -> Dict[str, List[Tuple[str, int]]]:
+    token_postings: Dict[str, List[Tuple[str, int]]] = defaultdict(list)
+    for pim_category_id, pim_data in by_pim_category_unigram.items():
+        token_product_counts = pim_data.get("token_product_counts", {})
+        if not isinstance(token_product_counts, dict):
+            raise ValueError(
+                f"StableTrainingEvidence_Unigrams {field_name}.by_pim_category entries must contain token_product_counts dicts"
+            )
+        pim_category_key = str(pim_category_id)
+        for token, count in token_product_counts.items():
+            token_postings[token].append((pim_category_key, count))
+    return dict(token_postings)
+
+
+def _build_pair_any_postings(by_pim_category_pair: dict) -> Dict[str, Dict[str, int]]:
+    pair_any_postings: Dict[str, Dict[str, int]] = defaultdict(dict)
+    for pim_category_id, pim_entry in by_pim_category_pair.items():
+        if not isinstance(pim_entry, dict):
+            continue
+        pim_category_key = str(pim_category_id)
+        for pair_key, count_any in pim_entry.get("pair_counts_any", {}).items():
+            pair_any_postings[pair_key][pim_category_key] = count_any
+    return dict(pair_any_postings)
+
+
+def _generate_contains_any_exclude_any_rules_for_category(
+    field_name: str, pim_category_id: str, pim_data: dict, field_context: dict
+) -> List[dict]:
+    products_total = pim_data.get("products_total")
+    token_product_counts = pim_data.get("token_product_counts")
+    if not isinstance(products_total, int):
+        raise ValueError(
+            f"StableTrainingEvidence_Unigrams {field_name}.by_pim_category['{pim_category_id}'].products_total must be an int"
+        )
+    if products_total < field_context["products_total_min"]:
+        return []
+    if not isinstance(token_product_counts, dict):
+        raise ValueError(
+            f"StableTrainingEvidence_Unigrams {field_name}.by_pim_category['{pim_category_id}'].token_product_counts must be a dict"
+        )
+
+    support_ratio_min = field_context["support_ratio_min"]
+    support_count_min = field_context["support_count_min"]
+    global_products_total = field_context["global_products_total"]
+    token_category_occurrence_count = field_context["token_category_occurrence_count"]
+    token_postings = field_context["token_postings"]
+    pair_any_postings = field_context["pair_any_postings"]
+    adjacency_map = field_context["adjacency_map"]
+
+    pim_category_key = str(pim_category_id)
+    pair_counts_any = field_context["pair_counts_any_by_category"].get(pim_category_key, {})
+
+    eligible_include_tokens: List[str] = []
+    for token, support_count in token_product_counts.items():
+        if not isinstance(support_count, int):
+            raise ValueError(
+                f"StableTrainingEvidence token_product_counts values must be ints for {field_name}"
+            )
+        support_ratio = support_count / products_total if products_total else 0.0
+        if not (support_count >= support_count_min or support_ratio >= support_ratio_min):
+            continue
+        if token_category_occurrence_count.get(token, 0) <= 1:
+            continue
+        eligible_include_tokens.append(token)
+
+    rules: List[dict] = []
+    for token in eligible_include_tokens:
+        neighbors = adjacency_map.get(token, set())
+        if not neighbors:
+            continue
+
+        token_support_count = token_product_counts.get(token, 0)
+        for neighbor in neighbors:
+            if token == neighbor:
+                continue
+            left, right = sorted([token, neighbor])
+            pair_key = f"{left}||{right}"
+
+            inside_pair_any_support = pair_counts_any.get(pair_key, 0)
+            inside_support_without_neighbor = token_support_count - inside_pair_any_support
+            if inside_support_without_neighbor <= 0:
+                continue
+
+            inside_support_ratio = (
+                inside_support_without_neighbor / products_total if products_total else 0.0
+            )
+            if not (
+                inside_support_without_neighbor >= support_count_min
+                or inside_support_ratio >= support_ratio_min
+            ):
+                continue
+
+            outside_support_count = 0
+            outside_categories_with_support_count = 0
+            pair_any_by_category = pair_any_postings.get(pair_key, {})
+
+            # Outside support only comes from categories that contain the token, so candidates visit
+            # the token's posting list instead of every category.
+            for other_category_key, other_token_support in token_postings.get(token, []):
+                if other_category_key == pim_category_key:
+                    continue
+                other_pair_support = pair_any_by_category.get(other_category_key, 0)
+                outside_support_without_neighbor = other_token_support - other_pair_support
+                if outside_support_without_neighbor > 0:
+                    outside_support_count += outside_support_without_neighbor
+                    outside_categories_with_support_count += 1
+                    break
+
+            if outside_support_count != 0 or outside_categories_with_support_count != 0:
+                continue
+
+            outside_products_total = global_products_total - products_total
+
+            values_include = [token]
+            values_exclude = [neighbor]
+            include_str = ",".join(sorted(values_include))
+            exclude_str = ",".join(sorted(values_exclude))
+            rule_id_source = (
+                f"{pim_category_key}|{field_name}|contains_any_exclude_any|{include_str}|{exclude_str}"
+            )
+            rule_id = hashlib.sha1(rule_id_source.encode("utf-8")).hexdigest()
+
+            rule = {
+                "rule_id": rule_id,
+                "rule_spec": {
+                    "field_name": field_name,
+                    "operator": "contains_any_exclude_any",
+                    "values_include": values_include,
+                    "values_exclude": values_exclude,
+                },
+                "training_proof": {
+                    "training_inside_products_total": products_total,
+                    "training_inside_support_count": inside_support_without_neighbor,
+                    "training_inside_support_ratio": inside_support_ratio,
+                    "training_inside_support_count_a": token_support_count,
+                    "training_inside_support_count_pair": inside_pair_any_support,
+                    "training_outside_products_total": outside_products_total,
+                    "training_outside_support_count": outside_support_count,
+                    "training_outside_categories_with_support_count": outside_categories_with_support_count,
+                    "training_uniqueness_basis": "outside_support==0_for_A_and_not_B",
+                },
+                "evidence_source": "StableTrainingEvidence_Pairs_v1",
+                "lifecycle": {
+                    "created_run_id": field_context["run_id"],
+                    "status": "active_unvalidated",
+                    "last_validated_run_id": None,
+                },
+            }
+            rules.append(rule)
+
+    return rules
+
+
 def section6_8_generate_contains_any_exclude_any_rules(
     run_receipt: dict,
     field_globals: dict,
     rules_by_pim_category: Dict[str, List[dict]],
     rules_summary: dict | None = None,
+    artifact_store: ArtifactStore | None = None,
+    threshold_policy: dict | None = None,
 ) -> Tuple[dict, Dict[str, List[dict]], dict]:
     input_bucket = run_receipt["input_bucket"]
     evidence_key_unigrams = run_receipt.get("outputs_written", {}).get(
@@ -1802,15 +5137,10 @@ def section6_8_generate_contains_any_exclude_any_rules(
     if not evidence_key_pairs:
         raise ValueError("stable_training_evidence_pairs_key missing from run_receipt outputs")
 
-    s3_client = boto3.client("s3")
-
-    def load_json_from_s3(bucket: str, key: str):
-        response = s3_client.get_object(Bucket=bucket, Key=key)
-        body = response["Body"].read().decode("utf-8")
-        return json.loads(body)
+    artifact_store = artifact_store or ArtifactStore(build_storage_backend(run_receipt.get("storage")))
 
-    unigram_evidence = load_json_from_s3(input_bucket, evidence_key_unigrams)
-    pair_evidence = load_json_from_s3(input_bucket, evidence_key_pairs)
+    unigram_evidence = artifact_store.load_json(input_bucket, evidence_key_unigrams)
+    pair_evidence = artifact_store.load_json(input_bucket, evidence_key_pairs)
 
     unigram_fields = unigram_evidence.get("fields")
     pair_fields = pair_evidence.get("fields")
@@ -1819,9 +5149,10 @@ def section6_8_generate_contains_any_exclude_any_rules(
     if not isinstance(pair_fields, dict):
         raise ValueError("StableTrainingEvidence_Pairs fields must be a dict")
 
-    products_total_min = 8
-    support_ratio_min = 0.60
-    support_count_min = 5
+    threshold_policy = threshold_policy or THRESHOLD_POLICY
+    products_total_min = threshold_policy["products_total_min"]
+    support_ratio_min = threshold_policy["support_ratio_min"]
+    support_count_min = threshold_policy["support_count_min"]
 
     mutable_rules_by_category: Dict[str, List[dict]] = defaultdict(list)
     existing_rule_ids_by_category: Dict[str, Set[str]] = defaultdict(set)
@@ -1877,6 +5208,7 @@ def section6_8_generate_contains_any_exclude_any_rules(
         }
 
     contains_any_exclude_any_total_by_field: Dict[str, int] = defaultdict(int)
+    field_contexts: Dict[str, dict] = {}
 
     for field_name in ["KEYWORD", "DESCRIPTION_SHORT", "CLASS_CODES"]:
         field_data_unigram = unigram_fields.get(field_name)
@@ -1914,133 +5246,35 @@ def section6_8_generate_contains_any_exclude_any_rules(
                     f"StableTrainingEvidence_Unigrams {field_name}.by_pim_category entry '{pim_category_id}' must be a dict"
                 )
 
-            products_total = pim_data.get("products_total")
-            token_product_counts = pim_data.get("token_product_counts")
-            if not isinstance(products_total, int):
-                raise ValueError(
-                    f"StableTrainingEvidence_Unigrams {field_name}.by_pim_category['{pim_category_id}'].products_total must be an int"
-                )
-            if products_total < products_total_min:
-                continue
-            if not isinstance(token_product_counts, dict):
-                raise ValueError(
-                    f"StableTrainingEvidence_Unigrams {field_name}.by_pim_category['{pim_category_id}'].token_product_counts must be a dict"
-                )
-
-            pim_category_key = str(pim_category_id)
-            pair_counts_any = pair_counts_any_by_field[field_name].get(pim_category_key, {})
-            adjacency_map = adjacency_map_by_field[field_name]
-
-            eligible_include_tokens: List[str] = []
-            for token, support_count in token_product_counts.items():
-                if not isinstance(support_count, int):
-                    raise ValueError(
-                        f"StableTrainingEvidence token_product_counts values must be ints for {field_name}"
-                    )
-                support_ratio = support_count / products_total if products_total else 0.0
-                if not (support_count >= support_count_min or support_ratio >= support_ratio_min):
-                    continue
-                if token_category_occurrence_count.get(token, 0) <= 1:
-                    continue
-                eligible_include_tokens.append(token)
-
-            for token in eligible_include_tokens:
-                neighbors = adjacency_map.get(token, set())
-                if not neighbors:
-                    continue
-
-                token_support_count = token_product_counts.get(token, 0)
-                for neighbor in neighbors:
-                    if token == neighbor:
-                        continue
-                    left, right = sorted([token, neighbor])
-                    pair_key = f"{left}||{right}"
-
-                    inside_pair_any_support = pair_counts_any.get(pair_key, 0)
-                    inside_support_without_neighbor = token_support_count - inside_pair_any_support
-                    if inside_support_without_neighbor <= 0:
-                        continue
-
-                    inside_support_ratio = (
-                        inside_support_without_neighbor / products_total if products_total else 0.0
-                    )
-                    if not (
-                        inside_support_without_neighbor >= support_count_min
-                        or inside_support_ratio >= support_ratio_min
-                    ):
-                        continue
-
-                    outside_support_count = 0
-                    outside_categories_with_support_count = 0
-
-                    for other_category_id, other_unigram_data in by_pim_category_unigram.items():
-                        other_category_key = str(other_category_id)
-                        if other_category_key == pim_category_key:
-                            continue
-                        other_token_counts = other_unigram_data.get("token_product_counts", {})
-                        if not isinstance(other_token_counts, dict):
-                            raise ValueError(
-                                f"StableTrainingEvidence_Unigrams {field_name}.by_pim_category entries must contain token_product_counts dicts"
-                            )
-                        other_token_support = other_token_counts.get(token, 0)
-
-                        other_pair_counts_any = by_pim_category_pair.get(other_category_key, {}).get(
-                            "pair_counts_any", {}
-                        )
-                        other_pair_support = other_pair_counts_any.get(pair_key, 0)
-                        outside_support_without_neighbor = other_token_support - other_pair_support
-                        if outside_support_without_neighbor > 0:
-                            outside_support_count += outside_support_without_neighbor
-                            outside_categories_with_support_count += 1
-                            break
-
-                    if outside_support_count != 0 or outside_categories_with_support_count != 0:
-                        continue
-
-                    outside_products_total = global_products_total - products_total
+        token_postings = _build_token_postings(by_pim_category_unigram, field_name)
+        pair_any_postings = _build_pair_any_postings(by_pim_category_pair)
 
-                    values_include = [token]
-                    values_exclude = [neighbor]
-                    include_str = ",".join(sorted(values_include))
-                    exclude_str = ",".join(sorted(values_exclude))
-                    rule_id_source = (
-                        f"{pim_category_key}|{field_name}|contains_any_exclude_any|{include_str}|{exclude_str}"
-                    )
-                    rule_id = hashlib.sha1(rule_id_source.encode("utf-8")).hexdigest()
-
-                    if rule_id in existing_rule_ids_by_category[pim_category_key]:
-                        continue
-
-                    rule = {
-                        "rule_id": rule_id,
-                        "rule_spec": {
-                            "field_name": field_name,
-                            "operator": "contains_any_exclude_any",
-                            "values_include": values_include,
-                            "values_exclude": values_exclude,
-                        },
-                        "training_proof": {
-                            "training_inside_products_total": products_total,
-                            "training_inside_support_count": inside_support_without_neighbor,
-                            "training_inside_support_ratio": inside_support_ratio,
-                            "training_inside_support_count_a": token_support_count,
-                            "training_inside_support_count_pair": inside_pair_any_support,
-                            "training_outside_products_total": outside_products_total,
-                            "training_outside_support_count": outside_support_count,
-                            "training_outside_categories_with_support_count": outside_categories_with_support_count,
-                            "training_uniqueness_basis": "outside_support==0_for_A_and_not_B",
-                        },
-                        "evidence_source": "StableTrainingEvidence_Pairs_v1",
-                        "lifecycle": {
-                            "created_run_id": run_receipt.get("run_id"),
-                            "status": "active_unvalidated",
-                            "last_validated_run_id": None,
-                        },
-                    }
+        field_contexts[field_name] = {
+            "category_items": list(by_pim_category_unigram.items()),
+            "run_id": run_receipt.get("run_id"),
+            "products_total_min": products_total_min,
+            "support_ratio_min": support_ratio_min,
+            "support_count_min": support_count_min,
+            "global_products_total": global_products_total,
+            "token_category_occurrence_count": token_category_occurrence_count,
+            "token_postings": token_postings,
+            "pair_any_postings": pair_any_postings,
+            "adjacency_map": adjacency_map_by_field[field_name],
+            "pair_counts_any_by_category": pair_counts_any_by_field[field_name],
+        }
 
-                    mutable_rules_by_category[pim_category_key].append(rule)
-                    existing_rule_ids_by_category[pim_category_key].add(rule_id)
-                    contains_any_exclude_any_total_by_field[field_name] += 1
+    # Rule ids are checked against the rules generated so far at merge time, in serial order.
+    for field_name, pim_category_key, rules in generate_rules_by_shard(
+        _generate_contains_any_exclude_any_rules_for_category,
+        field_contexts,
+        resolve_rule_generation_workers(run_receipt),
+    ):
+        for rule in rules:
+            if rule["rule_id"] in existing_rule_ids_by_category[pim_category_key]:
+                continue
+            mutable_rules_by_category[pim_category_key].append(rule)
+            existing_rule_ids_by_category[pim_category_key].add(rule["rule_id"])
+            contains_any_exclude_any_total_by_field[field_name] += 1
 
     total_added = sum(contains_any_exclude_any_total_by_field.values())
 
@@ -2092,6 +5326,7 @@ def section6_3_write_rules_snapshot(
     field_globals: dict,
     rules_by_pim_category: Dict[str, List[dict]],
     rules_summary: dict | None = None,
+    artifact_store: ArtifactStore | None = None,
 ) -> dict:
     run_id = run_receipt["run_id"]
     vendor_name = run_receipt["vendor_name"]
@@ -2109,16 +5344,11 @@ def section6_3_write_rules_snapshot(
     if not stable_training_set_key or not stable_training_evidence_unigrams_key:
         raise ValueError("Stable training outputs missing from run_receipt outputs_written for rules snapshot")
 
-    s3_client = boto3.client("s3")
+    artifact_store = artifact_store or ArtifactStore(build_storage_backend(run_receipt.get("storage")))
 
     evidence_key = stable_training_evidence_unigrams_key
 
-    def load_json_from_s3(bucket: str, key: str):
-        response = s3_client.get_object(Bucket=bucket, Key=key)
-        body = response["Body"].read().decode("utf-8")
-        return json.loads(body)
-
-    evidence = load_json_from_s3(run_receipt["input_bucket"], evidence_key)
+    evidence = artifact_store.load_json(run_receipt["input_bucket"], evidence_key)
 
     keyword_field = evidence.get("fields", {}).get("KEYWORD")
     if not isinstance(keyword_field, dict):
@@ -2180,11 +5410,7 @@ def section6_3_write_rules_snapshot(
         "rules_by_pim_category": rules_by_pim_category,
     }
 
-    s3_client.put_object(
-        Bucket=output_bucket,
-        Key=rules_snapshot_key,
-        Body=json.dumps(snapshot_body, indent=2),
-    )
+    artifact_store.put_json(output_bucket, rules_snapshot_key, snapshot_body)
 
     outputs_written = run_receipt.setdefault("outputs_written", {})
     outputs_written["rules_snapshot_key"] = rules_snapshot_key
@@ -2263,89 +5489,291 @@ def section6_3_write_rules_snapshot(
 # === Section 6.9: ACTIVE (Write product_rule_hits NDJSON v1) ===
 
 
-def section6_9_write_product_rule_hits(
-    run_receipt: dict,
-    rules_by_pim_category: Dict[str, List[dict]],
-    field_globals: dict | None = None,
-) -> dict:
-    vendor_name = run_receipt["vendor_name"]
-    run_id = run_receipt["run_id"]
-    prepared_output_prefix = run_receipt["prepared_output_prefix"]
-    output_bucket = run_receipt["output_bucket"]
-    input_bucket = run_receipt["input_bucket"]
+RULE_MATCH_OPERATORS = {"contains_any", "contains_all", "contains_any_exclude_any"}
 
-    s3_client = boto3.client("s3")
 
-    product_input_key = f"{prepared_output_prefix}/{vendor_name}_forMapping_products"
-    product_rule_hits_key = (
-        f"{prepared_output_prefix}/mappingMethodTraining/product_rule_hits/"
-        f"product_rule_hits_{vendor_name}_{run_id}.ndjson"
-    )
-    product_multimapping_exceptions_key = (
-        f"{prepared_output_prefix}/mappingMethodTraining/product_rule_hits/"
-        f"product_multimapping_exceptions_{vendor_name}_{run_id}.ndjson"
-    )
+class CompiledRuleMatcher:
+    # Rules are indexed by (field_name, include token) so a product only visits rules that
+    # share at least one token with it; contains_all rules fire once every distinct include
+    # token has been counted. Rule hits keep the flattened rules order of the full scan.
 
-    def load_json_from_s3(bucket: str, key: str):
-        response = s3_client.get_object(Bucket=bucket, Key=key)
-        body = response["Body"].read().decode("utf-8")
-        return json.loads(body)
+    def __init__(self, rules_by_pim_category: Dict[str, List[dict]]):
+        self.compiled_rules: List[tuple] = []
+        self.rule_indexes_by_field: Dict[str, Dict[str, List[int]]] = defaultdict(
+            lambda: defaultdict(list)
+        )
+        self.always_matching_rule_indexes: List[int] = []
 
-    stable_training_set_key = run_receipt["stable_training_set_key"]
-    stable_training_set = load_json_from_s3(input_bucket, stable_training_set_key)
+        for pim_category_id, rules in rules_by_pim_category.items():
+            if not isinstance(rules, list):
+                continue
+            for rule in rules:
+                if not isinstance(rule, dict):
+                    continue
+                rule_spec = rule.get("rule_spec")
+                if not isinstance(rule_spec, dict):
+                    continue
+                field_name = rule_spec.get("field_name")
+                operator = rule_spec.get("operator")
+                if not isinstance(field_name, str) or not isinstance(operator, str):
+                    continue
+                if operator not in RULE_MATCH_OPERATORS:
+                    continue
 
-    stopwords_for_filtering = build_stopword_set()
-    plural_map_keyword, plural_map_description, _ = build_plural_maps_from_training_set(
-        stable_training_set, stopwords_for_filtering
-    )
-    denylist_config = load_denylist_config(
-        s3_client, input_bucket, DENYLIST_CONFIG_KEY_DEFAULT
-    )
-    print(
-        "Loaded denylist config for product rule hits from "
-        f"s3://{input_bucket}/{DENYLIST_CONFIG_KEY_DEFAULT}"
-    )
+                values_include = [
+                    value for value in rule_spec.get("values_include", []) if isinstance(value, str)
+                ]
+                values_exclude = [
+                    value for value in rule_spec.get("values_exclude", []) if isinstance(value, str)
+                ]
+                distinct_include_values = set(values_include)
+
+                rule_index = len(self.compiled_rules)
+                self.compiled_rules.append(
+                    (
+                        str(pim_category_id),
+                        rule.get("rule_id"),
+                        field_name,
+                        operator,
+                        values_include,
+                        values_exclude,
+                        len(distinct_include_values),
+                    )
+                )
+
+                if operator == "contains_all" and not distinct_include_values:
+                    self.always_matching_rule_indexes.append(rule_index)
+                    continue
+                for value in distinct_include_values:
+                    self.rule_indexes_by_field[field_name][value].append(rule_index)
+
+        self.rule_indexes_by_field = {
+            field_name: dict(token_index) for field_name, token_index in self.rule_indexes_by_field.items()
+        }
+
+    def match(self, product_tokens: Dict[str, Set[str]]) -> List[dict]:
+        include_hit_counts: Dict[int, int] = defaultdict(int)
+        for field_name, tokens in product_tokens.items():
+            token_index = self.rule_indexes_by_field.get(field_name)
+            if not token_index:
+                continue
+            for token in tokens:
+                for rule_index in token_index.get(token, ()):
+                    include_hit_counts[rule_index] += 1
+
+        if self.always_matching_rule_indexes:
+            candidate_rule_indexes = sorted(
+                set(include_hit_counts.keys()).union(self.always_matching_rule_indexes)
+            )
+        else:
+            candidate_rule_indexes = sorted(include_hit_counts.keys())
+
+        rule_hits: List[dict] = []
+        for rule_index in candidate_rule_indexes:
+            (
+                target_pim_category_id,
+                rule_id,
+                field_name,
+                operator,
+                values_include,
+                values_exclude,
+                required_include_count,
+            ) = self.compiled_rules[rule_index]
+            tokens_in_field = product_tokens.get(field_name, set())
 
-    def load_products_from_s3(bucket: str, key: str):
-        response = s3_client.get_object(Bucket=bucket, Key=key)
-        for raw_line in response["Body"].iter_lines():
-            if raw_line is None:
+            if (
+                operator == "contains_all"
+                and include_hit_counts.get(rule_index, 0) != required_include_count
+            ):
                 continue
-            line = raw_line.decode("utf-8").strip()
-            if not line:
+
+            exclude_hits = [value for value in values_exclude if value in tokens_in_field]
+            if operator == "contains_any_exclude_any" and exclude_hits:
                 continue
-            yield json.loads(line)
 
-    def build_product_tokens(product: dict) -> Dict[str, Set[str]]:
-        tokens = build_token_set_for_product(product, stopwords=stopwords_for_filtering)
-        tokens["KEYWORD"] = {plural_map_keyword.get(token, token) for token in tokens["KEYWORD"]}
-        tokens["DESCRIPTION_SHORT"] = {
-            plural_map_description.get(token, token) for token in tokens["DESCRIPTION_SHORT"]
+            rule_hits.append(self.rule_hit(rule_index, tokens_in_field, exclude_hits))
+
+        return rule_hits
+
+    def rule_hit(self, rule_index: int, tokens_in_field: Set[str], exclude_hits: List[str] | None = None) -> dict:
+        (
+            target_pim_category_id,
+            rule_id,
+            field_name,
+            operator,
+            values_include,
+            values_exclude,
+            _,
+        ) = self.compiled_rules[rule_index]
+        if exclude_hits is None:
+            exclude_hits = [value for value in values_exclude if value in tokens_in_field]
+        return {
+            "rule_id": rule_id,
+            "target_pim_category_id": target_pim_category_id,
+            "rule_spec": {
+                "field_name": field_name,
+                "operator": operator,
+                "values_include": values_include,
+                "values_exclude": values_exclude,
+            },
+            "match_evidence": {
+                "include_hits": [value for value in values_include if value in tokens_in_field],
+                "exclude_hits": exclude_hits,
+            },
         }
-        return tokens
 
-    flattened_rules: List[tuple[str, dict]] = []
-    for pim_category_id, rules in rules_by_pim_category.items():
-        if not isinstance(rules, list):
-            continue
-        for rule in rules:
-            if not isinstance(rule, dict):
+    def match_chunk(self, product_tokens_chunk: List[Dict[str, Set[str]]]) -> List[List[dict]]:
+        return [self.match(product_tokens) for product_tokens in product_tokens_chunk]
+
+
+class BitsetRuleMatcher:
+    # Evaluates the rules of CompiledRuleMatcher for a whole product chunk with NumPy. Every rule
+    # token gets a row of product bits (one uint64 word per 64 products of the chunk); a rule's hit
+    # row is the OR (contains_any) or AND (contains_all) of its include token rows, with the OR of
+    # its exclude token rows cleared for contains_any_exclude_any. Hits keep the order of match().
+
+    def __init__(self, rules_by_pim_category: Dict[str, List[dict]]):
+        if np is None:
+            raise ImportError("numpy is required for the bitset product_rule_hits engine")
+        self.rule_matcher = CompiledRuleMatcher(rules_by_pim_category)
+        self.token_columns_by_field: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self.column_count = 0
+
+        grouped_rules: Dict[Tuple[str, int, int], List[Tuple[int, List[int], List[int]]]] = defaultdict(list)
+        for rule_index, compiled_rule in enumerate(self.rule_matcher.compiled_rules):
+            _, _, field_name, operator, values_include, values_exclude, _ = compiled_rule
+            include_columns = sorted({self._token_column(field_name, value) for value in values_include})
+            exclude_columns = (
+                sorted({self._token_column(field_name, value) for value in values_exclude})
+                if operator == "contains_any_exclude_any"
+                else []
+            )
+            grouped_rules[(operator, len(include_columns), len(exclude_columns))].append(
+                (rule_index, include_columns, exclude_columns)
+            )
+
+        # One array per (operator, include count, exclude count) so each group reduces in one call.
+        self.rule_groups: List[Tuple[str, "np.ndarray", "np.ndarray", "np.ndarray"]] = []
+        for (operator, include_count, exclude_count), rules in grouped_rules.items():
+            self.rule_groups.append(
+                (
+                    operator,
+                    np.array([rule_index for rule_index, _, _ in rules], dtype=np.int64),
+                    np.array([columns for _, columns, _ in rules], dtype=np.int64).reshape(len(rules), include_count),
+                    np.array([columns for _, _, columns in rules], dtype=np.int64).reshape(len(rules), exclude_count),
+                )
+            )
+        self.token_columns_by_field = dict(self.token_columns_by_field)
+
+    def _token_column(self, field_name: str, token: str) -> int:
+        field_columns = self.token_columns_by_field[field_name]
+        column = field_columns.get(token)
+        if column is None:
+            column = self.column_count
+            field_columns[token] = column
+            self.column_count += 1
+        return column
+
+    def match_chunk(self, product_tokens_chunk: List[Dict[str, Set[str]]]) -> List[List[dict]]:
+        product_count = len(product_tokens_chunk)
+        word_count = (product_count + 63) // 64
+
+        product_positions: List[int] = []
+        token_columns: List[int] = []
+        for position, product_tokens in enumerate(product_tokens_chunk):
+            for field_name, tokens in product_tokens.items():
+                field_columns = self.token_columns_by_field.get(field_name)
+                if not field_columns:
+                    continue
+                for token in tokens:
+                    column = field_columns.get(token)
+                    if column is not None:
+                        product_positions.append(position)
+                        token_columns.append(column)
+
+        positions = np.array(product_positions, dtype=np.uint64)
+        token_bits = np.zeros((self.column_count, word_count), dtype=np.uint64)
+        np.bitwise_or.at(
+            token_bits,
+            (np.array(token_columns, dtype=np.int64), (positions >> np.uint64(6)).astype(np.int64)),
+            np.left_shift(np.uint64(1), positions & np.uint64(63)),
+        )
+
+        rule_bits = np.zeros((len(self.rule_matcher.compiled_rules), word_count), dtype=np.uint64)
+        for operator, rule_indexes, include_columns, exclude_columns in self.rule_groups:
+            if not include_columns.shape[1]:
+                # Matches nothing, except contains_all without include values, which matches every product.
+                if operator == "contains_all":
+                    rule_bits[rule_indexes] = np.iinfo(np.uint64).max
                 continue
-            flattened_rules.append((str(pim_category_id), rule))
-
-    buffer = io.BytesIO()
-    exceptions_buffer = io.BytesIO()
-    product_count_total = 0
-    products_with_any_rule_hit = 0
-    products_included_single_mapping = 0
-    products_excluded_multi_mapping = 0
-    denylist_removed_counts = {"KEYWORD": 0, "DESCRIPTION_SHORT": 0}
+            include_bits = token_bits[include_columns]
+            if operator == "contains_all":
+                hit_bits = np.bitwise_and.reduce(include_bits, axis=1)
+            else:
+                hit_bits = np.bitwise_or.reduce(include_bits, axis=1)
+            if exclude_columns.shape[1]:
+                hit_bits &= ~np.bitwise_or.reduce(token_bits[exclude_columns], axis=1)
+            rule_bits[rule_indexes] = hit_bits
+
+        # np.nonzero walks rule_bits rule by rule, so every product collects its hits in rule order.
+        hit_rules, hit_words = np.nonzero(rule_bits)
+        word_bits = np.unpackbits(
+            rule_bits[hit_rules, hit_words].astype("<u8").view(np.uint8).reshape(-1, 8),
+            axis=1,
+            bitorder="little",
+        )
+        hit_indexes, hit_offsets = np.nonzero(word_bits)
+        hit_positions = hit_words[hit_indexes] * 64 + hit_offsets
+
+        compiled_rules = self.rule_matcher.compiled_rules
+        rule_hits_chunk: List[List[dict]] = [[] for _ in range(product_count)]
+        for rule_index, position in zip(hit_rules[hit_indexes].tolist(), hit_positions.tolist()):
+            if position >= product_count:
+                continue
+            tokens_in_field = product_tokens_chunk[position].get(compiled_rules[rule_index][2], set())
+            rule_hits_chunk[position].append(self.rule_matcher.rule_hit(rule_index, tokens_in_field))
+        return rule_hits_chunk
+
 
-    for product in load_products_from_s3(output_bucket, product_input_key):
+# Read-only matcher and tokenizer state of the running section 6.9; forked workers inherit it copy-on-write.
+_PRODUCT_RULE_HITS_SHARED: dict = {}
+
+
+def _iter_product_chunks(products, chunk_size: int):
+    chunk: List[dict] = []
+    for product in products:
         if not isinstance(product, dict):
             continue
+        chunk.append(product)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _evaluate_product_chunk(products: List[dict]) -> Tuple[List[dict], List[dict], dict]:
+    rule_matcher = _PRODUCT_RULE_HITS_SHARED["rule_matcher"]
+    reference_rule_matcher = _PRODUCT_RULE_HITS_SHARED.get("reference_rule_matcher")
+    tokenizer = _PRODUCT_RULE_HITS_SHARED["text_tokenizer"]
+    plural_map_keyword = _PRODUCT_RULE_HITS_SHARED["plural_map_keyword"]
+    plural_map_description = _PRODUCT_RULE_HITS_SHARED["plural_map_description"]
+    denylist_config = _PRODUCT_RULE_HITS_SHARED["denylist_config"]
+
+    included_products: List[Tuple[object, dict]] = []
+    product_tokens_chunk: List[Dict[str, Set[str]]] = []
+    exception_records: List[dict] = []
+    chunk_counts = {
+        "products_total_read": 0,
+        "products_included_single_mapping": 0,
+        "products_excluded_multi_mapping": 0,
+        "products_with_any_rule_hit": 0,
+        "denylist_removed_tokens_by_field": {"KEYWORD": 0, "DESCRIPTION_SHORT": 0},
+    }
+    denylist_removed_counts = chunk_counts["denylist_removed_tokens_by_field"]
 
-        product_count_total += 1
+    for product in products:
+        chunk_counts["products_total_read"] += 1
         article_id = product.get("article_id")
         vendor_mappings = product.get("vendor_mappings")
 
@@ -2353,7 +5781,7 @@ def section6_9_write_product_rule_hits(
         vendor_mapping_count = len(vendor_mapping_list)
 
         if vendor_mapping_count != 1:
-            products_excluded_multi_mapping += 1
+            chunk_counts["products_excluded_multi_mapping"] += 1
             vendor_categories = []
             for mapping in vendor_mapping_list:
                 if not isinstance(mapping, dict):
@@ -2371,11 +5799,10 @@ def section6_9_write_product_rule_hits(
                 "vendor_mapping_count": vendor_mapping_count,
                 "vendor_categories": vendor_categories,
             }
-            exceptions_buffer.write(json.dumps(exception_record, ensure_ascii=False).encode("utf-8"))
-            exceptions_buffer.write(b"\n")
+            exception_records.append(exception_record)
             continue
 
-        products_included_single_mapping += 1
+        chunk_counts["products_included_single_mapping"] += 1
         vendor_mapping = vendor_mapping_list[0] if vendor_mapping_list else {}
         vendor_category = {
             "vendor_category_id": vendor_mapping.get("vendor_category_id"),
@@ -2383,68 +5810,36 @@ def section6_9_write_product_rule_hits(
             "vendor_category_path": vendor_mapping.get("vendor_category_path"),
         }
 
-        raw_tokens = build_product_tokens(product)
+        raw_tokens = build_token_set_for_product(product, tokenizer=tokenizer)
+        raw_tokens["KEYWORD"] = {plural_map_keyword.get(token, token) for token in raw_tokens["KEYWORD"]}
+        raw_tokens["DESCRIPTION_SHORT"] = {
+            plural_map_description.get(token, token) for token in raw_tokens["DESCRIPTION_SHORT"]
+        }
         for field_name in ("KEYWORD", "DESCRIPTION_SHORT"):
             denylist_tokens = denylist_config["global"] | denylist_config["by_field"][field_name]
             if not denylist_tokens:
                 continue
-            filtered = {token for token in raw_tokens[field_name] if token not in denylist_tokens}
-            denylist_removed_counts[field_name] += len(raw_tokens[field_name]) - len(filtered)
-            raw_tokens[field_name] = filtered
-        product_tokens = raw_tokens
-
-        rule_hits: List[dict] = []
-        for target_pim_category_id, rule in flattened_rules:
-            rule_spec = rule.get("rule_spec")
-            if not isinstance(rule_spec, dict):
-                continue
-            field_name = rule_spec.get("field_name")
-            operator = rule_spec.get("operator")
-            values_include_raw = rule_spec.get("values_include", [])
-            values_exclude_raw = rule_spec.get("values_exclude", [])
-
-            if not isinstance(field_name, str) or not isinstance(operator, str):
-                continue
-            if operator not in {"contains_any", "contains_all", "contains_any_exclude_any"}:
-                continue
-
-            tokens_in_field = product_tokens.get(field_name, set())
-            values_include = [value for value in values_include_raw if isinstance(value, str)]
-            values_exclude = [value for value in values_exclude_raw if isinstance(value, str)]
-
-            include_hits = [value for value in values_include if value in tokens_in_field]
-            exclude_hits = [value for value in values_exclude if value in tokens_in_field]
-
-            matched = False
-            if operator == "contains_any":
-                matched = bool(include_hits)
-            elif operator == "contains_all":
-                matched = all(value in tokens_in_field for value in values_include)
-            elif operator == "contains_any_exclude_any":
-                matched = bool(include_hits) and not exclude_hits
-
-            if not matched:
-                continue
-
-            rule_hits.append(
-                {
-                    "rule_id": rule.get("rule_id"),
-                    "target_pim_category_id": target_pim_category_id,
-                    "rule_spec": {
-                        "field_name": field_name,
-                        "operator": operator,
-                        "values_include": values_include,
-                        "values_exclude": values_exclude,
-                    },
-                    "match_evidence": {
-                        "include_hits": include_hits,
-                        "exclude_hits": exclude_hits,
-                    },
-                }
-            )
+            filtered = {token for token in raw_tokens[field_name] if token not in denylist_tokens}
+            denylist_removed_counts[field_name] += len(raw_tokens[field_name]) - len(filtered)
+            raw_tokens[field_name] = filtered
+        included_products.append((article_id, vendor_category))
+        product_tokens_chunk.append(raw_tokens)
+
+    rule_hits_chunk = rule_matcher.match_chunk(product_tokens_chunk)
+    if reference_rule_matcher is not None:
+        # verify: the records come from the reference matcher, the engine result is only compared.
+        reference_rule_hits_chunk = reference_rule_matcher.match_chunk(product_tokens_chunk)
+        chunk_counts["engine_verify_mismatched_products"] = sum(
+            1
+            for rule_hits, reference_rule_hits in zip(rule_hits_chunk, reference_rule_hits_chunk)
+            if rule_hits != reference_rule_hits
+        )
+        rule_hits_chunk = reference_rule_hits_chunk
 
+    product_rule_hits_records: List[dict] = []
+    for (article_id, vendor_category), rule_hits in zip(included_products, rule_hits_chunk):
         if rule_hits:
-            products_with_any_rule_hit += 1
+            chunk_counts["products_with_any_rule_hit"] += 1
 
         output_record = {
             "article_id": article_id,
@@ -2452,81 +5847,266 @@ def section6_9_write_product_rule_hits(
             "rule_hits": rule_hits,
         }
 
-        buffer.write(json.dumps(output_record, ensure_ascii=False).encode("utf-8"))
-        buffer.write(b"\n")
+        product_rule_hits_records.append(output_record)
 
-    s3_client.put_object(Bucket=output_bucket, Key=product_rule_hits_key, Body=buffer.getvalue())
-    s3_client.put_object(
-        Bucket=output_bucket, Key=product_multimapping_exceptions_key, Body=exceptions_buffer.getvalue()
-    )
+    return product_rule_hits_records, exception_records, chunk_counts
 
-    outputs_written = run_receipt.setdefault("outputs_written", {})
-    outputs_written["product_rule_hits_key"] = product_rule_hits_key
-    outputs_written["product_multimapping_exceptions_key"] = product_multimapping_exceptions_key
 
-    product_rule_hits_counts = run_receipt.setdefault("counts", {}).setdefault(
-        "product_rule_hits", {}
-    )
-    product_rule_hits_counts.update(
+def resolve_product_rule_hits_evaluation(run_receipt: dict) -> Tuple[int, int, str]:
+    evaluation_options = {
+        **PRODUCT_RULE_HITS_DEFAULTS,
+        **(run_receipt.get("product_rule_hits_evaluation") or {}),
+    }
+    workers = resolve_worker_count(evaluation_options["workers"], "product_rule_hits_evaluation")
+    chunk_size = int(evaluation_options["chunk_size"])
+    if chunk_size <= 0:
+        raise ValueError(f"product_rule_hits_evaluation chunk_size must be > 0, got {chunk_size}")
+    engine = evaluation_options["engine"]
+    if engine not in PRODUCT_RULE_HITS_ENGINES:
+        raise ValueError(
+            f"Unsupported product_rule_hits_evaluation engine '{engine}', expected one of {PRODUCT_RULE_HITS_ENGINES}"
+        )
+    return workers, chunk_size, engine
+
+
+def iter_product_rule_hit_chunks(
+    products,
+    rules_by_pim_category: Dict[str, List[dict]],
+    training_corpus: dict,
+    workers: int,
+    chunk_size: int,
+    engine: str = "python",
+):
+    # Yields (records, exception_records, counts) per product chunk, evaluated on a forked pool when
+    # workers > 1. imap yields chunk results in input order, so records keep the product stream order.
+    if engine == "python":
+        rule_matcher = CompiledRuleMatcher(rules_by_pim_category)
+    else:
+        rule_matcher = BitsetRuleMatcher(rules_by_pim_category)
+    if engine == "verify":
+        _PRODUCT_RULE_HITS_SHARED["reference_rule_matcher"] = rule_matcher.rule_matcher
+    _PRODUCT_RULE_HITS_SHARED.update(
         {
-            "products_total_read": product_count_total,
-            "products_included_single_mapping": products_included_single_mapping,
-            "products_excluded_multi_mapping": products_excluded_multi_mapping,
-            "products_with_any_rule_hit": products_with_any_rule_hit,
-            "denylist_removed_tokens_by_field": denylist_removed_counts,
+            "rule_matcher": rule_matcher,
+            "text_tokenizer": training_corpus["text_tokenizer"],
+            "plural_map_keyword": training_corpus["plural_map_keyword"],
+            "plural_map_description": training_corpus["plural_map_description"],
+            "denylist_config": training_corpus["denylist_config"],
         }
     )
-
-    return run_receipt
-
-
-# === Section 7.1: ACTIVE (Write vendor_category_product_rule_hits NDJSON v1) ===
+    product_chunks = _iter_product_chunks(products, chunk_size)
+    pool = multiprocessing.get_context("fork").Pool(processes=workers) if workers > 1 else None
+    try:
+        if pool is not None:
+            yield from pool.imap(_evaluate_product_chunk, product_chunks)
+        else:
+            yield from map(_evaluate_product_chunk, product_chunks)
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+        _PRODUCT_RULE_HITS_SHARED.clear()
 
 
-def section7_1_write_vendor_category_product_rule_hits(run_receipt: dict) -> dict:
+def section6_9_write_product_rule_hits(
+    run_receipt: dict,
+    rules_by_pim_category: Dict[str, List[dict]],
+    field_globals: dict | None = None,
+    training_corpus: dict | None = None,
+    artifact_store: ArtifactStore | None = None,
+) -> Tuple[dict, "ProductRuleHitAggregates"]:
     vendor_name = run_receipt["vendor_name"]
     run_id = run_receipt["run_id"]
     prepared_output_prefix = run_receipt["prepared_output_prefix"]
     output_bucket = run_receipt["output_bucket"]
 
-    product_rule_hits_key = run_receipt.get("outputs_written", {}).get("product_rule_hits_key")
-    if not product_rule_hits_key:
-        raise ValueError("product_rule_hits_key missing from run_receipt outputs_written")
+    artifact_store = artifact_store or ArtifactStore(build_storage_backend(run_receipt.get("storage")))
 
-    s3_client = boto3.client("s3")
+    product_input_key = f"{prepared_output_prefix}/{vendor_name}_forMapping_products"
+    product_rule_hits_key = (
+        f"{prepared_output_prefix}/mappingMethodTraining/product_rule_hits/"
+        f"product_rule_hits_{vendor_name}_{run_id}.ndjson"
+    )
+    product_multimapping_exceptions_key = (
+        f"{prepared_output_prefix}/mappingMethodTraining/product_rule_hits/"
+        f"product_multimapping_exceptions_{vendor_name}_{run_id}.ndjson"
+    )
 
-    vendor_category_product_rule_hits_key = (
-        f"{prepared_output_prefix}/mappingMethodTraining/vendor_category_product_rule_hits/"
-        f"vendor_category_product_rule_hits_{vendor_name}_{run_id}.ndjson"
+    if training_corpus is None:
+        run_receipt, training_corpus = section4_5_build_tokenized_training_corpus(
+            run_receipt, artifact_store=artifact_store
+        )
+
+    workers, chunk_size, engine = resolve_product_rule_hits_evaluation(run_receipt)
+
+    product_rule_hits_totals = {
+        "products_total_read": 0,
+        "products_included_single_mapping": 0,
+        "products_excluded_multi_mapping": 0,
+        "products_with_any_rule_hit": 0,
+        "denylist_removed_tokens_by_field": {"KEYWORD": 0, "DESCRIPTION_SHORT": 0},
+    }
+    if engine == "verify":
+        product_rule_hits_totals["engine_verify_mismatched_products"] = 0
+
+    chunk_results = iter_product_rule_hit_chunks(
+        artifact_store.iter_ndjson(output_bucket, product_input_key),
+        rules_by_pim_category,
+        training_corpus,
+        workers,
+        chunk_size,
+        engine,
     )
+    rule_hit_aggregates = ProductRuleHitAggregates()
+    product_rule_hits_sink = artifact_store.open_ndjson_sink(output_bucket, product_rule_hits_key)
+    exception_sink = artifact_store.open_ndjson_sink(output_bucket, product_multimapping_exceptions_key)
+    try:
+        with product_rule_hits_sink, exception_sink:
+            for chunk_records, chunk_exception_records, chunk_counts in chunk_results:
+                for record in chunk_records:
+                    product_rule_hits_sink.write(record)
+                    rule_hit_aggregates.add(record)
+                for record in chunk_exception_records:
+                    exception_sink.write(record)
+                for counter_name, value in chunk_counts.items():
+                    if counter_name == "denylist_removed_tokens_by_field":
+                        for field_name, removed_count in value.items():
+                            product_rule_hits_totals[counter_name][field_name] += removed_count
+                    else:
+                        product_rule_hits_totals[counter_name] += value
+    finally:
+        chunk_results.close()
+
+    product_rule_hits_key = product_rule_hits_sink.key
+    product_multimapping_exceptions_key = exception_sink.key
+
+    if product_rule_hits_totals.get("engine_verify_mismatched_products"):
+        run_receipt.setdefault("notes", []).append(
+            f"Bitset product_rule_hits engine differed from the python engine for "
+            f"{product_rule_hits_totals['engine_verify_mismatched_products']} products; wrote python engine results."
+        )
 
-    def iter_product_rule_hits(bucket: str, key: str):
-        response = s3_client.get_object(Bucket=bucket, Key=key)
-        for raw_line in response["Body"].iter_lines():
-            if raw_line is None:
-                continue
-            line = raw_line.decode("utf-8").strip()
-            if not line:
-                continue
-            yield json.loads(line)
+    outputs_written = run_receipt.setdefault("outputs_written", {})
+    outputs_written["product_rule_hits_key"] = product_rule_hits_key
+    outputs_written["product_multimapping_exceptions_key"] = product_multimapping_exceptions_key
+
+    product_rule_hits_counts = run_receipt.setdefault("counts", {}).setdefault(
+        "product_rule_hits", {}
+    )
+    product_rule_hits_counts.update(product_rule_hits_totals)
+
+    return run_receipt, rule_hit_aggregates
+
+
+# === Section 7.1: ACTIVE (Write vendor_category_product_rule_hits NDJSON v1) ===
 
-    vendor_category_records: Dict[str, dict] = {}
-    product_count_total = 0
 
-    for record in iter_product_rule_hits(output_bucket, product_rule_hits_key):
+class RuleHitCounters:
+    # Distinct matched products per rule and per (rule, vendor category). Rules get dense
+    # ordinals; totals live in an array and vendor category counts in one small dict per rule.
+    __slots__ = ("rule_ordinals", "matched_products", "matched_products_by_vendor_category")
+
+    def __init__(self):
+        self.rule_ordinals: Dict[str, int] = {}
+        self.matched_products = array("q")
+        self.matched_products_by_vendor_category: List[Dict[str, int]] = []
+
+    def _rule_ordinal(self, rule_id: str) -> int:
+        ordinal = self.rule_ordinals.get(rule_id)
+        if ordinal is None:
+            ordinal = len(self.matched_products)
+            self.rule_ordinals[rule_id] = ordinal
+            self.matched_products.append(0)
+            self.matched_products_by_vendor_category.append({})
+        return ordinal
+
+    def count(self, rule_id: str, vendor_category_key: str, new_for_rule: bool, new_for_vendor_category: bool) -> None:
+        ordinal = self._rule_ordinal(rule_id)
+        if new_for_rule:
+            self.matched_products[ordinal] += 1
+        if new_for_vendor_category:
+            counts_by_vendor_category = self.matched_products_by_vendor_category[ordinal]
+            counts_by_vendor_category[vendor_category_key] = (
+                counts_by_vendor_category.get(vendor_category_key, 0) + 1
+            )
+
+    def rule_ids(self) -> Set[str]:
+        return set(self.rule_ordinals)
+
+    def matched_products_total(self, rule_id: str) -> int:
+        ordinal = self.rule_ordinals.get(rule_id)
+        return 0 if ordinal is None else self.matched_products[ordinal]
+
+    def matched_products_in_vendor_category(self, rule_id: str, vendor_category_key: str) -> int:
+        ordinal = self.rule_ordinals.get(rule_id)
+        if ordinal is None:
+            return 0
+        return self.matched_products_by_vendor_category[ordinal].get(vendor_category_key, 0)
+
+
+class ProductRuleHitAggregates:
+    # Single pass over product_rule_hits records, fed as section 6.9 produces them. Holds what
+    # sections 7.1 and 7.2 need so neither re-reads the NDJSON. Validation errors are deferred
+    # to section 7.1, and note-worthy events are replayed by section 7.2 in record order.
+
+    def __init__(self):
+        self.vendor_category_records: Dict[str, dict] = {}
+        self.product_count_total = 0
+        self.rule_hit_counters = RuleHitCounters()
+        self.vendor_categories_by_rule: Dict[str, Set[str]] = defaultdict(set)
+        self.first_rule_hits: Dict[str, dict] = {}
+        self.events: List[Tuple[str, str]] = []
+        self.error: str | None = None
+        self._vendor_metadata_conflicts: Set[str] = set()
+        # article_id -> (vendor_category_key, product entry); a list once the article repeats.
+        self._products_by_article: Dict[str, object] = {}
+
+    def _counted_rule_ids(self, article_id, vendor_category_key: str) -> Tuple[Set[str], Set[str]]:
+        # Only repeated article_ids need de-duplication: their earlier product entries tell
+        # which rules were already counted for the article.
+        counted_for_rule: Set[str] = set()
+        counted_for_vendor_category: Set[str] = set()
+        previous_products = self._products_by_article.get(article_id)
+        if previous_products is None:
+            return counted_for_rule, counted_for_vendor_category
+        if isinstance(previous_products, tuple):
+            previous_products = [previous_products]
+        for previous_vendor_category_key, previous_product in previous_products:
+            for rule_hit in previous_product["rule_hits"]:
+                counted_for_rule.add(rule_hit["rule_id"])
+                if previous_vendor_category_key == vendor_category_key:
+                    counted_for_vendor_category.add(rule_hit["rule_id"])
+        return counted_for_rule, counted_for_vendor_category
+
+    def _remember_product(self, article_id, vendor_category_key: str, product: dict) -> None:
+        previous_products = self._products_by_article.get(article_id)
+        if previous_products is None:
+            self._products_by_article[article_id] = (vendor_category_key, product)
+        elif isinstance(previous_products, tuple):
+            self._products_by_article[article_id] = [previous_products, (vendor_category_key, product)]
+        else:
+            previous_products.append((vendor_category_key, product))
+
+    def add(self, record) -> None:
+        if self.error is not None:
+            return
         if not isinstance(record, dict):
-            raise ValueError("Each product_rule_hits record must be a JSON object")
+            self.error = "Each product_rule_hits record must be a JSON object"
+            return
 
         vendor_category = record.get("vendor_category")
         if not isinstance(vendor_category, dict):
-            raise ValueError("product_rule_hits record missing vendor_category object")
+            self.error = "product_rule_hits record missing vendor_category object"
+            return
         vendor_category_id = vendor_category.get("vendor_category_id")
         if vendor_category_id is None:
-            raise ValueError("product_rule_hits record missing vendor_category.vendor_category_id")
+            self.error = "product_rule_hits record missing vendor_category.vendor_category_id"
+            return
 
         article_id = record.get("article_id")
         if article_id is None:
-            raise ValueError("product_rule_hits record missing article_id")
+            self.error = "product_rule_hits record missing article_id"
+            return
 
         vendor_category_compact = {
             "vendor_category_id": vendor_category.get("vendor_category_id"),
@@ -2535,41 +6115,105 @@ def section7_1_write_vendor_category_product_rule_hits(run_receipt: dict) -> dic
         }
 
         vendor_category_key = str(vendor_category_id)
-        vendor_entry = vendor_category_records.get(vendor_category_key)
+        vendor_entry = self.vendor_category_records.get(vendor_category_key)
         if vendor_entry is None:
             vendor_entry = {"vendor_category": vendor_category_compact, "products": []}
-            vendor_category_records[vendor_category_key] = vendor_entry
+            self.vendor_category_records[vendor_category_key] = vendor_entry
+        elif (
+            vendor_entry["vendor_category"] != vendor_category_compact
+            and vendor_category_key not in self._vendor_metadata_conflicts
+        ):
+            self.events.append(("vendor_metadata_conflict", vendor_category_key))
+            self._vendor_metadata_conflicts.add(vendor_category_key)
 
+        counted_for_rule, counted_for_vendor_category = self._counted_rule_ids(
+            article_id, vendor_category_key
+        )
         rule_hits_raw = record.get("rule_hits")
         rule_hits_list = rule_hits_raw if isinstance(rule_hits_raw, list) else []
         transformed_rule_hits = []
         for rule_hit in rule_hits_list:
             if not isinstance(rule_hit, dict):
                 continue
+            rule_id = rule_hit.get("rule_id")
             transformed_rule_hits.append(
                 {
-                    "rule_id": rule_hit.get("rule_id"),
+                    "rule_id": rule_id,
                     "pim_target": rule_hit.get("target_pim_category_id"),
                 }
             )
+            if rule_id is None:
+                continue
 
-        vendor_entry["products"].append(
-            {
-                "article_id": article_id,
-                "rule_hits": transformed_rule_hits,
-            }
-        )
-        product_count_total += 1
+            self.rule_hit_counters.count(
+                rule_id,
+                vendor_category_key,
+                new_for_rule=rule_id not in counted_for_rule,
+                new_for_vendor_category=rule_id not in counted_for_vendor_category,
+            )
+            counted_for_rule.add(rule_id)
+            counted_for_vendor_category.add(rule_id)
+            self.vendor_categories_by_rule[rule_id].add(vendor_category_key)
 
-    buffer = io.BytesIO()
-    for vendor_entry in vendor_category_records.values():
-        buffer.write(json.dumps(vendor_entry, ensure_ascii=False).encode("utf-8"))
-        buffer.write(b"\n")
+            if rule_id not in self.first_rule_hits:
+                self.first_rule_hits[rule_id] = {
+                    "target_pim_category_id": rule_hit.get("target_pim_category_id"),
+                    "rule_spec": rule_hit.get("rule_spec"),
+                }
+                self.events.append(("first_rule_hit", rule_id))
+
+        product = {
+            "article_id": article_id,
+            "rule_hits": transformed_rule_hits,
+        }
+        vendor_entry["products"].append(product)
+        self._remember_product(article_id, vendor_category_key, product)
+        self.product_count_total += 1
+
+
+def load_product_rule_hit_aggregates(
+    run_receipt: dict, artifact_store: ArtifactStore
+) -> ProductRuleHitAggregates:
+    output_bucket = run_receipt["output_bucket"]
+    product_rule_hits_key = run_receipt.get("outputs_written", {}).get("product_rule_hits_key")
+    if not product_rule_hits_key:
+        raise ValueError("product_rule_hits_key missing from run_receipt outputs_written")
+
+    rule_hit_aggregates = ProductRuleHitAggregates()
+    for record in artifact_store.iter_ndjson(output_bucket, product_rule_hits_key):
+        rule_hit_aggregates.add(record)
+    return rule_hit_aggregates
+
+
+def section7_1_write_vendor_category_product_rule_hits(
+    run_receipt: dict,
+    artifact_store: ArtifactStore | None = None,
+    rule_hit_aggregates: ProductRuleHitAggregates | None = None,
+) -> Tuple[dict, ProductRuleHitAggregates]:
+    vendor_name = run_receipt["vendor_name"]
+    run_id = run_receipt["run_id"]
+    prepared_output_prefix = run_receipt["prepared_output_prefix"]
+    output_bucket = run_receipt["output_bucket"]
+
+    artifact_store = artifact_store or ArtifactStore(build_storage_backend(run_receipt.get("storage")))
+
+    if rule_hit_aggregates is None:
+        rule_hit_aggregates = load_product_rule_hit_aggregates(run_receipt, artifact_store)
+    if rule_hit_aggregates.error is not None:
+        raise ValueError(rule_hit_aggregates.error)
+
+    vendor_category_product_rule_hits_key = (
+        f"{prepared_output_prefix}/mappingMethodTraining/vendor_category_product_rule_hits/"
+        f"vendor_category_product_rule_hits_{vendor_name}_{run_id}.ndjson"
+    )
+
+    vendor_category_records = rule_hit_aggregates.vendor_category_records
+    product_count_total = rule_hit_aggregates.product_count_total
 
-    s3_client.put_object(
-        Bucket=output_bucket,
-        Key=vendor_category_product_rule_hits_key,
-        Body=buffer.getvalue(),
+    vendor_category_product_rule_hits_key = artifact_store.put_ndjson(
+        output_bucket,
+        vendor_category_product_rule_hits_key,
+        list(vendor_category_records.values()),
     )
 
     outputs_written = run_receipt.setdefault("outputs_written", {})
@@ -2585,52 +6229,40 @@ def section7_1_write_vendor_category_product_rule_hits(run_receipt: dict) -> dic
         }
     )
 
-    return run_receipt
+    return run_receipt, rule_hit_aggregates
 
 
 # === Section 7.2: ACTIVE (Write rule_validation_status NDJSON v1) ===
 
 
-def section7_2_write_rule_validation_status(run_receipt: dict) -> dict:
+def section7_2_write_rule_validation_status(
+    run_receipt: dict,
+    artifact_store: ArtifactStore | None = None,
+    rule_hit_aggregates: ProductRuleHitAggregates | None = None,
+) -> dict:
     vendor_name = run_receipt["vendor_name"]
     run_id = run_receipt["run_id"]
     prepared_output_prefix = run_receipt["prepared_output_prefix"]
     output_bucket = run_receipt["output_bucket"]
 
     outputs_written = run_receipt.get("outputs_written", {})
-    product_rule_hits_key = outputs_written.get("product_rule_hits_key")
-    vendor_category_product_rule_hits_key = outputs_written.get("vendor_category_product_rule_hits_key")
     rules_snapshot_key = outputs_written.get("rules_snapshot_key")
 
-    if not product_rule_hits_key:
-        raise ValueError("product_rule_hits_key missing from run_receipt outputs_written")
-    if not vendor_category_product_rule_hits_key:
-        raise ValueError("vendor_category_product_rule_hits_key missing from run_receipt outputs_written")
     if not rules_snapshot_key:
         raise ValueError("rules_snapshot_key missing from run_receipt outputs_written")
 
-    s3_client = boto3.client("s3")
+    artifact_store = artifact_store or ArtifactStore(build_storage_backend(run_receipt.get("storage")))
+
+    if rule_hit_aggregates is None:
+        rule_hit_aggregates = load_product_rule_hit_aggregates(run_receipt, artifact_store)
+    if rule_hit_aggregates.error is not None:
+        raise ValueError(rule_hit_aggregates.error)
 
     rule_validation_status_key = (
         f"{prepared_output_prefix}/mappingMethodTraining/rule_validation_status/"
         f"rule_validation_status_{vendor_name}_{run_id}.ndjson"
     )
 
-    def load_json_from_s3(bucket: str, key: str):
-        response = s3_client.get_object(Bucket=bucket, Key=key)
-        body = response["Body"].read().decode("utf-8")
-        return json.loads(body)
-
-    def iter_ndjson(bucket: str, key: str):
-        response = s3_client.get_object(Bucket=bucket, Key=key)
-        for raw_line in response["Body"].iter_lines():
-            if raw_line is None:
-                continue
-            line = raw_line.decode("utf-8").strip()
-            if not line:
-                continue
-            yield json.loads(line)
-
     run_notes = run_receipt.setdefault("notes", [])
     note_set = set(run_notes)
 
@@ -2639,16 +6271,12 @@ def section7_2_write_rule_validation_status(run_receipt: dict) -> dict:
             run_notes.append(message)
             note_set.add(message)
 
-    vendor_category_products_total: Dict[str, int | None] = {}
-    for record in iter_ndjson(output_bucket, vendor_category_product_rule_hits_key):
-        vendor_category = record.get("vendor_category", {})
-        vendor_category_id_raw = vendor_category.get("vendor_category_id")
-        vendor_category_key = str(vendor_category_id_raw)
-        products_list = record.get("products")
-        products_total = len(products_list) if isinstance(products_list, list) else None
-        vendor_category_products_total[vendor_category_key] = products_total
+    vendor_category_products_total: Dict[str, int | None] = {
+        vendor_category_key: len(vendor_entry["products"])
+        for vendor_category_key, vendor_entry in rule_hit_aggregates.vendor_category_records.items()
+    }
 
-    rules_snapshot = load_json_from_s3(output_bucket, rules_snapshot_key)
+    rules_snapshot = artifact_store.load_json(output_bucket, rules_snapshot_key)
     rules_by_pim_category = rules_snapshot.get("rules_by_pim_category")
     if not isinstance(rules_by_pim_category, dict):
         raise ValueError("rules_snapshot.rules_by_pim_category must be a dict")
@@ -2675,68 +6303,31 @@ def section7_2_write_rule_validation_status(run_receipt: dict) -> dict:
                 "rule_spec": rule_spec,
             }
 
-    matched_articles_by_rule: Dict[str, Set[str]] = defaultdict(set)
-    matched_articles_by_rule_and_vendor: Dict[str, Dict[str, Set[str]]] = defaultdict(
-        lambda: defaultdict(set)
-    )
-    vendor_categories_by_rule: Dict[str, Set[str]] = defaultdict(set)
-    vendor_category_metadata_by_id: Dict[str, dict] = {}
+    rule_hit_counters = rule_hit_aggregates.rule_hit_counters
+    vendor_categories_by_rule = rule_hit_aggregates.vendor_categories_by_rule
+    vendor_category_metadata_by_id: Dict[str, dict] = {
+        vendor_category_key: vendor_entry["vendor_category"]
+        for vendor_category_key, vendor_entry in rule_hit_aggregates.vendor_category_records.items()
+    }
     fallback_rule_specs: Dict[str, dict] = {}
-    vendor_metadata_conflicts: Set[str] = set()
-
-    for record in iter_ndjson(output_bucket, product_rule_hits_key):
-        vendor_category = record.get("vendor_category")
-        if not isinstance(vendor_category, dict):
-            raise ValueError("product_rule_hits record missing vendor_category object")
-        vendor_category_id_raw = vendor_category.get("vendor_category_id")
-        if vendor_category_id_raw is None:
-            raise ValueError("product_rule_hits record missing vendor_category.vendor_category_id")
 
-        vendor_category_compact = {
-            "vendor_category_id": vendor_category.get("vendor_category_id"),
-            "vendor_category_name": vendor_category.get("vendor_category_name"),
-            "vendor_category_path": vendor_category.get("vendor_category_path"),
-        }
-        vendor_category_key = str(vendor_category_id_raw)
-        existing_vendor_meta = vendor_category_metadata_by_id.get(vendor_category_key)
-        if existing_vendor_meta is None:
-            vendor_category_metadata_by_id[vendor_category_key] = vendor_category_compact
-        elif existing_vendor_meta != vendor_category_compact and vendor_category_key not in vendor_metadata_conflicts:
+    for event_type, event_key in rule_hit_aggregates.events:
+        if event_type == "vendor_metadata_conflict":
             add_note_once(
-                f"Vendor category metadata conflict for id {vendor_category_key} across product_rule_hits"
+                f"Vendor category metadata conflict for id {event_key} across product_rule_hits"
+            )
+        elif event_key not in rules_from_snapshot:
+            fallback_rule_specs[event_key] = rule_hit_aggregates.first_rule_hits[event_key]
+            add_note_once(
+                f"Rule {event_key} not found in rules_snapshot; using rule_spec from product_rule_hits"
             )
-            vendor_metadata_conflicts.add(vendor_category_key)
-
-        article_id = record.get("article_id")
-        rule_hits_raw = record.get("rule_hits")
-        rule_hits_list = rule_hits_raw if isinstance(rule_hits_raw, list) else []
-
-        for rule_hit in rule_hits_list:
-            if not isinstance(rule_hit, dict):
-                continue
-            rule_id = rule_hit.get("rule_id")
-            if rule_id is None:
-                continue
-
-            matched_articles_by_rule[rule_id].add(article_id)
-            matched_articles_by_rule_and_vendor[rule_id][vendor_category_key].add(article_id)
-            vendor_categories_by_rule[rule_id].add(vendor_category_key)
-
-            if rule_id not in rules_from_snapshot and rule_id not in fallback_rule_specs:
-                fallback_rule_specs[rule_id] = {
-                    "target_pim_category_id": rule_hit.get("target_pim_category_id"),
-                    "rule_spec": rule_hit.get("rule_spec"),
-                }
-                add_note_once(
-                    f"Rule {rule_id} not found in rules_snapshot; using rule_spec from product_rule_hits"
-                )
 
-    all_rule_ids = set(rules_from_snapshot.keys()) | set(matched_articles_by_rule.keys()) | set(
+    all_rule_ids = set(rules_from_snapshot.keys()) | rule_hit_counters.rule_ids() | set(
         fallback_rule_specs.keys()
     )
 
     status_counts = {"supported": 0, "violated": 0, "not_applicable": 0}
-    buffer = io.BytesIO()
+    rule_validation_status_records: List[dict] = []
 
     for rule_id in sorted(all_rule_ids):
         rule_source = rules_from_snapshot.get(rule_id) or fallback_rule_specs.get(rule_id) or {}
@@ -2744,7 +6335,7 @@ def section7_2_write_rule_validation_status(run_receipt: dict) -> dict:
         rule_spec = rule_source.get("rule_spec")
 
         vendor_categories_hit = vendor_categories_by_rule.get(rule_id, set())
-        total_matched_products = len(matched_articles_by_rule.get(rule_id, set()))
+        total_matched_products = rule_hit_counters.matched_products_total(rule_id)
 
         if not vendor_categories_hit:
             rule_status = "not_applicable"
@@ -2757,8 +6348,8 @@ def section7_2_write_rule_validation_status(run_receipt: dict) -> dict:
 
         matched_vendor_categories_list = []
         for vendor_category_key in vendor_categories_hit:
-            matched_products_in_category = len(
-                matched_articles_by_rule_and_vendor.get(rule_id, {}).get(vendor_category_key, set())
+            matched_products_in_category = rule_hit_counters.matched_products_in_vendor_category(
+                rule_id, vendor_category_key
             )
             products_in_category = vendor_category_products_total.get(vendor_category_key)
             if products_in_category is None:
@@ -2816,10 +6407,11 @@ def section7_2_write_rule_validation_status(run_receipt: dict) -> dict:
             "matched_vendor_categories": matched_vendor_categories_sorted,
         }
 
-        buffer.write(json.dumps(output_record, ensure_ascii=False).encode("utf-8"))
-        buffer.write(b"\n")
+        rule_validation_status_records.append(output_record)
 
-    s3_client.put_object(Bucket=output_bucket, Key=rule_validation_status_key, Body=buffer.getvalue())
+    rule_validation_status_key = artifact_store.put_ndjson(
+        output_bucket, rule_validation_status_key, rule_validation_status_records
+    )
 
     outputs_written["rule_validation_status_key"] = rule_validation_status_key
 
@@ -2835,7 +6427,9 @@ def section7_2_write_rule_validation_status(run_receipt: dict) -> dict:
 # === Section 7.3: ACTIVE (Write vendor_category_mapping_status JSON) ===
 
 
-def section7_3_write_vendor_category_mapping_status(run_receipt: dict) -> dict:
+def section7_3_write_vendor_category_mapping_status(
+    run_receipt: dict, artifact_store: ArtifactStore | None = None
+) -> dict:
     vendor_name = run_receipt["vendor_name"]
     run_id = run_receipt["run_id"]
     prepared_output_prefix = run_receipt["prepared_output_prefix"]
@@ -2851,30 +6445,13 @@ def section7_3_write_vendor_category_mapping_status(run_receipt: dict) -> dict:
     if not rule_validation_status_key:
         raise ValueError("rule_validation_status_key missing from run_receipt outputs_written")
 
-    s3_client = boto3.client("s3")
-
-    def load_json_from_s3(bucket: str, key: str):
-        response = s3_client.get_object(Bucket=bucket, Key=key)
-        body = response["Body"].read().decode("utf-8")
-        return json.loads(body)
-
-    def iter_ndjson(bucket: str, key: str):
-        response = s3_client.get_object(Bucket=bucket, Key=key)
-        for raw_line in response["Body"].iter_lines():
-            if raw_line is None:
-                continue
-            line = raw_line.decode("utf-8").strip()
-            if not line:
-                continue
-            yield json.loads(line)
+    artifact_store = artifact_store or ArtifactStore(build_storage_backend(run_receipt.get("storage")))
 
     def build_pim_category_name_map() -> Dict[str, str]:
         pim_category_names: Dict[str, str] = {}
 
-        def update_from_step2(data):
-            if not isinstance(data, dict):
-                return
-            for vendor_category_data in data.values():
+        def update_from_step2(step2_items):
+            for _, vendor_category_data in step2_items:
                 pim_matches = vendor_category_data.get("pim_matches") or []
                 if not isinstance(pim_matches, list):
                     continue
@@ -2888,17 +6465,14 @@ def section7_3_write_vendor_category_mapping_status(run_receipt: dict) -> dict:
                     key = str(pim_category_id)
                     pim_category_names.setdefault(key, pim_category_name)
 
-        step2_full = load_json_from_s3(input_bucket, run_receipt["step2_full_key"])
-        update_from_step2(step2_full)
-
-        step2_1to1 = load_json_from_s3(input_bucket, run_receipt["step2_1to1_key"])
-        update_from_step2(step2_1to1)
+        update_from_step2(artifact_store.iter_json_object(input_bucket, run_receipt["step2_full_key"]))
+        update_from_step2(artifact_store.iter_json_object(input_bucket, run_receipt["step2_1to1_key"]))
 
         return pim_category_names
 
     vendor_category_meta: Dict[str, dict] = {}
     pim_category_name_map = build_pim_category_name_map()
-    for record in iter_ndjson(output_bucket, vendor_category_product_rule_hits_key):
+    for record in artifact_store.iter_ndjson(output_bucket, vendor_category_product_rule_hits_key):
         vendor_category = record.get("vendor_category", {})
         vendor_category_id = vendor_category.get("vendor_category_id")
         if vendor_category_id is None:
@@ -2915,7 +6489,7 @@ def section7_3_write_vendor_category_mapping_status(run_receipt: dict) -> dict:
 
     vendor_category_rules: Dict[str, List[dict]] = defaultdict(list)
 
-    for record in iter_ndjson(output_bucket, rule_validation_status_key):
+    for record in artifact_store.iter_ndjson(output_bucket, rule_validation_status_key):
         rule_info = record.get("rule", {})
         rule_id = rule_info.get("rule_id")
         target_pim_category_id = rule_info.get("target_pim_category_id")
@@ -3070,10 +6644,8 @@ def section7_3_write_vendor_category_mapping_status(run_receipt: dict) -> dict:
         f"vendor_category_mapping_status_{vendor_name}_{run_id}.json"
     )
 
-    s3_client.put_object(
-        Bucket=output_bucket,
-        Key=vendor_category_mapping_status_key,
-        Body=json.dumps(vendor_category_mapping_status_body, indent=2),
+    artifact_store.put_json(
+        output_bucket, vendor_category_mapping_status_key, vendor_category_mapping_status_body
     )
 
     outputs_written["vendor_category_mapping_status_key"] = vendor_category_mapping_status_key
@@ -3090,24 +6662,348 @@ def section7_3_write_vendor_category_mapping_status(run_receipt: dict) -> dict:
     return run_receipt
 
 
-# === Section 8: ACTIVE (Update Category_Mapping_Reference from rule_validation_status) ===
+# === Section 7.4: ACTIVE (Write threshold_policy_sweep JSON) ===
+
+
+THRESHOLD_POLICY_SWEEP_KEYS = ("products_total_min", "support_ratio_min", "support_count_min")
+
+
+def parse_threshold_policy_sweep_grid(grid_spec: str) -> Dict[str, list]:
+    # "products_total_min=5,8;support_ratio_min=0.5,0.6" -> sorted distinct values per key. Keys left
+    # out of the spec keep their THRESHOLD_POLICY value; an empty spec disables the sweep.
+    grid: Dict[str, list] = {}
+    for entry in grid_spec.split(";"):
+        if not entry.strip():
+            continue
+        key, separator, values_raw = entry.partition("=")
+        key = key.strip()
+        if not separator or key not in THRESHOLD_POLICY_SWEEP_KEYS:
+            raise ValueError(
+                f"threshold_policy_sweep_grid entry '{entry}' must be <key>=<v1>,<v2>,... "
+                f"with key in {THRESHOLD_POLICY_SWEEP_KEYS}"
+            )
+        if key in grid:
+            raise ValueError(f"threshold_policy_sweep_grid lists '{key}' more than once")
+        value_type = float if key == "support_ratio_min" else int
+        try:
+            values = {value_type(value.strip()) for value in values_raw.split(",") if value.strip()}
+        except ValueError as exc:
+            raise ValueError(f"threshold_policy_sweep_grid has an invalid value for '{key}': {exc}") from exc
+        if not values or min(values) < 0:
+            raise ValueError(f"threshold_policy_sweep_grid needs non-negative values for '{key}'")
+        grid[key] = sorted(values)
+
+    if not grid:
+        return {}
+    return {key: grid.get(key, [THRESHOLD_POLICY[key]]) for key in THRESHOLD_POLICY_SWEEP_KEYS}
+
+
+def build_threshold_policy_grid(grid: Dict[str, list]) -> List[dict]:
+    return [
+        {
+            **THRESHOLD_POLICY,
+            "products_total_min": products_total_min,
+            "support_ratio_min": support_ratio_min,
+            "support_count_min": support_count_min,
+        }
+        for products_total_min in grid["products_total_min"]
+        for support_ratio_min in grid["support_ratio_min"]
+        for support_count_min in grid["support_count_min"]
+    ]
+
+
+def threshold_policy_mask(
+    products_total: int | None, support_count: int | None, threshold_policies: List[dict]
+) -> int:
+    # Bit i is set when the counts pass threshold_policies[i].
+    mask = 0
+    for policy_index, threshold_policy in enumerate(threshold_policies):
+        if evaluate_threshold(products_total, support_count, threshold_policy)["pass_threshold"]:
+            mask |= 1 << policy_index
+    return mask
+
+
+def candidate_rule_policy_mask(rule: dict, threshold_policies: List[dict]) -> int:
+    # Rule generation only compares these training counts against the policy; the remaining
+    # uniqueness checks do not depend on it. contains_any_exclude_any also requires the include
+    # token on its own to pass.
+    training_proof = rule["training_proof"]
+    products_total = training_proof["training_inside_products_total"]
+    mask = threshold_policy_mask(
+        products_total, training_proof["training_inside_support_count"], threshold_policies
+    )
+    if rule["rule_spec"]["operator"] == "contains_any_exclude_any":
+        mask &= threshold_policy_mask(
+            products_total, training_proof["training_inside_support_count_a"], threshold_policies
+        )
+    return mask
 
 
-def section8_update_category_mapping_reference(run_receipt: dict) -> dict:
+def section7_4_write_threshold_policy_sweep(
+    run_receipt: dict,
+    field_globals: dict | None = None,
+    training_corpus: dict | None = None,
+    artifact_store: ArtifactStore | None = None,
+) -> dict:
+    # Every policy of the grid generates a subset of the rules of the loosest policy, so candidate
+    # rules are generated and evaluated against the vendor's products once. Each rule carries a
+    # bitmask of the policies that keep it, and every count is expanded from those masks.
+    sweep_grid = (run_receipt.get("threshold_policy_sweep") or {}).get("grid")
+    if not sweep_grid:
+        return run_receipt
+
     vendor_name = run_receipt["vendor_name"]
+    run_id = run_receipt["run_id"]
+    prepared_output_prefix = run_receipt["prepared_output_prefix"]
+    output_bucket = run_receipt["output_bucket"]
+
+    artifact_store = artifact_store or ArtifactStore(build_storage_backend(run_receipt.get("storage")))
+
+    threshold_policies = build_threshold_policy_grid(sweep_grid)
+    candidate_policy = {
+        **THRESHOLD_POLICY,
+        **{key: min(sweep_grid[key]) for key in THRESHOLD_POLICY_SWEEP_KEYS},
+    }
+
+    # Candidate generation runs sections 6.1-6.8 on a scratch receipt so their counts stay out of this run's.
+    candidate_receipt = {**run_receipt, "counts": {}, "notes": []}
+    if field_globals is None:
+        candidate_receipt, field_globals = section6_1_load_field_globals(
+            candidate_receipt, artifact_store=artifact_store
+        )
+    if training_corpus is None:
+        candidate_receipt, training_corpus = section4_5_build_tokenized_training_corpus(
+            candidate_receipt, artifact_store=artifact_store
+        )
+    candidate_receipt, candidate_rules, candidate_summary = section6_2_generate_contains_any_rules(
+        candidate_receipt, field_globals, artifact_store=artifact_store, threshold_policy=candidate_policy
+    )
+    candidate_receipt, candidate_rules, candidate_summary = section6_7_generate_contains_all_rules(
+        candidate_receipt,
+        candidate_rules,
+        candidate_summary,
+        artifact_store=artifact_store,
+        threshold_policy=candidate_policy,
+    )
+    candidate_receipt, candidate_rules, candidate_summary = section6_8_generate_contains_any_exclude_any_rules(
+        candidate_receipt,
+        field_globals,
+        candidate_rules,
+        candidate_summary,
+        artifact_store=artifact_store,
+        threshold_policy=candidate_policy,
+    )
+
+    policy_mask_by_rule: Dict[str, int] = {}
+    operator_by_rule: Dict[str, str] = {}
+    category_mask_counts: Dict[int, int] = defaultdict(int)
+    for pim_category_id, rules in candidate_rules.items():
+        category_mask = 0
+        for rule in rules:
+            policy_mask = candidate_rule_policy_mask(rule, threshold_policies)
+            policy_mask_by_rule[rule["rule_id"]] = policy_mask
+            operator_by_rule[rule["rule_id"]] = rule["rule_spec"]["operator"]
+            category_mask |= policy_mask
+        category_mask_counts[category_mask] += 1
+
+    workers, chunk_size, engine = resolve_product_rule_hits_evaluation(run_receipt)
+    product_input_key = f"{prepared_output_prefix}/{vendor_name}_forMapping_products"
+    rule_hit_aggregates = ProductRuleHitAggregates()
+    chunk_results = iter_product_rule_hit_chunks(
+        artifact_store.iter_ndjson(output_bucket, product_input_key),
+        candidate_rules,
+        training_corpus,
+        workers,
+        chunk_size,
+        engine,
+    )
+    try:
+        for chunk_records, _chunk_exception_records, _chunk_counts in chunk_results:
+            for record in chunk_records:
+                rule_hit_aggregates.add(record)
+    finally:
+        chunk_results.close()
+    if rule_hit_aggregates.error is not None:
+        raise ValueError(rule_hit_aggregates.error)
+
+    # Rule status only depends on the rule's own hits; only the clean check reads the policy.
+    rule_hit_counters = rule_hit_aggregates.rule_hit_counters
+    vendor_category_records = rule_hit_aggregates.vendor_category_records
+    clean_mask_by_rule: Dict[str, int] = {}
+    rule_profile_counts: Dict[Tuple[int, str, str, int], int] = defaultdict(int)
+    for rule_id, policy_mask in policy_mask_by_rule.items():
+        vendor_categories_hit = rule_hit_aggregates.vendor_categories_by_rule.get(rule_id, set())
+        clean_mask = 0
+        if not vendor_categories_hit:
+            rule_status = "not_applicable"
+        elif len(vendor_categories_hit) == 1:
+            rule_status = "supported"
+            (vendor_category_key,) = vendor_categories_hit
+            clean_mask = policy_mask & threshold_policy_mask(
+                len(vendor_category_records[vendor_category_key]["products"]),
+                rule_hit_counters.matched_products_in_vendor_category(rule_id, vendor_category_key),
+                threshold_policies,
+            )
+            clean_mask_by_rule[rule_id] = clean_mask
+        else:
+            rule_status = "violated"
+        rule_profile_counts[(policy_mask, operator_by_rule[rule_id], rule_status, clean_mask)] += 1
+
+    product_mask_counts: Dict[Tuple[int, int], int] = defaultdict(int)
+    for vendor_entry in vendor_category_records.values():
+        for product in vendor_entry["products"]:
+            hit_mask = 0
+            clean_hit_mask = 0
+            for rule_hit in product["rule_hits"]:
+                hit_mask |= policy_mask_by_rule.get(rule_hit["rule_id"], 0)
+                clean_hit_mask |= clean_mask_by_rule.get(rule_hit["rule_id"], 0)
+            product_mask_counts[(hit_mask, clean_hit_mask)] += 1
+
+    products_evaluated = rule_hit_aggregates.product_count_total
+    policy_rows: List[dict] = []
+    for policy_index, threshold_policy in enumerate(threshold_policies):
+        policy_bit = 1 << policy_index
+        rules_total_by_operator = {operator: 0 for operator in sorted(RULE_MATCH_OPERATORS)}
+        status_counts = {"supported": 0, "violated": 0, "not_applicable": 0}
+        rules_supported_clean = 0
+        for (policy_mask, operator, rule_status, clean_mask), rule_count in rule_profile_counts.items():
+            if not policy_mask & policy_bit:
+                continue
+            rules_total_by_operator[operator] += rule_count
+            status_counts[rule_status] += rule_count
+            if clean_mask & policy_bit:
+                rules_supported_clean += rule_count
+        products_covered = sum(
+            product_count for (hit_mask, _), product_count in product_mask_counts.items() if hit_mask & policy_bit
+        )
+        products_covered_clean = sum(
+            product_count
+            for (_, clean_hit_mask), product_count in product_mask_counts.items()
+            if clean_hit_mask & policy_bit
+        )
+        policy_rows.append(
+            {
+                "threshold_policy": threshold_policy,
+                "is_active_policy": threshold_policy == THRESHOLD_POLICY,
+                "rules_total": sum(rules_total_by_operator.values()),
+                "rules_total_by_operator": rules_total_by_operator,
+                "pim_categories_with_rules": sum(
+                    category_count
+                    for category_mask, category_count in category_mask_counts.items()
+                    if category_mask & policy_bit
+                ),
+                "rules_supported": status_counts["supported"],
+                "rules_supported_clean": rules_supported_clean,
+                "rules_violated": status_counts["violated"],
+                "rules_not_applicable": status_counts["not_applicable"],
+                "products_covered": products_covered,
+                "products_covered_by_supported_clean_rules": products_covered_clean,
+                "products_covered_ratio": products_covered / products_evaluated if products_evaluated else None,
+            }
+        )
+
+    print(f"Threshold policy sweep for vendor {vendor_name} over {products_evaluated} products:")
+    print("  products_total_min support_ratio_min support_count_min  rules supported clean violated covered")
+    for policy_row in policy_rows:
+        threshold_policy = policy_row["threshold_policy"]
+        print(
+            f"  {threshold_policy['products_total_min']:>18} {threshold_policy['support_ratio_min']:>17} "
+            f"{threshold_policy['support_count_min']:>17} {policy_row['rules_total']:>6} "
+            f"{policy_row['rules_supported']:>9} {policy_row['rules_supported_clean']:>5} "
+            f"{policy_row['rules_violated']:>8} {policy_row['products_covered']:>7}"
+            + (" (active)" if policy_row["is_active_policy"] else "")
+        )
+
+    threshold_policy_sweep_key = (
+        f"{prepared_output_prefix}/mappingMethodTraining/threshold_policy_sweep/"
+        f"threshold_policy_sweep_{vendor_name}_{run_id}.json"
+    )
+    artifact_store.put_json(
+        output_bucket,
+        threshold_policy_sweep_key,
+        {
+            "schema_version": "MappingMethodTraining_ThresholdPolicySweep_v1",
+            "vendor_name": vendor_name,
+            "run_id": run_id,
+            "grid": sweep_grid,
+            "candidate_threshold_policy": candidate_policy,
+            "candidate_rules_total": len(policy_mask_by_rule),
+            "products_evaluated": products_evaluated,
+            "policies": policy_rows,
+        },
+    )
+
+    outputs_written = run_receipt.setdefault("outputs_written", {})
+    outputs_written["threshold_policy_sweep_key"] = threshold_policy_sweep_key
+
+    counts = run_receipt.setdefault("counts", {})
+    counts["threshold_policy_sweep"] = {
+        "policies_total": len(threshold_policies),
+        "candidate_rules_total": len(policy_mask_by_rule),
+        "products_evaluated": products_evaluated,
+    }
+
+    return run_receipt
+
+
+# === Section 8: ACTIVE (Update Category_Mapping_Reference from rule_validation_status) ===
+
+
+# A rule validated against several vendors takes the strongest status any vendor reported.
+RULE_STATUS_MERGE_PRECEDENCE = {"not_applicable": 0, "supported": 1, "violated": 2}
+
+
+def iter_merged_rule_validation_status(artifact_store: ArtifactStore, bucket: str, keys: List[str]):
+    # One rule_validation_status file is streamed as is. The files of a batch run are merged by rule_id:
+    # matched vendor categories are concatenated, and an unknown status wins so that section 8 rejects it.
+    if len(keys) == 1:
+        yield from artifact_store.iter_ndjson(bucket, keys[0])
+        return
+
+    merged_records: Dict[str, dict] = {}
+    for key in keys:
+        for record in artifact_store.iter_ndjson(bucket, key):
+            if not isinstance(record, dict):
+                raise ValueError("rule_validation_status record must be a JSON object")
+            rule = record.get("rule") or {}
+            matched_vendor_categories = record.get("matched_vendor_categories") or []
+            merged_record = merged_records.get(rule.get("rule_id"))
+            if merged_record is None:
+                merged_records[rule.get("rule_id")] = {
+                    "rule": dict(rule),
+                    "matched_vendor_categories": list(matched_vendor_categories),
+                }
+                continue
+            merged_record["matched_vendor_categories"].extend(matched_vendor_categories)
+            merged_rule = merged_record["rule"]
+            merged_rule["rule_status"] = max(
+                merged_rule.get("rule_status"),
+                rule.get("rule_status"),
+                key=lambda rule_status: RULE_STATUS_MERGE_PRECEDENCE.get(rule_status, len(RULE_STATUS_MERGE_PRECEDENCE)),
+            )
+    yield from merged_records.values()
+
+
+def section8_update_category_mapping_reference(
+    run_receipt: dict, artifact_store: ArtifactStore | None = None
+) -> dict:
     run_id = run_receipt["run_id"]
     input_bucket = run_receipt["input_bucket"]
     output_bucket = run_receipt["output_bucket"]
     category_mapping_reference_key = run_receipt["category_mapping_reference_key_selected"]
 
     outputs_written = run_receipt.get("outputs_written", {})
-    rule_validation_status_key = outputs_written.get("rule_validation_status_key")
-    if not rule_validation_status_key:
-        raise ValueError("rule_validation_status_key missing from run_receipt outputs_written")
-
-    s3_client = boto3.client("s3")
+    # A batch run lists the rule_validation_status files of all its vendors.
+    rule_validation_status_keys = outputs_written.get("rule_validation_status_keys")
+    if not rule_validation_status_keys:
+        rule_validation_status_key = outputs_written.get("rule_validation_status_key")
+        if not rule_validation_status_key:
+            raise ValueError("rule_validation_status_key missing from run_receipt outputs_written")
+        rule_validation_status_keys = [rule_validation_status_key]
+
+    artifact_store = artifact_store or ArtifactStore(build_storage_backend(run_receipt.get("storage")))
     denylist_config = load_denylist_config(
-        s3_client, input_bucket, DENYLIST_CONFIG_KEY_DEFAULT
+        artifact_store, input_bucket, DENYLIST_CONFIG_KEY_DEFAULT
     )
     print(
         "Loaded denylist config for reference update from "
@@ -3119,22 +7015,7 @@ def section8_update_category_mapping_reference(run_receipt: dict) -> dict:
         f"wpb_in_global={'wpb' in denylist_config.get('global', set())}"
     )
 
-    def load_json_from_s3(bucket: str, key: str):
-        response = s3_client.get_object(Bucket=bucket, Key=key)
-        body = response["Body"].read().decode("utf-8")
-        return json.loads(body)
-
-    def iter_ndjson(bucket: str, key: str):
-        response = s3_client.get_object(Bucket=bucket, Key=key)
-        for raw_line in response["Body"].iter_lines():
-            if raw_line is None:
-                continue
-            line = raw_line.decode("utf-8").strip()
-            if not line:
-                continue
-            yield json.loads(line)
-
-    reference_entries_raw = load_json_from_s3(input_bucket, category_mapping_reference_key)
+    reference_entries_raw = artifact_store.load_json(input_bucket, category_mapping_reference_key)
     if isinstance(reference_entries_raw, dict):
         reference_entries: List[dict] = list(reference_entries_raw.values())
     elif isinstance(reference_entries_raw, list):
@@ -3167,7 +7048,7 @@ def section8_update_category_mapping_reference(run_receipt: dict) -> dict:
     rules_not_applicable_included = 0
     rules_denylisted_dropped = 0
 
-    for record in iter_ndjson(output_bucket, rule_validation_status_key):
+    for record in iter_merged_rule_validation_status(artifact_store, output_bucket, rule_validation_status_keys):
         if not isinstance(record, dict):
             raise ValueError("rule_validation_status record must be a JSON object")
         rule = record.get("rule") or {}
@@ -3294,15 +7175,14 @@ def section8_update_category_mapping_reference(run_receipt: dict) -> dict:
     new_suffix = run_id.replace("-", "")
     new_reference_key = f"canonical_mappings/Category_Mapping_Reference_{new_suffix}.json"
 
-    reference_body = json.dumps(reference_entries, indent=2, ensure_ascii=False)
-    s3_client.put_object(Bucket=input_bucket, Key=new_reference_key, Body=reference_body)
+    artifact_store.put_json(input_bucket, new_reference_key, reference_entries, ensure_ascii=False)
 
     outputs_written["category_mapping_reference_key_written"] = new_reference_key
 
     run_receipt["reference_update"] = {
         "reference_input_key": category_mapping_reference_key,
         "reference_output_key": new_reference_key,
-        "rule_validation_status_key": rule_validation_status_key,
+        "rule_validation_status_key": rule_validation_status_keys[0],
         "full_coverage_assumed": True,
         "promotion_policy": "supported_and_pass_threshold_only",
         "violated_policy": "remove",
@@ -3318,6 +7198,12 @@ def section8_update_category_mapping_reference(run_receipt: dict) -> dict:
         },
     }
 
+    if len(rule_validation_status_keys) > 1:
+        reference_update = run_receipt["reference_update"]
+        del reference_update["rule_validation_status_key"]
+        reference_update["rule_validation_status_keys"] = rule_validation_status_keys
+        reference_update["vendor_merge_policy"] = "violated_in_any_vendor_wins"
+
     return run_receipt
 
 
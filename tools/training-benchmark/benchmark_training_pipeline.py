@@ -0,0 +1,726 @@
+#!/usr/bin/env python3
+"""
+Mapping Method Training Benchmark
+
+Generates synthetic inputs for the mapping_method_training Glue job (StableTrainingSet, Step2
+proposal files, Category_Mapping_Reference and the _forMapping_products stream) and runs
+run_pipeline_layers with the job's local storage backend. Per-section throughput and memory
+are taken from the run receipt performance block and reported as JSON.
+
+Usage:
+    python tools/training-benchmark/benchmark_training_pipeline.py --sizes 10k
+    python tools/training-benchmark/benchmark_training_pipeline.py --sizes 10k,100k,1m --output report.json
+    python tools/training-benchmark/benchmark_training_pipeline.py --sizes 100k \\
+        --receipt-option product_rule_hits_evaluation.workers=4
+
+Output:
+    JSON report with one result per size: generated input sizes, generation time and, per
+    pipeline run, wall time, peak RSS, per-layer totals and per-section timings including
+    products per second.
+
+See tools/training-benchmark/README.md for details.
+"""
+import argparse
+import contextlib
+import hashlib
+import importlib.util
+import json
+import os
+import platform
+import random
+import resource
+import string
+import subprocess
+import sys
+import tempfile
+import time
+import types
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterator, List, Tuple
+
+# Import centralized configuration
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from tools.config import TOOL_PATHS
+
+
+GLUE_SCRIPT_PATH = (
+    TOOL_PATHS.jobs_root / "vendor_input_processing" / "mapping_method_training" / "glue_script.py"
+)
+
+SIZE_PRESETS = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+
+INPUT_BUCKET = "benchmark-input"
+OUTPUT_BUCKET = "benchmark-output"
+BENCHMARK_VENDOR = "benchvendor"
+PREPARED_OUTPUT_PREFIX = f"prepared/{BENCHMARK_VENDOR}"
+CATEGORY_MAPPING_REFERENCE_KEY = "canonical_mappings/Category_Mapping_Reference_20260101T000000Z.json"
+DENYLIST_CONFIG_KEY = "configuration-files/vendorInputProcessing_configs/categoryMapping_DenylistConfig.json"
+
+# Singular/plural pairs covering the common German plural patterns (-n, -en, -e, -er, -s,
+# umlaut plurals and unchanged plurals), so plural canonicalization sees realistic input.
+NOUNS: List[Tuple[str, str]] = [
+    ("schraube", "schrauben"), ("mutter", "muttern"), ("dübel", "dübel"), ("scheibe", "scheiben"),
+    ("kabel", "kabel"), ("leitung", "leitungen"), ("stecker", "stecker"), ("kupplung", "kupplungen"),
+    ("leuchte", "leuchten"), ("lampe", "lampen"), ("schalter", "schalter"), ("dose", "dosen"),
+    ("klemme", "klemmen"), ("sicherung", "sicherungen"), ("relais", "relais"), ("sensor", "sensoren"),
+    ("motor", "motoren"), ("regler", "regler"), ("rohr", "rohre"), ("muffe", "muffen"),
+    ("flansch", "flansche"), ("bogen", "bögen"), ("ventil", "ventile"), ("dichtung", "dichtungen"),
+    ("pumpe", "pumpen"), ("filter", "filter"), ("schlauch", "schläuche"), ("hahn", "hähne"),
+    ("thermostat", "thermostate"), ("heizkörper", "heizkörper"), ("bohrer", "bohrer"), ("säge", "sägen"),
+    ("zange", "zangen"), ("hammer", "hämmer"), ("meißel", "meißel"), ("feile", "feilen"),
+    ("bit", "bits"), ("akku", "akkus"), ("ladegerät", "ladegeräte"), ("koffer", "koffer"),
+    ("band", "bänder"), ("draht", "drähte"), ("nagel", "nägel"), ("niete", "nieten"),
+    ("haken", "haken"), ("kette", "ketten"), ("rolle", "rollen"), ("feder", "federn"),
+    ("lager", "lager"), ("hülse", "hülsen"), ("platte", "platten"), ("profil", "profile"),
+    ("winkel", "winkel"), ("schiene", "schienen"), ("kasten", "kästen"), ("bürste", "bürsten"),
+    ("pinsel", "pinsel"), ("farbe", "farben"), ("lack", "lacke"), ("kleber", "kleber"),
+    ("fliese", "fliesen"), ("handschuh", "handschuhe"), ("brille", "brillen"), ("helm", "helme"),
+    ("leiter", "leitern"), ("tür", "türen"), ("schloss", "schlösser"), ("griff", "griffe"),
+    ("scharnier", "scharniere"), ("beschlag", "beschläge"),
+]
+COMPOUND_PREFIXES = [
+    "edelstahl", "stahl", "kupfer", "messing", "alu", "kunststoff", "holz", "beton", "gips",
+    "sechskant", "senkkopf", "linsenkopf", "spanplatten", "gewinde", "sicherheits", "schutz",
+    "wasser", "gas", "heiz", "abwasser", "steck", "einbau", "aufputz", "unterputz", "decken",
+    "wand", "boden", "garten", "werkzeug", "elektro", "installations", "montage", "schleif",
+]
+MODIFIERS = [
+    "verzinkt", "rostfrei", "galvanisch", "verchromt", "lackiert", "weiß", "schwarz", "grau", "rot",
+    "blau", "silber", "groß", "klein", "lang", "kurz", "flexibel", "isoliert", "wasserdicht", "außen",
+    "innen", "rund", "flach", "gerade", "selbstschneidend", "feuerfest", "dimmbar", "zweipolig",
+]
+FILLER_WORDS = ["und", "mit", "für", "aus", "der", "die", "das", "ohne", "zum", "zur", "inkl", "ca", "je"]
+PACKAGING_WORDS = ["stück", "pack", "set", "karton", "beutel", "rolle", "paar"]
+UNIT_SUFFIXES = ["mm", "cm", "m", "v", "w", "a", "bar", "kg"]
+CLASS_CODE_SYSTEMS = ["ECLASS", "ETIM"]
+ZIPF_EXPONENT = 1.07
+
+DENYLIST_CONFIG = {
+    "schema_version": "v1",
+    "denylist": {
+        "global": ["inkl", "stück", "neu"],
+        "by_field": {"KEYWORD": ["set", "pack"], "DESCRIPTION_SHORT": ["karton", "beutel"]},
+    },
+}
+
+
+def object_path(storage_root: Path, bucket: str, key: str) -> Path:
+    """Path of an object in the job's local storage backend layout (<root>/<bucket>/<key>)."""
+    return storage_root / bucket / key
+
+
+def open_object_for_write(storage_root: Path, bucket: str, key: str):
+    path = object_path(storage_root, bucket, key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return path.open("w", encoding="utf-8")
+
+
+class GermanProductTextGenerator:
+    """
+    Draws keywords and short descriptions from a Zipf-distributed German product vocabulary.
+
+    Lemmas are base nouns plus prefix compounds (e.g. "edelstahlschraube"), each with singular and
+    plural forms. Every PIM category gets a small topic of lemmas so category-specific rules can be
+    learned; unit tokens and random model codes add the long vocabulary tail seen in real feeds.
+    """
+
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+        lemmas = list(NOUNS)
+        for prefix in COMPOUND_PREFIXES:
+            for singular, plural in NOUNS:
+                lemmas.append((prefix + singular, prefix + plural))
+        rng.shuffle(lemmas)
+        self.lemmas = lemmas
+        self.lemma_cum_weights = zipf_cum_weights(len(lemmas))
+        self.modifier_cum_weights = zipf_cum_weights(len(MODIFIERS))
+
+    def draw_lemmas(self, count: int) -> List[Tuple[str, str]]:
+        return self.rng.choices(self.lemmas, cum_weights=self.lemma_cum_weights, k=count)
+
+    def build_topic(self) -> List[Tuple[str, str]]:
+        return self.draw_lemmas(self.rng.randint(2, 5))
+
+    def noun_form(self, lemma: Tuple[str, str]) -> str:
+        return lemma[1] if self.rng.random() < 0.3 else lemma[0]
+
+    def unit_token(self) -> str:
+        if self.rng.random() < 0.3:
+            return f"m{self.rng.choice((3, 4, 5, 6, 8, 10, 12, 16))}"
+        return f"{self.rng.randint(1, 500)}{self.rng.choice(UNIT_SUFFIXES)}"
+
+    def model_code(self) -> str:
+        letters = "".join(self.rng.choices(string.ascii_lowercase, k=self.rng.randint(1, 3)))
+        return f"{letters}{self.rng.randint(10, 99999)}"
+
+    def keywords(self, topic: List[Tuple[str, str]]) -> List[str] | None:
+        if self.rng.random() < 0.05:
+            return None
+        keywords = []
+        for _ in range(self.rng.randint(1, 5)):
+            roll = self.rng.random()
+            if roll < 0.65:
+                keywords.append(self.noun_form(self.rng.choice(topic)))
+            elif roll < 0.85:
+                keywords.append(self.noun_form(self.draw_lemmas(1)[0]))
+            else:
+                keywords.append(self.rng.choices(MODIFIERS, cum_weights=self.modifier_cum_weights)[0])
+        if self.rng.random() < 0.1:
+            keywords.append(self.rng.choice(PACKAGING_WORDS))
+        return keywords
+
+    def description_short(self, topic: List[Tuple[str, str]]) -> str:
+        words = [self.noun_form(self.rng.choice(topic)).capitalize()]
+        for _ in range(self.rng.randint(3, 10)):
+            roll = self.rng.random()
+            if roll < 0.3:
+                words.append(self.noun_form(self.rng.choice(topic)).capitalize())
+            elif roll < 0.45:
+                words.append(self.noun_form(self.draw_lemmas(1)[0]).capitalize())
+            elif roll < 0.65:
+                words.append(self.rng.choices(MODIFIERS, cum_weights=self.modifier_cum_weights)[0])
+            elif roll < 0.8:
+                words.append(self.rng.choice(FILLER_WORDS))
+            else:
+                words.append(self.unit_token())
+        if self.rng.random() < 0.5:
+            words.append(f"Typ {self.model_code().upper()}")
+        if self.rng.random() < 0.3:
+            words.append(f"{self.rng.randint(1, 200)} {self.rng.choice(PACKAGING_WORDS).capitalize()}")
+        return " ".join(words)
+
+    def class_codes(self, pim_category_index: int) -> List[dict]:
+        code_index = pim_category_index if self.rng.random() < 0.8 else self.rng.randint(0, 9999)
+        return [
+            {
+                "system": self.rng.choice(CLASS_CODE_SYSTEMS),
+                "code": f"{27 + code_index % 20}-{code_index % 97:02d}-{code_index % 89:02d}-01",
+            }
+        ]
+
+
+def zipf_cum_weights(count: int, exponent: float = ZIPF_EXPONENT) -> List[float]:
+    cum_weights = []
+    total = 0.0
+    for rank in range(1, count + 1):
+        total += 1.0 / rank ** exponent
+        cum_weights.append(total)
+    return cum_weights
+
+
+def parse_size(value: str) -> Tuple[str, int]:
+    label = value.strip().lower()
+    if label in SIZE_PRESETS:
+        return label, SIZE_PRESETS[label]
+    try:
+        product_count = int(label.replace("_", ""))
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"Unknown size '{value}' (use {', '.join(SIZE_PRESETS)} or a product count)"
+        )
+    if product_count <= 0:
+        raise argparse.ArgumentTypeError("Product count must be positive")
+    return label, product_count
+
+
+def parse_receipt_option(value: str) -> Tuple[str, str, object]:
+    """Parse block.key=value into a run receipt option override; the value is JSON if it parses."""
+    name, separator, raw_value = value.partition("=")
+    block, dot, key = name.partition(".")
+    if not separator or not dot or not block or not key:
+        raise argparse.ArgumentTypeError(f"Receipt option '{value}' must look like block.key=value")
+    try:
+        option_value = json.loads(raw_value)
+    except json.JSONDecodeError:
+        option_value = raw_value
+    return block, key, option_value
+
+
+def split_evenly(total: int, parts: int) -> List[int]:
+    base, remainder = divmod(total, parts)
+    return [base + (1 if index < remainder else 0) for index in range(parts)]
+
+
+def generate_vendor_categories(
+    text_generator: GermanProductTextGenerator,
+    vendor_name: str,
+    product_count: int,
+    vendor_category_count: int,
+    topics: List[List[Tuple[str, str]]],
+) -> Iterator[Tuple[str, dict, List[dict]]]:
+    """Yield (vendor_category_id, Step2 entry, products) for one vendor, one category at a time."""
+    rng = text_generator.rng
+    article_number = 0
+    for category_index, category_product_count in enumerate(
+        split_evenly(product_count, vendor_category_count)
+    ):
+        vendor_category_id = f"{vendor_name.upper()}-VC{category_index:06d}"
+        pim_category_index = rng.randrange(len(topics))
+        topic = topics[pim_category_index]
+        products = []
+        for _ in range(category_product_count):
+            article_number += 1
+            products.append(
+                {
+                    "article_id": f"{vendor_name}-{article_number:09d}",
+                    "description_short": text_generator.description_short(topic),
+                    "keywords": text_generator.keywords(topic),
+                    "class_codes": text_generator.class_codes(pim_category_index),
+                }
+            )
+        assignment_source = "existing_category_match" if rng.random() < 0.8 else "keyword_match"
+        pim_matches = [
+            {
+                "pim_category_id": pim_category_id(pim_category_index),
+                "pim_category_name": f"PIM Kategorie {pim_category_index}",
+                "assignment_source": assignment_source,
+                "assignment_confidence": round(rng.uniform(0.6, 1.0), 3),
+                "products": products,
+            }
+        ]
+        if rng.random() < 0.05:
+            pim_matches.append(
+                {
+                    "pim_category_id": "UNMATCHED",
+                    "pim_category_name": None,
+                    "assignment_source": "none",
+                    "assignment_confidence": 0.0,
+                    "products": [],
+                }
+            )
+        step2_entry = {
+            "vendor_mappings": {
+                "vendor_short_name": vendor_name,
+                "vendor_category_name": f"Kategorie {category_index}",
+                "vendor_category_path": f"Sortiment/Bereich {category_index % 50}/Kategorie {category_index}",
+                "vendor_category_type": "leaf",
+            },
+            "total_products_in_vendor_category": len(products),
+            "pim_matches": pim_matches,
+        }
+        yield vendor_category_id, step2_entry, products
+
+
+def pim_category_id(pim_category_index: int) -> str:
+    return f"PIM{pim_category_index:06d}"
+
+
+def write_json_object_entry(handle, first: bool, key: str, value) -> None:
+    handle.write("{" if first else ",")
+    handle.write(json.dumps(key))
+    handle.write(":")
+    handle.write(json.dumps(value, ensure_ascii=False))
+
+
+def generate_benchmark_inputs(
+    glue_script: types.ModuleType,
+    storage_root: Path,
+    product_count: int,
+    stable_training_product_count: int,
+    pim_category_count: int,
+    vendor_category_count: int,
+    prior_vendor_count: int,
+    seed: int,
+) -> dict:
+    """
+    Write all job inputs under the local storage backend root, streaming one vendor category at a time.
+
+    The StableTrainingSet is seeded with one shard per prior vendor plus its manifest, so section 4
+    upserts into an existing sharded training set, as in production.
+    """
+    rng = random.Random(seed)
+    text_generator = GermanProductTextGenerator(rng)
+    topics = [text_generator.build_topic() for _ in range(pim_category_count)]
+
+    seed_run_id = "20251201-T000000Z"
+    stable_training_shards = {}
+    prior_vendor_product_counts = split_evenly(stable_training_product_count, prior_vendor_count)
+    for prior_vendor_index, prior_product_count in enumerate(prior_vendor_product_counts):
+        prior_vendor = f"priorvendor{prior_vendor_index}"
+        prior_category_count = max(1, vendor_category_count * prior_product_count // max(product_count, 1))
+        shard_key = glue_script.build_stable_training_set_shard_key(prior_vendor)
+        shard_sha1 = hashlib.sha1()
+        shard_record_count = 0
+        with open_object_for_write(storage_root, INPUT_BUCKET, shard_key) as handle:
+            for vendor_category_id, step2_entry, products in generate_vendor_categories(
+                text_generator, prior_vendor, prior_product_count, prior_category_count, topics
+            ):
+                pim_match = step2_entry["pim_matches"][0]
+                vendor_mappings = step2_entry["vendor_mappings"]
+                record = {
+                    "vendor_short_name": prior_vendor,
+                    "vendor_category_id": vendor_category_id,
+                    "vendor_category_name": vendor_mappings["vendor_category_name"],
+                    "vendor_category_path": vendor_mappings["vendor_category_path"],
+                    "vendor_category_type": vendor_mappings["vendor_category_type"],
+                    "pim_category_id": pim_match["pim_category_id"],
+                    "assignment_source": "existing_category_match",
+                    "assignment_confidence": pim_match["assignment_confidence"],
+                    "run_id": seed_run_id,
+                    "total_products_in_vendor_category": len(products),
+                    "products": products,
+                    "first_seen_run_id": seed_run_id,
+                    "last_seen_run_id": seed_run_id,
+                }
+                line = json.dumps(
+                    {"key": f"{prior_vendor}::{vendor_category_id}", "record": record}, ensure_ascii=False
+                ) + "\n"
+                handle.write(line)
+                shard_sha1.update(line.encode("utf-8"))
+                shard_record_count += 1
+        stable_training_shards[prior_vendor] = {
+            "key": shard_key,
+            "record_count": shard_record_count,
+            "sha1": shard_sha1.hexdigest(),
+        }
+    stable_training_manifest = {
+        "schema_version": glue_script.STABLE_TRAINING_SET_MANIFEST_SCHEMA_VERSION,
+        "updated_at_run_id": seed_run_id,
+        "record_count": sum(shard["record_count"] for shard in stable_training_shards.values()),
+        "content_sha1": glue_script.fingerprint_stable_training_set_shards(stable_training_shards),
+        "shards": stable_training_shards,
+    }
+    with open_object_for_write(storage_root, INPUT_BUCKET, glue_script.STABLE_TRAINING_SET_MANIFEST_KEY) as handle:
+        json.dump(stable_training_manifest, handle, indent=2)
+
+    step2_full_key = f"{PREPARED_OUTPUT_PREFIX}/{BENCHMARK_VENDOR}_category_matching_proposals.json"
+    step2_1to1_key = (
+        f"{PREPARED_OUTPUT_PREFIX}/{BENCHMARK_VENDOR}"
+        "_category_matching_proposals_one_vendor_to_one_pim_match.json"
+    )
+    products_key = f"{PREPARED_OUTPUT_PREFIX}/{BENCHMARK_VENDOR}_forMapping_products"
+    with open_object_for_write(storage_root, INPUT_BUCKET, step2_full_key) as full_handle, \
+            open_object_for_write(storage_root, INPUT_BUCKET, step2_1to1_key) as one_to_one_handle, \
+            open_object_for_write(storage_root, OUTPUT_BUCKET, products_key) as products_handle:
+        first_full = True
+        first_one_to_one = True
+        for vendor_category_id, step2_entry, products in generate_vendor_categories(
+            text_generator, BENCHMARK_VENDOR, product_count, vendor_category_count, topics
+        ):
+            write_json_object_entry(full_handle, first_full, vendor_category_id, step2_entry)
+            first_full = False
+            if len(step2_entry["pim_matches"]) == 1:
+                write_json_object_entry(one_to_one_handle, first_one_to_one, vendor_category_id, step2_entry)
+                first_one_to_one = False
+            vendor_mappings = [
+                {
+                    "vendor_category_id": vendor_category_id,
+                    "vendor_category_name": step2_entry["vendor_mappings"]["vendor_category_name"],
+                    "vendor_category_path": step2_entry["vendor_mappings"]["vendor_category_path"],
+                }
+            ]
+            for product in products:
+                products_handle.write(json.dumps({**product, "vendor_mappings": vendor_mappings}, ensure_ascii=False))
+                products_handle.write("\n")
+        full_handle.write("{}" if first_full else "}")
+        one_to_one_handle.write("{}" if first_one_to_one else "}")
+
+    reference_entries = [
+        {
+            "pim_category_id": pim_category_id(index),
+            "pim_category_name": f"PIM Kategorie {index}",
+            "vendor_mappings": {},
+            "mapping_methods": [],
+        }
+        for index in range(pim_category_count)
+    ]
+    with open_object_for_write(storage_root, INPUT_BUCKET, CATEGORY_MAPPING_REFERENCE_KEY) as handle:
+        json.dump(reference_entries, handle, ensure_ascii=False)
+    with open_object_for_write(storage_root, INPUT_BUCKET, DENYLIST_CONFIG_KEY) as handle:
+        json.dump(DENYLIST_CONFIG, handle)
+
+    return {
+        "step2_full_key": step2_full_key,
+        "step2_1to1_key": step2_1to1_key,
+        "stable_training_record_count": stable_training_manifest["record_count"],
+        "input_bytes": {
+            "stable_training_set": sum(
+                object_path(storage_root, INPUT_BUCKET, shard["key"]).stat().st_size
+                for shard in stable_training_shards.values()
+            ),
+            "step2_full": object_path(storage_root, INPUT_BUCKET, step2_full_key).stat().st_size,
+            "step2_1to1": object_path(storage_root, INPUT_BUCKET, step2_1to1_key).stat().st_size,
+            "for_mapping_products": object_path(storage_root, OUTPUT_BUCKET, products_key).stat().st_size,
+        },
+    }
+
+
+def load_glue_script() -> types.ModuleType:
+    """Import the training job outside Glue."""
+    if importlib.util.find_spec("awsglue") is None:
+        # The job imports getResolvedOptions at module level but only calls it from main(),
+        # which the benchmark bypasses.
+        def get_resolved_options(argv, options):
+            raise RuntimeError("getResolvedOptions is not available outside AWS Glue")
+
+        awsglue_utils = types.ModuleType("awsglue.utils")
+        awsglue_utils.getResolvedOptions = get_resolved_options
+        awsglue_module = types.ModuleType("awsglue")
+        awsglue_module.utils = awsglue_utils
+        sys.modules["awsglue"] = awsglue_module
+        sys.modules["awsglue.utils"] = awsglue_utils
+
+    spec = importlib.util.spec_from_file_location("mapping_method_training_glue_script", GLUE_SCRIPT_PATH)
+    glue_script = importlib.util.module_from_spec(spec)
+    # Registered before execution so forked pool workers can resolve module-level functions.
+    sys.modules[spec.name] = glue_script
+    spec.loader.exec_module(glue_script)
+    return glue_script
+
+
+def build_run_receipt(
+    glue_script: types.ModuleType,
+    inputs: dict,
+    run_id: str,
+    storage_root: Path,
+    receipt_options: List[Tuple[str, str, object]],
+) -> dict:
+    """Build the receipt main() would hand to run_pipeline_layers, with option blocks at their defaults."""
+    run_receipt = {
+        "job_name": "mapping_method_training_benchmark",
+        "script_version": "benchmark",
+        "run_id": run_id,
+        "vendor_name": BENCHMARK_VENDOR,
+        "prepared_input_key": f"{PREPARED_OUTPUT_PREFIX}/{BENCHMARK_VENDOR}_prepared.json",
+        "prepared_output_prefix": PREPARED_OUTPUT_PREFIX,
+        "input_bucket": INPUT_BUCKET,
+        "output_bucket": OUTPUT_BUCKET,
+        "step2_full_key": inputs["step2_full_key"],
+        "step2_1to1_key": inputs["step2_1to1_key"],
+        "category_mapping_reference_key_selected": CATEGORY_MAPPING_REFERENCE_KEY,
+        "stable_training_set_key": glue_script.STABLE_TRAINING_SET_MANIFEST_KEY,
+        "stable_training_set_exists": True,
+        "counts": {},
+        "outputs_written": {},
+        "notes": [],
+        "threshold_policy": glue_script.THRESHOLD_POLICY,
+        "unigram_evidence_build": dict(glue_script.UNIGRAM_EVIDENCE_BUILD_DEFAULTS),
+        "pair_evidence_build": dict(glue_script.PAIR_EVIDENCE_BUILD_DEFAULTS),
+        "rule_generation": dict(glue_script.RULE_GENERATION_DEFAULTS),
+        "product_rule_hits_evaluation": dict(glue_script.PRODUCT_RULE_HITS_DEFAULTS),
+        "ndjson_output": dict(glue_script.NDJSON_OUTPUT_DEFAULTS),
+        "performance": dict(glue_script.PERFORMANCE_DEFAULTS),
+        "storage": {"backend": "local", "local_root": str(storage_root)},
+        "checkpoint": dict(glue_script.RUN_CHECKPOINT_DEFAULTS),
+        "stable_training_set": dict(glue_script.STABLE_TRAINING_SET_DEFAULTS),
+    }
+    for block, key, value in receipt_options:
+        run_receipt.setdefault(block, {})[key] = value
+    return run_receipt
+
+
+def current_peak_rss_mb() -> float:
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def run_benchmark_size(size_label: str, product_count: int, args: argparse.Namespace) -> dict:
+    pim_category_count = args.pim_categories or max(20, product_count // 500)
+    vendor_category_count = args.vendor_categories or max(10, product_count // 100)
+    stable_training_product_count = (
+        args.stable_training_products if args.stable_training_products is not None else product_count
+    )
+
+    with tempfile.TemporaryDirectory(prefix="training-benchmark-", dir=args.work_dir) as work_dir:
+        storage_root = Path(work_dir)
+        glue_script = load_glue_script()
+        generation_start = time.perf_counter()
+        inputs = generate_benchmark_inputs(
+            glue_script,
+            storage_root,
+            product_count=product_count,
+            stable_training_product_count=stable_training_product_count,
+            pim_category_count=pim_category_count,
+            vendor_category_count=vendor_category_count,
+            prior_vendor_count=args.prior_vendors,
+            seed=args.seed,
+        )
+        generation_seconds = time.perf_counter() - generation_start
+
+        base_run_time = datetime.utcnow()
+        runs = []
+        for run_index in range(args.runs):
+            run_id = (base_run_time + timedelta(seconds=run_index)).strftime("%Y%m%d-T%H%M%SZ")
+            run_receipt = build_run_receipt(glue_script, inputs, run_id, storage_root, args.receipt_option)
+            rss_before_run_mb = current_peak_rss_mb()
+            run_start = time.perf_counter()
+            # Job logs go to stderr so stdout only carries the final report.
+            with contextlib.redirect_stdout(sys.stderr):
+                run_receipt = glue_script.run_pipeline_layers(run_receipt)
+            wall_seconds = time.perf_counter() - run_start
+
+            performance = run_receipt["performance"]
+            sections = []
+            for section_entry in performance["sections"]:
+                section_wall_seconds = section_entry["wall_seconds"]
+                sections.append(
+                    {
+                        **section_entry,
+                        "products_per_second": (
+                            round(product_count / section_wall_seconds, 1) if section_wall_seconds > 0 else None
+                        ),
+                    }
+                )
+            runs.append(
+                {
+                    "run_id": run_id,
+                    "wall_seconds": round(wall_seconds, 3),
+                    "products_per_second": round(product_count / wall_seconds, 1) if wall_seconds > 0 else None,
+                    "peak_rss_before_run_mb": rss_before_run_mb,
+                    "peak_rss_mb": current_peak_rss_mb(),
+                    "layers": performance["layers"],
+                    "sections": sections,
+                    "counts": run_receipt.get("counts", {}),
+                }
+            )
+
+    return {
+        "size": size_label,
+        "products": product_count,
+        "stable_training_products": stable_training_product_count,
+        "stable_training_records": inputs["stable_training_record_count"],
+        "pim_categories": pim_category_count,
+        "vendor_categories": vendor_category_count,
+        "input_bytes": inputs["input_bytes"],
+        "generation_seconds": round(generation_seconds, 3),
+        "runs": runs,
+    }
+
+
+def run_size_in_subprocess(size_label: str, args: argparse.Namespace) -> dict:
+    """Run one size in a fresh interpreter so its peak RSS is not inflated by earlier sizes."""
+    with tempfile.TemporaryDirectory(prefix="training-benchmark-report-") as report_dir:
+        report_path = Path(report_dir) / "result.json"
+        command = [
+            sys.executable,
+            str(Path(__file__).resolve()),
+            "--sizes", size_label,
+            "--in-process",
+            "--output", str(report_path),
+            "--prior-vendors", str(args.prior_vendors),
+            "--runs", str(args.runs),
+            "--seed", str(args.seed),
+        ]
+        for option_name in ("pim_categories", "vendor_categories", "stable_training_products", "work_dir"):
+            value = getattr(args, option_name)
+            if value is not None:
+                command.extend([f"--{option_name.replace('_', '-')}", str(value)])
+        for block, key, value in args.receipt_option:
+            command.extend(["--receipt-option", f"{block}.{key}={json.dumps(value)}"])
+        subprocess.run(command, check=True, stdout=sys.stderr)
+        return json.loads(report_path.read_text(encoding="utf-8"))["results"][0]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark mapping_method_training run_pipeline_layers on synthetic data",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Quick run on 10k products
+  python tools/training-benchmark/benchmark_training_pipeline.py --sizes 10k
+
+  # Full size sweep written to a report file
+  python tools/training-benchmark/benchmark_training_pipeline.py --sizes 10k,100k,1m --output report.json
+
+  # Second run on unchanged inputs exercises the incremental evidence paths
+  python tools/training-benchmark/benchmark_training_pipeline.py --sizes 100k --runs 2
+
+  # Override job options stored in the run receipt
+  python tools/training-benchmark/benchmark_training_pipeline.py --sizes 100k \\
+      --receipt-option product_rule_hits_evaluation.workers=4 --receipt-option ndjson_output.compression=gzip
+        """,
+    )
+    parser.add_argument(
+        "--sizes",
+        default="10k",
+        help="Comma-separated product counts for the benchmarked vendor: 10k, 100k, 1m or a number (default: 10k)",
+    )
+    parser.add_argument(
+        "--pim-categories",
+        type=int,
+        help="Number of PIM categories (default: max(20, products / 500))",
+    )
+    parser.add_argument(
+        "--vendor-categories",
+        type=int,
+        help="Number of vendor categories of the benchmarked vendor (default: max(10, products / 100))",
+    )
+    parser.add_argument(
+        "--stable-training-products",
+        type=int,
+        help="Products already in the StableTrainingSet from prior vendors (default: same as products)",
+    )
+    parser.add_argument(
+        "--prior-vendors",
+        type=int,
+        default=2,
+        help="Number of prior vendors the StableTrainingSet products are split across (default: 2)",
+    )
+    parser.add_argument(
+        "--runs",
+        type=int,
+        default=1,
+        help="Pipeline runs per size on the same inputs; later runs take the incremental paths (default: 1)",
+    )
+    parser.add_argument(
+        "--receipt-option",
+        action="append",
+        default=[],
+        type=parse_receipt_option,
+        metavar="BLOCK.KEY=VALUE",
+        help="Override a run receipt option block, e.g. rule_generation.workers=4 (repeatable)",
+    )
+    parser.add_argument("--seed", type=int, default=20260101, help="Random seed for data generation")
+    parser.add_argument("--work-dir", help="Root directory for the local storage backend (default: system temp dir)")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    parser.add_argument(
+        "--in-process",
+        action="store_true",
+        help="Run all sizes in this process instead of one subprocess per size",
+    )
+
+    args = parser.parse_args()
+
+    try:
+        sizes = [parse_size(value) for value in args.sizes.split(",") if value.strip()]
+    except argparse.ArgumentTypeError as exc:
+        parser.error(str(exc))
+    if not sizes:
+        parser.error("--sizes must name at least one size")
+    if args.prior_vendors < 1 or args.runs < 1:
+        parser.error("--prior-vendors and --runs must be at least 1")
+    if args.work_dir and not Path(args.work_dir).is_dir():
+        parser.error(f"--work-dir is not an existing directory: {args.work_dir}")
+    if not GLUE_SCRIPT_PATH.is_file():
+        print(f"Error: Glue script not found: {GLUE_SCRIPT_PATH}", file=sys.stderr)
+        return 2
+
+    results = []
+    for size_label, product_count in sizes:
+        print(f"Benchmarking {size_label} ({product_count} products)", file=sys.stderr)
+        if args.in_process:
+            results.append(run_benchmark_size(size_label, product_count, args))
+        else:
+            results.append(run_size_in_subprocess(size_label, args))
+
+    report = {
+        "benchmark": "mapping_method_training",
+        "generated_at": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "glue_script": GLUE_SCRIPT_PATH.relative_to(TOOL_PATHS.repo_root).as_posix(),
+        "python_version": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "seed": args.seed,
+        "results": results,
+    }
+    report_json = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(report_json + "\n", encoding="utf-8")
+        print(f"Benchmark report written to {args.output}", file=sys.stderr)
+    else:
+        print(report_json)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())